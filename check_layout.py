@@ -1,9 +1,10 @@
 import sys
 import re
 
+from toolkit import lookups, read_text
+
 # 读取文件
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+content = read_text(lookups.TIMELINE)
 
 # 查找图片组件的位置
 pattern = r"className=\{`\$\{isMobile \? 'w-16 h-16' : 'w-20 h-20'\} rounded-2xl"
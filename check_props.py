@@ -1,11 +1,14 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 找到 Props 接口定义
-for i, line in enumerate(lines[0:100]):
-    if 'interface' in line or 'Props' in line or 'onTaskCreate' in line:
-        print(f'{i+1}: {line.rstrip()[:120]}')
-
-
+from toolkit import lookups
+from toolkit.xref import XrefDB, format_ref
 
+db = XrefDB.open()
 
+# 找到 Props 接口定义
+for ref in db.defined_in(lookups.TIMELINE):
+    if ref.detail == 'interface' or (ref.detail.startswith('field:') and ref.detail.endswith('Props')):
+        print(format_ref(ref))
+
+# onTaskCreate 在这个文件里的引用
+print()
+for ref in db.refs('onTaskCreate', path=lookups.TIMELINE):
+    print(format_ref(ref))
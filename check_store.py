@@ -1,14 +1,14 @@
-with open('w:/001jiaweis/22222/src/stores/taskStore.ts', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 找到 createTask 实现
-for i, line in enumerate(lines):
-    if 'createTask:' in line and 'async' in line:
-        with open('w:/001jiaweis/22222/temp_createtask.txt', 'w', encoding='utf-8') as out:
-            out.write(''.join(lines[i:i+30]))
-        print(f'Found at line {i+1}, saved to temp_createtask.txt')
-        break
-
-
-
-
+from toolkit import REPO_ROOT, LineFile, lookups
+from toolkit.xref import XrefDB
+
+db = XrefDB.open()
+
+# 找到 createTask 实现（store 里的成员函数，不是接口声明）
+for ref in db.definitions('createTask', path=lookups.TASK_STORE):
+    if ref.detail != 'member':
+        continue
+    with LineFile.open(ref.path) as lf, \
+            open(REPO_ROOT / 'temp_createtask.txt', 'w', encoding='utf-8') as out:
+        out.write(''.join(text + '\n' for _n, text in lf.context(ref.lineno, before=0, after=29)))
+    print(f'Found at line {ref.lineno}, saved to temp_createtask.txt')
+    break
@@ -1,17 +1,15 @@
-with open('w:/001jiaweis/22222/src/components/calendar/TimelineCalendar.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 找到 onTaskCreate 的定义
-for i, line in enumerate(lines):
-    if 'onTaskCreate' in line and ('const' in line or '=' in line or 'function' in line):
-        print(f'{i+1}: {line.rstrip()}')
-        
-# 保存前200行看看结构
-with open('w:/001jiaweis/22222/temp_timeline_calendar.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[0:200]))
-    
-print('\nSaved first 200 lines')
+from toolkit import REPO_ROOT, LineFile, lookups
+from toolkit.xref import XrefDB, format_ref
 
+db = XrefDB.open()
 
+# 找到 onTaskCreate 的定义和传递
+for ref in db.refs('onTaskCreate', path=lookups.TIMELINE_CALENDAR):
+    print(format_ref(ref))
 
+# 保存前200行看看结构
+with LineFile.open(lookups.TIMELINE_CALENDAR) as lf, \
+        open(REPO_ROOT / 'temp_timeline_calendar.txt', 'w', encoding='utf-8') as out:
+    out.write(''.join(text + '\n' for _n, text in lf.lines(0, 199)))
 
+print('\nSaved first 200 lines')
@@ -1,33 +1,104 @@
 # 彻底修复所有乱码注释和文本
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+# 不认行号：以「AI 子任务」按钮的 onClick 为锚点，按相对位置认出每一行要修的注释/标题，
+# 只有这一行确实是乱码时才整行替换（保留原缩进）。没有乱码就什么都不做
+from bisect import bisect_right
+from itertools import accumulate
 
-# 替换所有有问题的行
-replacements = {
-    1960: "                    {/* 完成按钮区域 */}\n",
-    1962: "                      {/* 任务图标 */}\n",
-    1964: "                        {/* AI生成子任务 */}\n",
-    1970: "                          title=\"AI生成子任务\"\n",
-    1975: "                        {/* 验证按钮 */}\n",
-    1991: "                          title={taskVerifications[block.id]?.enabled ? '编辑验证关键词' : '启用任务验证'}\n",
-    1996: "                        {/* 展开按钮 */}\n",
-}
+from toolkit import lookups, mojibake
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import SafePattern, TokenPattern
+from toolkit.structure import StructureError
 
-for line_num, new_content in replacements.items():
-    if line_num - 1 < len(lines):
-        lines[line_num - 1] = new_content
+ANCHOR = TokenPattern('onClick={() => handleGenerateSubTasks(block.id, $$$)}')
+# 锚点往上、往下最多看这么多行
+REACH_ABOVE = 6
+REACH_BELOW = 30
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+# 锚点之上的注释行，由近到远
+COMMENTS_ABOVE = ["{/* AI生成子任务 */}", "{/* 任务图标 */}", "{/* 完成按钮区域 */}"]
+# 锚点之下的注释行，由近到远
+COMMENTS_BELOW = ["{/* 验证按钮 */}", "{/* 展开按钮 */}"]
+# 锚点之下按行首认出的属性行：(行首, 修复后的整行)
+TITLES = [
+    ('title="', 'title="AI生成子任务"'),
+    ('title={taskVerifications[block.id]?.enabled ?',
+     "title={taskVerifications[block.id]?.enabled ? '编辑验证关键词' : '启用任务验证'}"),
+]
 
-print("All lines fixed successfully!")
-print(f"Total: {len(replacements)} lines")
+_COMMENT_LINE = SafePattern(r'\{/\*.*\*/\}$')
+# U+FFFD、surrogateescape 留下的坏字节、被替换成问号的中文
+_LOST = SafePattern(r'[\ufffd\udc80-\udcff]|\?{2,}')
 
 
+def _garbled(line: str) -> bool:
+    return bool(_LOST.search(line)) or bool(mojibake.scan(line.encode('utf-8', errors='surrogateescape')))
 
 
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
 
 
+def _targets(text: str) -> list[tuple[int, str]]:
+    """[(行下标, 修复后的内容)]：锚点附近认出的各行，不管现在是不是乱码。
 
+    锚点之上的注释一层比一层缩进少（按钮 → 图标组 → 按钮区域）；锚点之下只认和
+    按钮自己的注释同一缩进的注释，也就是同级的下一个、下下个按钮。
+    """
+    lines = text.split('\n')
+    starts = list(accumulate((len(line) + 1 for line in lines), initial=0))
+    found: dict[int, str] = {}
+    for m in ANCHOR.finditer(text):
+        anchor = bisect_right(starts, m.start) - 1
+        above: list[int] = []
+        for i in range(anchor - 1, max(anchor - REACH_ABOVE, 0) - 1, -1):
+            if _COMMENT_LINE.search(lines[i].strip()) and \
+                    (not above or _indent(lines[i]) < _indent(lines[above[-1]])):
+                above.append(i)
+        found.update(zip(above, COMMENTS_ABOVE))
+        below = range(anchor + 1, min(anchor + REACH_BELOW + 1, len(lines)))
+        if above:
+            level = _indent(lines[above[0]])
+            found.update(zip((i for i in below if _COMMENT_LINE.search(lines[i].strip())
+                              and _indent(lines[i]) == level), COMMENTS_BELOW))
+        for prefix, content in TITLES:
+            i = next((i for i in below if lines[i].lstrip().startswith(prefix)), None)
+            if i is not None:
+                found[i] = content
+    return sorted(found.items())
 
+
+def _broken(text: str) -> list[tuple[int, str]]:
+    """[(行号, 替换成的整行)]：只保留确实是乱码的行，缩进照旧。"""
+    lines = text.split('\n')
+    out = []
+    for i, content in _targets(text):
+        line = lines[i].rstrip('\r')
+        if _garbled(line):
+            eol = lines[i][len(line):] + '\n'
+            out.append((i + 1, line[:_indent(line)] + content + eol))
+    return out
+
+
+def edit(tx: Transaction) -> None:
+    for lineno, new_line in _broken(tx.original):
+        tx.replace_lines(lineno, lineno, new_line)
+
+
+def fixed(text: str) -> bool:
+    # 看内容：锚点附近已经没有乱码行就算修好了（行号怎么移动都不影响）
+    return not _broken(text)
+
+
+PATCH = Patch('complete_fix', edit, fixed)
+
+if __name__ == '__main__':
+    try:
+        status = run_patches(lookups.TIMELINE, [PATCH])[PATCH.id]
+    except StructureError as e:
+        print(f"Not fixed, file left untouched: {e}")
+        raise SystemExit(1)
+    if status == 'applied':
+        print("All lines fixed successfully!")
+    else:
+        print(f"No garbled lines found ({status}), nothing to do")
@@ -1,11 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-with open('w:/001jiaweis/22222/temp_button_code.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[3025:3090]))
-    
-print('Done! Check temp_button_code.txt')
-
-
-
+from toolkit.extract import dump
 
+# 今日结束剩余时间按钮（在最后一个任务后面）
+dump('src/components/calendar/NewTimelineView.tsx', 'comment:今日结束剩余时间按钮')
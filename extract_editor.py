@@ -1,12 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 保存第1660-1750行
-with open('w:/001jiaweis/22222/temp_editor.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[1660:1750]))
-    
-print('Saved lines 1660-1750')
-
-
-
+from toolkit.extract import dump
 
+# 编辑任务弹窗（按注释锚点定位，不再依赖第1660-1750行）
+dump('src/components/calendar/NewTimelineView.tsx', 'comment:编辑任务弹窗')
@@ -1,12 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 保存第3095-3120行
-with open('w:/001jiaweis/22222/temp_empty_button.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[3095:3120]))
-    
-print('Saved lines 3095-3120')
-
-
-
+from toolkit.extract import dump
 
+# 空状态区域（包含「添加第一个任务」按钮）
+dump('src/components/calendar/NewTimelineView.tsx', 'comment:空状态')
@@ -1,12 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 第2984行附近是间隔按钮
-with open('w:/001jiaweis/22222/temp_interval_button.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[2980:3025]))
-    
-print('Saved lines 2980-3025')
-
-
-
+from toolkit.extract import dump
 
+# 间隔添加按钮区域（注释之后的那个结构）
+dump('src/components/calendar/NewTimelineView.tsx', 'comment:间隔添加按钮')
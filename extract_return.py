@@ -1,12 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 保存第1560-1670行
-with open('w:/001jiaweis/22222/temp_return.txt', 'w', encoding='utf-8') as out:
-    out.write(''.join(lines[1560:1670]))
-    
-print('Saved lines 1560-1670')
-
-
-
+from toolkit.extract import dump
 
+# 组件 return 开头的「今日已过去提示」块：注释后紧跟的那个 JSX 元素（不是整棵 return 树）
+dump('src/components/calendar/NewTimelineView.tsx', 'comment:今日已过去提示')
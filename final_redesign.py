@@ -1,6 +1,8 @@
+from toolkit import lookups
+from toolkit.buffer import PieceTable
+
 # 读取文件
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+buf = PieceTable.open(lookups.TIMELINE)
 
 # 新的布局代码（从1804行开始替换到1878行）
 new_layout = '''                    {/* 新布局：左右分栏 - 左侧信息 + 右侧大图 */}
@@ -104,21 +106,12 @@ new_layout = '''                    {/* 新布局：左右分栏 - 左侧信息
                       {/* 标题 + 表情 + 目标文本 */}
 '''
 
-# 替换第1803行到第1878行（索引1802到1877）
-new_lines = lines[:1803] + [new_layout] + lines[1878:]
+# 替换第1804行到第1878行（索引1803到1877），等价于 lines[:1803] + [new_layout] + lines[1878:]
+buf.splice_lines(1803, 1878, new_layout)
 
 # 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(new_lines)
+buf.commit()
 
 print("布局重构完成！")
 print(f"删除了 {1878-1803} 行旧代码")
 print(f"添加了新的左右分栏布局")
-
-
-
-
-
-
-
-
@@ -1,15 +1,13 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 找到所有 onTaskCreate 的调用
-import re
-for i, line in enumerate(lines):
-    if 'onTaskCreate' in line and 'onClick' in ''.join(lines[max(0,i-10):i+1]):
-        print(f'\nFound at line {i+1}:')
-        for j in range(-10, 5):
-            if 0 <= i+j < len(lines):
-                print(f'{i+j+1}: {lines[i+j].rstrip()[:120]}')
-
-
-
-
+from toolkit import LineFile, TrigramIndex, lookups
+
+index = TrigramIndex.open()
+
+# 找到所有 onTaskCreate 的调用（前 10 行内有 onClick 的）
+with LineFile.open(lookups.TIMELINE) as lf:
+    for hit in index.search('onTaskCreate', paths=[lookups.TIMELINE]):
+        i = hit.lineno - 1
+        if not any('onClick' in text for _n, text in lf.lines(i - 10, i)):
+            continue
+        print(f'\nFound at line {hit.lineno}:')
+        for lineno, text in lf.context(hit.lineno, before=10, after=4):
+            print(f'{lineno}: {text.rstrip()[:120]}')
@@ -2,23 +2,20 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-with open(r'w:\001jiaweis\22222\src\components\calendar\NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import LineFile, TrigramIndex
 
-# 找到*start按钮
-found_count = 0
-for i, line in enumerate(lines):
-    if '*start' in line:
-        print(f"找到*start在第 {i+1} 行")
-        # 打印前后15行
-        start = max(0, i-15)
-        end = min(i+5, len(lines))
-        for j in range(start, end):
-            marker = ">>> " if j == i else "    "
-            print(f"{marker}{j+1}: {lines[j]}", end='')
+TIMELINE = 'src/components/calendar/NewTimelineView.tsx'
+index = TrigramIndex.open()
+
+# 找到*start按钮（只显示前3个）
+hits = index.search('*start', paths=[TIMELINE], limit=3)
+with LineFile.open(TIMELINE) as lf:
+    for hit in hits:
+        print(f"找到*start在第 {hit.lineno} 行")
+        # 打印前15行、后4行
+        for lineno, text in lf.context(hit.lineno, before=15, after=4):
+            marker = ">>> " if lineno == hit.lineno else "    "
+            print(f"{marker}{lineno}: {text}")
         print("\n" + "="*80 + "\n")
-        found_count += 1
-        if found_count >= 3:  # 只显示前3个
-            break
 
-print(f"总共找到 {found_count} 个*start")
+print(f"总共找到 {len(hits)} 个*start")
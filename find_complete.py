@@ -1,7 +1,4 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
+from toolkit import lookups
+
 # 搜索任务完成相关的代码
-for i, line in enumerate(lines):
-    if 'completeTask' in line or 'showCelebration' in line or 'celebrationGold' in line:
-        print(f'{i+1}: {line.rstrip()[:120]}')
+lookups.main('complete')
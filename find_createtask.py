@@ -1,15 +1,16 @@
-with open('w:/001jiaweis/22222/src/pages/Dashboard.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
-# 找到 createTask 函数
-for i, line in enumerate(lines):
-    if 'createTask' in line and ('const' in line or 'function' in line or '=' in line):
-        print(f'\n=== Found at line {i+1} ===')
-        # 打印这一行和后续20行
-        for j in range(0, 25):
-            if i+j < len(lines):
-                print(f'{i+j+1}: {lines[i+j].rstrip()}')
-
+from toolkit import LineFile, lookups
+from toolkit.xref import XrefDB, format_ref
 
+db = XrefDB.open()
 
+# 找到 createTask 函数，打印这一行和后续24行
+with LineFile.open(lookups.DASHBOARD) as lf:
+    for ref in db.definitions('createTask', path=lookups.DASHBOARD):
+        print(f'\nFound at line {ref.lineno}:')
+        for lineno, text in lf.context(ref.lineno, before=0, after=24):
+            print(f'{lineno}: {text}')
 
+# 它被当作哪个属性传下去
+print()
+for ref in db.bound('createTask', path=lookups.DASHBOARD):
+    print(format_ref(ref))
@@ -1,16 +1,10 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
-    
+from toolkit import LineFile, lookups
+
 # 找到 editingTask 相关的代码
 print("=== editingTask state ===")
-for i, line in enumerate(lines[100:110], start=100):
-    print(f'{i+1}: {line.rstrip()}')
+with LineFile.open(lookups.TIMELINE) as lf:
+    for i, text in lf.lines(100, 109):
+        print(f'{i+1}: {text.rstrip()}')
 
 print("\n=== setEditingTask usage ===")
-for i, line in enumerate(lines):
-    if 'setEditingTask' in line:
-        print(f'{i+1}: {line.rstrip()[:150]}')
-
-
-
-
+lookups.main('editing_usage')
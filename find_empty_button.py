@@ -1,5 +1,6 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+from toolkit import lookups, read_lines
+
+lines = read_lines(lookups.TIMELINE)
     
 # 找到空状态按钮
 for i, line in enumerate(lines[3080:3119], start=3080):
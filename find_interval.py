@@ -1,5 +1,7 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+from toolkit import lookups, read_lines
+from toolkit.files import write_text
+
+lines = read_lines(lookups.TIMELINE)
     
 # 找到间隔按钮
 for i, line in enumerate(lines):
@@ -7,8 +9,7 @@ for i, line in enumerate(lines):
         print(f'{i+1}: {line.rstrip()}')
         # 打印前后10行
         if 'button' in line.lower() or 'onClick' in lines[max(0,i-10):i+10].__str__().lower():
-            with open('w:/001jiaweis/22222/temp_interval_button.txt', 'w', encoding='utf-8') as out:
-                out.write(''.join(lines[max(0,i-15):i+25]))
+            write_text('temp_interval_button.txt', ''.join(lines[max(0,i-15):i+25]))
             print(f'Saved context around line {i+1}')
             break
 
@@ -1,5 +1,6 @@
-with open('w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    content = f.read()
+from toolkit import lookups, read_text
+
+content = read_text(lookups.TIMELINE)
 
 # 找到"今日结束"按钮的 onClick 代码
 import re
@@ -2,8 +2,9 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-with open(r'w:\001jiaweis\22222\src\components\calendar\NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups, read_lines
+
+lines = read_lines(lookups.TIMELINE)
 
 # 找到timeBlocks的定义
 for i, line in enumerate(lines):
@@ -1,6 +1,5 @@
 # 修复NewTimelineView.tsx中剩余的所有乱码注释
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from toolkit.aho import Replacer
 
 # 更全面的乱码替换
 replacements = {
@@ -35,20 +34,10 @@ replacements = {
     '����������֤': '启用任务验证',
 }
 
-for old, new in replacements.items():
-    content = content.replace(old, new)
-
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+# 整张表编译成一个自动机，一遍扫描、最左最长替换，结果与表中顺序无关
+hits = Replacer(replacements).apply_file('src/components/calendar/NewTimelineView.tsx')
 
+for old, count in hits.items():
+    print(f"  {old[:20]} -> {replacements[old]}: {count} 处")
 print("所有乱码修复完成！")
-print(f"共修复 {len(replacements)} 处乱码")
-
-
-
-
-
-
-
-
+print(f"共修复 {sum(hits.values())} 处乱码（{len(hits)}/{len(replacements)} 条规则命中）")
@@ -1,6 +1,6 @@
 # 修复NewTimelineView.tsx中的乱码注释
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from toolkit.aho import Replacer
+from toolkit.stream import rewrite
 
 # 替换所有乱码注释为正确的中文
 replacements = {
@@ -24,20 +24,11 @@ replacements = {
     '����ϴ�ͼƬ��֧�ֶ�ѡ��': '点击上传图片（支持多选）',
 }
 
-for old, new in replacements.items():
-    content = content.replace(old, new)
-
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+# 整张表编译成一个自动机，一遍扫描、最左最长替换，结果与表中顺序无关；
+# 按块流式读写，内存占用与文件大小无关
+hits = rewrite('src/components/calendar/NewTimelineView.tsx', replacer=Replacer(replacements)).hits
 
+for old, count in hits.items():
+    print(f"  {old[:20]} -> {replacements[old]}: {count} 处")
 print("乱码修复完成！")
-print(f"共修复 {len(replacements)} 处乱码")
-
-
-
-
-
-
-
-
+print(f"共修复 {sum(hits.values())} 处乱码（{len(hits)}/{len(replacements)} 条规则命中）")
@@ -1,40 +1,23 @@
-import codecs
+from toolkit import lookups
+from toolkit.files import read_bytes
+from toolkit.mojibake import repair_file, scan
 
-filepath = 'w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx'
+filepath = lookups.TIMELINE
 
-# 读取文件
-with codecs.open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+# 在原始字节上检测乱码（不再用 errors='ignore' 读文件，坏字节不会丢）
+findings = scan(read_bytes(filepath))
 
-# 查找并替换乱码行
-fixed_lines = []
-changes = 0
-for i, line in enumerate(lines, 1):
-    # 检查是否包含乱码
-    if '����' in line or '��' in line:
-        # 如果是注释行，替换为空注释或合适的注释
-        if line.strip().startswith('//'):
-            fixed_line = '  // 任务状态\n' if '����״̬' in line else line.replace('����', '').replace('��', '')
-            fixed_lines.append(fixed_line)
-            changes += 1
-            print(f'Line {i}: Fixed encoding issue')
-        else:
-            # 非注释行，只删除乱码字符
-            fixed_line = line.replace('����', '').replace('��', '')
-            fixed_lines.append(fixed_line)
-            changes += 1
-            print(f'Line {i}: Removed garbled characters')
-    else:
-        fixed_lines.append(line)
+# 能按 GBK⇄UTF-8 往返恢复的段原地写回，其余字节不动
+changes = repair_file(filepath)
+for f in changes:
+    print(f'Line {f.lineno}: Fixed encoding issue -> {f.after}')
 
-# 写回文件
-if changes > 0:
-    with codecs.open(filepath, 'w', encoding='utf-8') as f:
-        f.writelines(fixed_lines)
-    print(f'Total changes: {changes}')
+# 原字节已经丢失（U+FFFD）的段只报告，交给对照表处理
+for f in findings:
+    if f.after is None:
+        print(f'Line {f.lineno}: Unrecoverable, left as is: {f.before}')
+
+if changes:
+    print(f'Total changes: {len(changes)}')
 else:
     print('No changes needed')
-
-
-
-
@@ -1,38 +1,34 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import sys
 
-filepath = 'w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx'
+from toolkit import lookups
+from toolkit.aho import Replacer
+from toolkit.stream import rewrite
 
-# 读取文件（二进制模式）
-with open(filepath, 'rb') as f:
-    content = f.read()
-
-# 转换为字符串
-text = content.decode('utf-8', errors='ignore')
+filepath = lookups.TIMELINE
 
 # 修复已知问题
-# 1. 删除 `r`n
-text = text.replace('`r`n', '')
-
-# 2. 替换乱码注释
-text = text.replace('// ����״̬', '// 任务状态')
-text = text.replace('// ������֤������', '// 正在验证的任务')
-text = text.replace('// ��֤����', '// 验证类型')
-text = text.replace('// ������֤��ʱ���', '// 任务验证超时状态')
-text = text.replace('// �����֤��ʱ���', '// 任务验证超时状态')
-text = text.replace('// ����ʵ������ʱ��', '// 任务实际开始时间')
-
-# 删除所有其他乱码字符（保留ASCII和中文）
-import re
-# 只保留ASCII、中文、常见标点和空白字符
-# text = re.sub(r'[^\x00-\x7F\u4e00-\u9fff\u3000-\u303f\uff00-\uffef\s]', '', text)
-
-# 写回文件
-with open(filepath, 'w', encoding='utf-8', newline='\n') as f:
-    f.write(text)
-
-print('Fixed NewTimelineView.tsx')
-
-
-
-
+replacements = {
+    # 1. 删除 `r`n
+    '`r`n': '',
+    # 2. 替换乱码注释
+    '// ����״̬': '// 任务状态',
+    '// ������֤������': '// 正在验证的任务',
+    '// ��֤����': '// 验证类型',
+    '// ������֤��ʱ���': '// 任务验证超时状态',
+    '// �����֤��ʱ���': '// 任务验证超时状态',
+    '// ����ʵ������ʱ��': '// 任务实际开始时间',
+}
+
+# 分块流式处理，一遍完成上面的替换；坏字节原样保留（不再 errors='ignore'），写入经临时文件原子替换。
+# 默认只做上面列出的替换；加 --repair 才额外按 GBK⇄UTF-8 往返启发式修复其余乱码
+repair = '--repair' in sys.argv[1:]
+result = rewrite(filepath, replacer=Replacer(replacements), repair=repair)
+
+for f in result.repaired:
+    print(f'Line {f.lineno}: {f.before!r} -> {f.after}')
+for old, count in result.hits.items():
+    print(f'{old!r} -> {replacements[old]!r}: {count}')
+
+print('Fixed NewTimelineView.tsx' if result.changed else 'No changes needed')
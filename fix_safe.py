@@ -1,29 +1,24 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import re
+from toolkit import lookups
+from toolkit.files import read_bytes, write_bytes
+from toolkit.mojibake import repair_bytes, scan
 
-filepath = 'w:/001jiaweis/22222/src/components/calendar/NewTimelineView.tsx'
+filepath = lookups.TIMELINE
 
-# 读取文件
-with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+# 读取原始字节：乱码段先按 GBK⇄UTF-8 往返修复（只改能恢复的段），再按行处理
+data = read_bytes(filepath)
+data, repaired = repair_bytes(data, scan(data))
+fixes = len(repaired)
+for f in repaired:
+    print(f"Line {f.lineno}: Fixed comment -> {f.after}")
+
+lines = data.decode('utf-8', errors='surrogateescape').splitlines(keepends=True)
 
 # 修复每一行
 fixed_lines = []
-fixes = 0
 
 for i, line in enumerate(lines, 1):
-    original_line = line
-    
-    # 只修复注释行中的乱码
-    if line.strip().startswith('//'):
-        # 替换常见的乱码注释
-        if '����' in line or '��' in line:
-            # 删除乱码，保留注释符号
-            line = '  // \n'
-            fixes += 1
-            print(f"Line {i}: Fixed comment")
-    
     # 修复特定的已知问题
     if '`r`n' in line:
         line = line.replace('`r`n', '\n')
@@ -38,13 +33,9 @@ for i, line in enumerate(lines, 1):
     
     fixed_lines.append(line)
 
-# 写回文件
-with open(filepath, 'w', encoding='utf-8', newline='\n') as f:
-    f.writelines(fixed_lines)
+# 写回文件（坏字节原样写回）
+if fixes:
+    write_bytes(filepath, ''.join(fixed_lines).encode('utf-8', errors='surrogateescape'))
 
 print(f"\nTotal fixes: {fixes}")
 print("Fixed NewTimelineView.tsx")
-
-
-
-
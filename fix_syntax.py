@@ -1,21 +1,10 @@
 # 修复第1964行的语法错误
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
 
-# 修复第1964行（索引1963）
-lines[1963] = "                      <div className={`flex items-center ${isMobile ? 'gap-1' : 'gap-1.5'}`}>\n"
-
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+# 修复第1964行；提交前做结构检查，这一行写坏时不会落盘
+with Transaction(lookups.TIMELINE) as tx:
+    tx.replace_lines(1964, 1964, "                      <div className={`flex items-center ${isMobile ? 'gap-1' : 'gap-1.5'}`}>\n")
 
 print("语法错误已修复！")
 print(f"第1964行已修复")
-
-
-
-
-
-
-
-
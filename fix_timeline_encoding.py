@@ -2,16 +2,11 @@
 # -*- coding: utf-8 -*-
 """修复 NewTimelineView.tsx 文件中的中文乱码"""
 
-import re
+from toolkit.aho import Replacer
 
-# 读取文件
 file_path = 'src/components/calendar/NewTimelineView.tsx'
 
 try:
-    # 尝试用 UTF-8 读取
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
     # 定义需要替换的乱码和对应的正确中文
     replacements = [
         ('����Ƿ�Ϊ�ƶ��豸', '检测是否为移动设备'),
@@ -42,18 +37,13 @@ try:
         ('������ - ��ɫϵ', '学习类 - 蓝色系'),
     ]
     
-    # 执行替换
-    modified = False
-    for old, new in replacements:
-        if old in content:
-            content = content.replace(old, new)
-            modified = True
-            print(f'替换: {old[:20]}... -> {new[:20]}...')
+    # 执行替换：一遍扫描完成整张表（最左最长），坏字节原样保留
+    fixer = Replacer(replacements)
+    hits = fixer.apply_file(file_path)
+    for old, count in hits.items():
+        print(f'替换: {old[:20]}... -> {fixer.table[old][:20]}... ({count} 处)')
     
-    if modified:
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+    if hits:
         print(f'\n✓ 文件已修复并保存: {file_path}')
     else:
         print('未找到需要替换的乱码')
@@ -1,38 +1,46 @@
 # 精确集成倒计时系统到 NewTimelineView.tsx
-import re
-
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+# 锚点按 token 序列匹配（与缩进、换行无关，不会回溯），所有插入在一个编辑事务里完成、只写一次
+# 每一步都是一个补丁：已经生效的步骤（包括用 step1~6 做过的）由补丁账本跳过，重复运行不会重复插入
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import SafePattern, TokenPattern
+
+import step1_imports
+import step2_states
+import step3_handlers
+import step4_start_adjust
+import step5_complete_adjust
 
 # 步骤1：添加导入语句
-import_pattern = r"(import \{ baiduImageRecognition \} from '@/services/baiduImageRecognition';)"
-import_addition = r"""\1
-import StartVerificationCountdown from '@/components/countdown/StartVerificationCountdown';
-import FinishVerificationCountdown from '@/components/countdown/FinishVerificationCountdown';
-import { 
-  adjustTaskStartTime, 
-  adjustTaskEndTime, 
-  calculateActualDuration 
-} from '@/utils/timelineAdjuster';
-import { 
-  calculateActualGoldReward, 
-  smartDetectTaskPosture 
-} from '@/utils/goldCalculator';"""
-
-content = re.sub(import_pattern, import_addition, content)
+import_anchor = TokenPattern("import { baiduImageRecognition } from '@/services/baiduImageRecognition';")
+
+
+def add_imports(tx: Transaction) -> None:
+    # 只补还缺的名字（与 step1 同一份清单），已导入的不会再出现一次
+    addition = ''.join(step1_imports.import_lines(step1_imports.missing(tx.original)))
+    if not addition:
+        return
+    for m in import_anchor.finditer(tx.original):
+        tx.insert(m.end, '\n' + addition.rstrip('\n'))
+
 
 # 步骤2：添加状态管理
-state_pattern = r"(const \[verifyingType, setVerifyingType\] = useState<'start' \| 'complete' \| null>\(null\);.*?)"
-state_addition = r"""\1
+state_anchor = TokenPattern("const [verifyingType, setVerifyingType] = useState<'start' | 'complete' | null>(null);")
+state_addition = """
   const [taskStartTimeouts, setTaskStartTimeouts] = useState<Record<string, boolean>>({});
   const [taskFinishTimeouts, setTaskFinishTimeouts] = useState<Record<string, boolean>>({});
   const [taskActualStartTimes, setTaskActualStartTimes] = useState<Record<string, Date>>({});"""
 
-content = re.sub(state_pattern, state_addition, content, flags=re.DOTALL)
+
+def add_states(tx: Transaction) -> None:
+    for m in state_anchor.finditer(tx.original):
+        tx.insert(m.end, state_addition)
+
 
 # 步骤3：添加超时处理函数
-handler_pattern = r"(const handleStartTask = async \(taskId: string\) => \{)"
-handler_addition = r"""// 启动验证超时处理
+handler_anchor = TokenPattern("const handleStartTask = async (taskId: string) => {")
+handler_addition = """// 启动验证超时处理
   const handleStartVerificationTimeout = (taskId: string) => {
     setTaskStartTimeouts(prev => ({ ...prev, [taskId]: true }));
     console.log(`任务 ${taskId} 启动验证超时，完成时将扣除30%金币`);
@@ -44,42 +52,63 @@ handler_addition = r"""// 启动验证超时处理
     console.log(`任务 ${taskId} 完成超时，将无金币奖励`);
   };
 
-  \1"""
+  """
+
+
+def add_handlers(tx: Transaction) -> None:
+    for m in handler_anchor.finditer(tx.original):
+        tx.insert(m.start, handler_addition)
 
-content = re.sub(handler_pattern, handler_addition, content)
+
+# 步骤4/5 的锚点后面必须紧跟一行注释（原来的 `\n(\s+// )`）
+next_line_comment = SafePattern(r'\n\s+// ')
 
 # 步骤4：在启动验证通过后添加时间轴调整
-start_pattern = r"(startPenaltyGold: totalPenalty,.*?\n\s+\},\n\s+\}\)\);)\n(\s+// )"
-start_addition = r"""\1
+start_anchor = TokenPattern("startPenaltyGold: totalPenalty, $$$ }, }));")
+start_addition = """
           
           // 记录实际启动时间并调整时间轴位置
           setTaskActualStartTimes(prev => ({ ...prev, [taskId]: now }));
           adjustTaskStartTime(taskId, now, allTasks, onTaskUpdate);
-          
-\2"""
+          """
+
+
+def add_start_adjust(tx: Transaction) -> None:
+    for m in start_anchor.finditer(tx.original):
+        if next_line_comment.match(tx.original, m.end):
+            tx.insert(m.end, start_addition)
 
-content = re.sub(start_pattern, start_addition, content, flags=re.DOTALL)
 
 # 步骤5：在完成验证通过后添加时间轴调整
-complete_pattern = r"(completionGoldEarned: finalGold,\n\s+\},\n\s+\}\)\);)\n(\s+// )"
-complete_addition = r"""\1
+complete_anchor = TokenPattern("completionGoldEarned: finalGold, }, }));")
+complete_addition = """
           
           // 调整任务结束时间
           adjustTaskEndTime(taskId, now, allTasks, onTaskUpdate);
-          
-\2"""
+          """
+
+
+def add_complete_adjust(tx: Transaction) -> None:
+    for m in complete_anchor.finditer(tx.original):
+        if next_line_comment.match(tx.original, m.end):
+            tx.insert(m.end, complete_addition)
+
 
-content = re.sub(complete_pattern, complete_addition, content, flags=re.DOTALL)
+# 与 step1~5 用同样的「已生效」判断：两套脚本做过任意一套，另一套都会跳过
+PATCHES = [
+    Patch('integrate_countdown:imports', add_imports, step1_imports.imports_done),
+    Patch('integrate_countdown:states', add_states, step2_states.MARKER),
+    Patch('integrate_countdown:handlers', add_handlers, step3_handlers.MARKER),
+    Patch('integrate_countdown:start_adjust', add_start_adjust, step4_start_adjust.MARKER),
+    Patch('integrate_countdown:complete_adjust', add_complete_adjust, step5_complete_adjust.MARKER),
+]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+if __name__ == '__main__':
+    statuses = run_patches(lookups.TIMELINE, PATCHES)
 
-print("Integration completed!")
-print("Added:")
-print("1. Import statements")
-print("2. State management")
-print("3. Timeout handlers")
-print("4. Start time adjustment")
-print("5. Complete time adjustment")
+    print("Integration completed!")
+    for i, (label, patch) in enumerate(zip(["Import statements", "State management", "Timeout handlers",
+                                            "Start time adjustment", "Complete time adjustment"],
+                                           PATCHES), 1):
+        print(f"{i}. {label}: {statuses[patch.id]}")
 
@@ -1,22 +1,11 @@
 # 删除有问题的注释行
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8', errors='ignore') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
 
-# 删除或替换有问题的行
-lines[1960] = "                    {/* 完成按钮区域 */}\n"
-lines[1962] = "                      {/* 任务图标 */}\n"
-lines[1964] = "                        {/* AI生成子任务 */}\n"
-
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+# 删除或替换有问题的行（原始文件行号，从 1 开始）；提交前做结构检查，改坏了不写
+with Transaction(lookups.TIMELINE) as tx:
+    tx.replace_lines(1961, 1961, "                    {/* 完成按钮区域 */}\n")
+    tx.replace_lines(1963, 1963, "                      {/* 任务图标 */}\n")
+    tx.replace_lines(1965, 1965, "                        {/* AI生成子任务 */}\n")
 
 print("Fixed!")
-
-
-
-
-
-
-
-
@@ -0,0 +1,29 @@
+# 把 step1~step6 合并成一个编辑事务：只读一次、只写一次 NewTimelineView.tsx
+# 用法：python run_steps.py            执行全部步骤
+#       python run_steps.py 1 2 3      只执行指定步骤
+# 各步骤按锚点定位插入位置，不依赖行号：单独跑过其中几步之后再跑剩下的也不会错位。
+# 已经做过的步骤由补丁账本跳过（toolkit/ledger.py），重复运行不会重复插入。
+import importlib
+import sys
+
+from toolkit import lookups
+from toolkit.ledger import run_patches
+
+STEPS = {
+    1: 'step1_imports',
+    2: 'step2_states',
+    3: 'step3_handlers',
+    4: 'step4_start_adjust',
+    5: 'step5_complete_adjust',
+    6: 'step6_countdown_ui',
+}
+
+selected = [int(arg) for arg in sys.argv[1:]] or sorted(STEPS)
+
+statuses = run_patches(lookups.TIMELINE,
+                       [importlib.import_module(STEPS[step]).PATCH for step in selected])
+
+for step in selected:
+    print(f"Step {step} ({STEPS[step]}): {statuses[STEPS[step]]}")
+applied = [step for step in selected if statuses[STEPS[step]] == 'applied']
+print(f"Steps {', '.join(map(str, applied)) or 'none'} applied, written at most once")
@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-file_path = r'w:\001jiaweis\22222\src\components\calendar\NewTimelineView.tsx'
+from toolkit import lookups, read_lines
+
+file_path = lookups.TIMELINE
 
 print("正在读取文件...")
-with open(file_path, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+lines = read_lines(file_path)
 
 print(f"文件共 {len(lines)} 行")
 
@@ -1,28 +1,73 @@
 # 简单的逐步集成脚本
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
-
-# 步骤1：在第22行后添加导入语句
-insert_pos = 22  # 在 baiduImageRecognition 导入之后
-new_imports = [
-    "import StartVerificationCountdown from '@/components/countdown/StartVerificationCountdown';\n",
-    "import FinishVerificationCountdown from '@/components/countdown/FinishVerificationCountdown';\n",
-    "import { \n",
-    "  adjustTaskStartTime, \n",
-    "  adjustTaskEndTime, \n",
-    "  calculateActualDuration \n",
-    "} from '@/utils/timelineAdjuster';\n",
-    "import { \n",
-    "  calculateActualGoldReward, \n",
-    "  smartDetectTaskPosture \n",
-    "} from '@/utils/goldCalculator';\n",
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import TokenPattern
+from toolkit.xref import file_refs
+
+# 步骤1：在 baiduImageRecognition 导入那一行之后添加导入语句
+# 按锚点定位而不是行号：前面的步骤插入了多少行、单独运行还是经 run_steps.py 运行都一样
+ANCHOR = TokenPattern("import { baiduImageRecognition } from '@/services/baiduImageRecognition';")
+# (模块, 默认导入, 具名导入)
+NEW_IMPORTS = [
+    ('@/components/countdown/StartVerificationCountdown', 'StartVerificationCountdown', ()),
+    ('@/components/countdown/FinishVerificationCountdown', 'FinishVerificationCountdown', ()),
+    ('@/utils/timelineAdjuster', None, ('adjustTaskStartTime', 'adjustTaskEndTime', 'calculateActualDuration')),
+    ('@/utils/goldCalculator', None, ('calculateActualGoldReward', 'smartDetectTaskPosture')),
 ]
+# 应用后来把两个倒计时组件合并成了 TaskVerificationCountdownContent：导入了它就不再要求这两个名字
+SUPERSEDED = {
+    'StartVerificationCountdown': 'TaskVerificationCountdownContent',
+    'FinishVerificationCountdown': 'TaskVerificationCountdownContent',
+}
+# 后续步骤插入的代码都不调用它；文件里也没调用时（应用已删掉这个未用导入）不要求导入
+OPTIONAL = {'calculateActualDuration'}
+
+
+def _refs(text: str, kind: str) -> set[str]:
+    return {r.name for r in file_refs(lookups.TIMELINE, text) if r.kind == kind}
+
+
+def missing(text: str) -> list[str]:
+    """NEW_IMPORTS 里还没有导入（也没有被取代）的名字。"""
+    imported = _refs(text, 'import')
+    called = _refs(text, 'call')
+    names = [name for _module, default, named in NEW_IMPORTS for name in (default, *named) if name]
+    return [name for name in names
+            if name not in imported and SUPERSEDED.get(name) not in imported
+            and not (name in OPTIONAL and name not in called)]
+
+
+def import_lines(names: list[str]) -> list[str]:
+    """只为 names 里的名字生成导入语句，已导入的不会重复出现。"""
+    lines = []
+    for module, default, named in NEW_IMPORTS:
+        if default in names:
+            lines.append(f"import {default} from '{module}';\n")
+        wanted = [name for name in named if name in names]
+        if wanted:
+            lines.append("import { \n")
+            lines.extend(f"  {name}{',' if i < len(wanted) - 1 else ''} \n" for i, name in enumerate(wanted))
+            lines.append(f"}} from '{module}';\n")
+    return lines
+
+
+def imports_done(text: str) -> bool:
+    # 看结果而不是某一行原文：需要的名字都已导入（或已被取代）就算做过了
+    return not missing(text)
+
+
+def edit(tx: Transaction) -> None:
+    tx.insert_lines(tx.lineno(tx.anchor(ANCHOR).end - 1), import_lines(missing(tx.original)))
 
-lines = lines[:insert_pos] + new_imports + lines[insert_pos:]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+PATCH = Patch('step1_imports', edit, imports_done)
 
-print("Step 1 completed: Added imports")
 
+if __name__ == '__main__':
+    # 单独运行时只做这一步（插入位置由锚点决定，先后跑过哪些步骤都不影响）；
+    # 多步一起改用 run_steps.py，只读写一次文件
+    if run_patches(lookups.TIMELINE, [PATCH])[PATCH.id] != 'applied':
+        print("Already applied, skipped")
+        raise SystemExit
+    print("Step 1 completed: Added imports")
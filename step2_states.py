@@ -1,20 +1,31 @@
 # 步骤2：添加状态管理
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import TokenPattern
 
-# 在第94行后添加新状态
-insert_pos = 94
-new_states = [
+# 在 verifyingType 状态那一行之后添加新状态（按锚点定位，与前面步骤插入的行数无关）
+ANCHOR = TokenPattern("const [verifyingType, setVerifyingType] = useState<'start' | 'complete' | null>(null);")
+NEW_STATES = [
     "  const [taskStartTimeouts, setTaskStartTimeouts] = useState<Record<string, boolean>>({}); // 启动验证超时标记\n",
     "  const [taskFinishTimeouts, setTaskFinishTimeouts] = useState<Record<string, boolean>>({}); // 完成验证超时标记\n",
     "  const [taskActualStartTimes, setTaskActualStartTimes] = useState<Record<string, Date>>({}); // 任务实际启动时间\n",
 ]
+# 文件里已经有这一行就说明本步骤做过了，重复运行不会再插一份
+MARKER = 'const [taskStartTimeouts, setTaskStartTimeouts]'
 
-lines = lines[:insert_pos] + new_states + lines[insert_pos:]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+def edit(tx: Transaction) -> None:
+    tx.insert_lines(tx.lineno(tx.anchor(ANCHOR).end - 1), NEW_STATES)
 
-print("Step 2 completed: Added state management")
 
+PATCH = Patch('step2_states', edit, MARKER)
+
+
+if __name__ == '__main__':
+    # 单独运行时只做这一步（插入位置由锚点决定，先后跑过哪些步骤都不影响）；
+    # 多步一起改用 run_steps.py，只读写一次文件
+    if run_patches(lookups.TIMELINE, [PATCH])[PATCH.id] != 'applied':
+        print("Already applied, skipped")
+        raise SystemExit
+    print("Step 2 completed: Added state management")
@@ -1,10 +1,12 @@
 # 步骤3：添加超时处理函数
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import TokenPattern
 
-# 在第805行后（handleStartTask之前）添加超时处理函数
-insert_pos = 805
-new_handlers = [
+# 在 handleStartTask 定义那一行之前添加超时处理函数（按锚点定位，与前面步骤插入的行数无关）
+ANCHOR = TokenPattern("const handleStartTask = async (taskId: string) => {")
+NEW_HANDLERS = [
     "  // 启动验证超时处理\n",
     "  const handleStartVerificationTimeout = (taskId: string) => {\n",
     "    setTaskStartTimeouts(prev => ({ ...prev, [taskId]: true }));\n",
@@ -18,12 +20,21 @@ new_handlers = [
     "  };\n",
     "\n",
 ]
+# 文件里已经有这一行就说明本步骤做过了，重复运行不会再插一份
+MARKER = 'const handleStartVerificationTimeout = (taskId: string) => {'
 
-lines = lines[:insert_pos] + new_handlers + lines[insert_pos:]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+def edit(tx: Transaction) -> None:
+    tx.insert_lines(tx.lineno(tx.anchor(ANCHOR).start) - 1, NEW_HANDLERS)
 
-print("Step 3 completed: Added timeout handlers")
 
+PATCH = Patch('step3_handlers', edit, MARKER)
+
+
+if __name__ == '__main__':
+    # 单独运行时只做这一步（插入位置由锚点决定，先后跑过哪些步骤都不影响）；
+    # 多步一起改用 run_steps.py，只读写一次文件
+    if run_patches(lookups.TIMELINE, [PATCH])[PATCH.id] != 'applied':
+        print("Already applied, skipped")
+        raise SystemExit
+    print("Step 3 completed: Added timeout handlers")
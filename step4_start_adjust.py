@@ -1,21 +1,32 @@
 # 步骤4：在启动验证通过后添加时间轴调整
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import TokenPattern
 
-# 在第1022行后添加
-insert_pos = 1022
-new_code = [
+# 在启动验证通过后更新验证状态的 `}));` 那一行之后添加（按锚点定位，与前面步骤插入的行数无关）
+ANCHOR = TokenPattern("startPenaltyGold: totalPenalty, $$$ }, }));")
+NEW_CODE = [
     "            \n",
     "          // 记录实际启动时间并调整时间轴位置\n",
     "          setTaskActualStartTimes(prev => ({ ...prev, [taskId]: now }));\n",
     "          adjustTaskStartTime(taskId, now, allTasks, onTaskUpdate);\n",
 ]
+# 文件里已经有这一行就说明本步骤做过了，重复运行不会再插一份
+MARKER = 'adjustTaskStartTime(taskId, now, allTasks, onTaskUpdate);'
 
-lines = lines[:insert_pos] + new_code + lines[insert_pos:]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+def edit(tx: Transaction) -> None:
+    tx.insert_lines(tx.lineno(tx.anchor(ANCHOR).end - 1), NEW_CODE)
 
-print("Step 4 completed: Added start time adjustment")
 
+PATCH = Patch('step4_start_adjust', edit, MARKER)
+
+
+if __name__ == '__main__':
+    # 单独运行时只做这一步（插入位置由锚点决定，先后跑过哪些步骤都不影响）；
+    # 多步一起改用 run_steps.py，只读写一次文件
+    if run_patches(lookups.TIMELINE, [PATCH])[PATCH.id] != 'applied':
+        print("Already applied, skipped")
+        raise SystemExit
+    print("Step 4 completed: Added start time adjustment")
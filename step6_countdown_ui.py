@@ -1,10 +1,14 @@
 # 步骤6：在任务卡片中添加倒计时组件
-with open('src/components/calendar/NewTimelineView.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+from toolkit import lookups
+from toolkit.edits import Transaction
+from toolkit.ledger import Patch, run_patches
+from toolkit.patterns import TokenPattern
+from toolkit.tokenizer import text_tokens
 
-# 在第2207行后添加倒计时组件
-insert_pos = 2207
-new_code = [
+# 在任务卡片的启动按钮之前添加倒计时组件（按锚点定位，与前面步骤插入的行数无关）；
+# 紧凑卡片和完整卡片各有一个启动按钮，倒计时放在完整卡片（最后一处）里
+ANCHOR = TokenPattern("{!block.isCompleted && block.status !== 'in_progress' &&")
+NEW_CODE = [
     "\n",
     "                      {/* 倒计时组件 - 仅在启用验证时显示 */}\n",
     "                      {taskVerifications[block.id]?.enabled && (\n",
@@ -34,12 +38,28 @@ new_code = [
     "                        </>\n",
     "                      )}\n",
 ]
+# 看结果而不是某一行原文：任务卡片里已经挂着倒计时组件就算做过了，
+# 包括后来取代这两个组件的 TaskVerificationCountdownContent
+COUNTDOWN_TAGS = {'StartVerificationCountdown', 'FinishVerificationCountdown',
+                  'TaskVerificationCountdownContent'}
 
-lines = lines[:insert_pos] + new_code + lines[insert_pos:]
 
-# 写回文件
-with open('src/components/calendar/NewTimelineView.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+def countdown_mounted(text: str) -> bool:
+    _digest, tokens = text_tokens(text, True)
+    return any(t.kind == 'jsx_name' and t.value in COUNTDOWN_TAGS for t in tokens)
 
-print("Step 6 completed: Added countdown components to task cards")
 
+def edit(tx: Transaction) -> None:
+    tx.insert_lines(tx.lineno(tx.anchor(ANCHOR, nth=-1).start) - 1, NEW_CODE)
+
+
+PATCH = Patch('step6_countdown_ui', edit, countdown_mounted)
+
+
+if __name__ == '__main__':
+    # 单独运行时只做这一步（插入位置由锚点决定，先后跑过哪些步骤都不影响）；
+    # 多步一起改用 run_steps.py，只读写一次文件
+    if run_patches(lookups.TIMELINE, [PATCH])[PATCH.id] != 'applied':
+        print("Already applied, skipped")
+        raise SystemExit
+    print("Step 6 completed: Added countdown components to task cards")
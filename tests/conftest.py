@@ -0,0 +1,18 @@
+"""测试一律把缓存和备份库指到临时目录，不往仓库里的 .toolkit_cache / .toolkit_backups 写东西。"""
+import pytest
+
+from toolkit import backup, cache, paths
+
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    cache_dir = tmp_path / '.toolkit_cache'
+    backup_dir = tmp_path / '.toolkit_backups'
+    # 子进程（跑根目录脚本的测试）从环境变量读；本进程里模块导入时已经读过，直接改模块属性
+    monkeypatch.setenv('TOOLKIT_CACHE_DIR', str(cache_dir))
+    monkeypatch.setenv('TOOLKIT_BACKUP_DIR', str(backup_dir))
+    monkeypatch.setattr(paths, 'CACHE_DIR', cache_dir)
+    monkeypatch.setattr(paths, 'BACKUP_DIR', backup_dir)
+    monkeypatch.setattr(cache, 'CACHE_DIR', cache_dir)
+    monkeypatch.setattr(backup, 'BACKUP_DIR', backup_dir)
+    return cache_dir, backup_dir
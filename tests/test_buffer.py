@@ -0,0 +1,47 @@
+"""PieceTable 的拼接、行号与标记。"""
+from toolkit.buffer import PieceTable
+
+TEXT = 'a\nbb\nccc\n'
+
+
+def test_splices_match_list_edits():
+    buf = PieceTable(TEXT)
+    lines = TEXT.splitlines(keepends=True)
+    buf.splice_lines(1, 1, ['x', 'y'])
+    lines[1:1] = ['x\n', 'y\n']
+    buf.splice_lines(0, 1, 'A\n')
+    lines[0:1] = ['A\n']
+    buf.insert(len(buf), 'tail')
+    lines.append('tail')
+    assert buf.text() == ''.join(lines)
+    assert buf.line_count() == 6
+    assert [text for _i, text in buf.lines()] == [line.rstrip('\n') for line in lines]
+    assert buf.line_of(buf.find('ccc')) == 4
+    assert buf.replace_in_line(3, 'bb', 'BB')
+    assert not buf.replace_in_line(3, 'zz', 'ZZ')
+    assert buf.line(3) == 'BB'
+
+
+def test_markers_follow_edits():
+    buf = PieceTable(TEXT)
+    pos = buf.find('ccc')
+    left, right = buf.marker(pos), buf.marker(pos, 'right')
+    buf.insert(0, '000\n')
+    assert buf.get(left.pos, left.pos + 3) == 'ccc'
+    buf.insert(left.pos, 'new\n')
+    # 在标记所在处插入：left 留在插入文本之前，right 跟到插入文本之后
+    assert buf.get(left.pos, left.pos + 4) == 'new\n'
+    assert buf.get(right.pos, right.pos + 3) == 'ccc'
+    buf.delete(buf.find('bb'), right.pos)
+    assert left.pos == right.pos == buf.find('ccc')
+
+
+def test_commit_writes_once(tmp_path):
+    path = tmp_path / 'a.ts'
+    path.write_text('const a = 1;\n', encoding='utf-8')
+    buf = PieceTable.open(path)
+    assert not buf.commit()
+    assert buf.replace_in_line(0, '1', '2')
+    assert buf.commit()
+    assert path.read_text(encoding='utf-8') == 'const a = 2;\n'
+    assert not buf.commit()
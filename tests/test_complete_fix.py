@@ -0,0 +1,45 @@
+"""complete_fix 按锚点和内容认行：只换确实乱码的行，行号怎么移都一样。"""
+from toolkit.edits import Transaction
+
+import complete_fix
+
+
+def _garble(text: str) -> str:
+    return text.encode('utf-8').decode('gbk', errors='replace')
+
+
+def _card(ai_comment: str, ai_title: str, lead: int = 0) -> str:
+    return '\n' * lead + f"""<div>
+                    {{/* 功能按钮栏 */}}
+                    <div className="flex">
+                      {{/* 左侧功能图标 */}}
+                      <div className="flex items-center gap-1.5">
+                        {ai_comment}
+                        <button
+                          onClick={{() => handleGenerateSubTasks(block.id, block.title, block.description)}}
+                          title="{ai_title}"
+                        >
+                        </button>
+                      </div>
+                    </div>
+</div>
+"""
+
+
+def test_only_garbled_lines_are_replaced(tmp_path):
+    bad = _card('{/* ' + _garble('AI拆解子任务') + ' */}', _garble('AI拆解子任务'), lead=37)
+    assert not complete_fix.fixed(bad)
+    path = tmp_path / 'card.tsx'
+    path.write_text(bad, encoding='utf-8')
+    tx = Transaction(path)
+    complete_fix.edit(tx)
+    assert tx.commit()
+    good = path.read_text(encoding='utf-8')
+    assert good == _card('{/* AI生成子任务 */}', 'AI生成子任务', lead=37)
+    assert complete_fix.fixed(good)
+
+
+def test_clean_card_is_left_alone():
+    text = _card('{/* AI拆解子任务 */}', 'AI拆解子任务')
+    assert complete_fix.fixed(text)
+    assert complete_fix._broken(text) == []
@@ -0,0 +1,58 @@
+"""Transaction 的锚点定位、偏移换算和冲突检测。"""
+import pytest
+
+from toolkit.edits import EditConflict, Transaction
+from toolkit.patterns import TokenPattern
+
+SOURCE = 'start(1);\nfoo(a);\nstart(2);\nbar();\nstart(3);\n'
+
+
+def test_anchor_nth(tmp_path):
+    path = tmp_path / 'a.ts'
+    path.write_text(SOURCE, encoding='utf-8')
+    tx = Transaction(path)
+    pattern = TokenPattern('start($$$);')
+    assert tx.lineno(tx.anchor(pattern).start) == 1
+    assert tx.lineno(tx.anchor(pattern, nth=1).start) == 3
+    assert tx.lineno(tx.anchor(pattern, nth=-1).start) == 5
+    assert tx.lineno(tx.anchor(pattern, nth=-3).start) == 1
+
+
+def test_anchor_missing_raises(tmp_path):
+    path = tmp_path / 'a.ts'
+    path.write_text(SOURCE, encoding='utf-8')
+    tx = Transaction(path)
+    with pytest.raises(LookupError):
+        tx.anchor(TokenPattern('start($$$);'), nth=3)
+    with pytest.raises(LookupError):
+        tx.anchor(TokenPattern('start($$$);'), nth=-4)
+    with pytest.raises(LookupError):
+        tx.anchor(TokenPattern('missing();'))
+
+
+def test_rebase_and_apply(tmp_path):
+    path = tmp_path / 'a.ts'
+    path.write_text(SOURCE, encoding='utf-8')
+    tx = Transaction(path)
+    foo = tx.find('foo')
+    bar = tx.find('bar')
+    tx.insert_lines(0, ['// head'])             # 文件开头插一行
+    tx.replace(foo, foo + 3, 'foooo')           # 同一行内变长
+    tx.delete_lines(5, 5)                       # 删掉最后一行
+    text = tx.apply()
+    assert text == '// head\nstart(1);\nfoooo(a);\nstart(2);\nbar();\n'
+    assert text[tx.rebase(bar):].startswith('bar();')
+    # 落在被替换区间里的偏移映射到替换文本开头
+    assert tx.rebase(foo + 1) == text.index('foooo')
+    assert tx.rebase(len(SOURCE)) == len(text)
+
+
+def test_overlapping_edits_conflict(tmp_path):
+    path = tmp_path / 'a.ts'
+    path.write_text(SOURCE, encoding='utf-8')
+    tx = Transaction(path)
+    tx.replace_lines(1, 2, 'x\n')
+    tx.replace_lines(2, 3, 'y\n')
+    with pytest.raises(EditConflict):
+        tx.apply()
+    assert path.read_text(encoding='utf-8') == SOURCE
@@ -0,0 +1,67 @@
+"""Ledger.run 的状态流转：applied → skipped，发现时已生效记 satisfied，改不动记 unverified。"""
+import os
+
+from toolkit import backup
+from toolkit.ledger import Ledger, Patch
+
+SOURCE = 'const a = 1;\n'
+
+
+def _add_b(tx):
+    tx.insert_lines(1, ['const b = 2;'])
+
+
+ADD_B = Patch('add_b', _add_b, 'const b = 2;')
+
+
+def _file(tmp_path, text=SOURCE):
+    path = tmp_path / 'a.ts'
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_applied_then_skipped(tmp_path, isolated_dirs):
+    path = _file(tmp_path)
+    ledger = Ledger()
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'applied'}
+    assert path.read_text(encoding='utf-8') == SOURCE + 'const b = 2;\n'
+    # 改写前的原文进了（临时目录里的）备份库
+    [snap] = backup.history(path)
+    assert snap.patches == ('add_b',)
+    assert backup.load(snap.hash) == SOURCE.encode('utf-8')
+
+    # stat 没变：直接跳过，不再读文件
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'skipped'}
+    # 只是 touch 过：内容哈希仍等于记录的输出，照样跳过
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'skipped'}
+    assert path.read_text(encoding='utf-8') == SOURCE + 'const b = 2;\n'
+    assert (isolated_dirs[1] / backup.LOG_NAME).exists()
+
+
+def test_satisfied_when_already_present(tmp_path):
+    path = _file(tmp_path, SOURCE + 'const b = 2;\n')
+    before = os.stat(path).st_mtime_ns
+    ledger = Ledger()
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'satisfied'}
+    assert os.stat(path).st_mtime_ns == before
+    assert ledger.get('add_b', path).status == 'satisfied'
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'skipped'}
+
+
+def test_unverified_is_not_recorded(tmp_path):
+    path = _file(tmp_path)
+    wrong = Patch('wrong', _add_b, 'const c = 3;')
+    ledger = Ledger()
+    assert ledger.run(path, [wrong]) == {'wrong': 'unverified'}
+    assert ledger.get('wrong', path) is None
+
+
+def test_external_edit_reopens_patch(tmp_path):
+    path = _file(tmp_path)
+    ledger = Ledger()
+    ledger.run(path, [ADD_B])
+    path.write_text(SOURCE, encoding='utf-8')   # 别人把改动撤掉了
+    assert ledger.run(path, [ADD_B]) == {'add_b': 'applied'}
+    assert path.read_text(encoding='utf-8') == SOURCE + 'const b = 2;\n'
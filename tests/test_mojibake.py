@@ -0,0 +1,22 @@
+"""乱码修复的置信度：只修了半段的结果不能达到自动修复的门槛。"""
+from toolkit import mojibake
+
+
+def _garble(text: str) -> bytes:
+    # UTF-8 字节被当成 GBK 读出来、再按 UTF-8 存盘；半个字符变成 U+FFFD
+    return text.encode('utf-8').decode('gbk', errors='replace').encode('utf-8')
+
+
+def test_whole_misread_is_repaired():
+    data = b'// ' + _garble('完成按钮区域') + b'\n'
+    new, applied = mojibake.repair_bytes(data, mojibake.scan(data))
+    assert new == '// 完成按钮区域\n'.encode('utf-8')
+    assert [f.kind for f in applied] == ['utf8_as_gbk']
+
+
+def test_trimmed_misread_is_not_auto_repaired():
+    data = b'// ' + _garble('开始验证任务') + b'\n'
+    found = [f for f in mojibake.scan(data) if f.kind == 'utf8_as_gbk']
+    assert found and all(f.confidence < mojibake.MIN_CONFIDENCE for f in found)
+    new, applied = mojibake.repair_bytes(data, mojibake.scan(data))
+    assert new == data and applied == []
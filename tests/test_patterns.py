@@ -0,0 +1,18 @@
+"""TokenPattern 的匹配偏移必须落在调用方传入的文本上。"""
+from toolkit.patterns import TokenPattern
+
+# 截断的 4 字节序列：surrogateescape 解码是 3 个代理字符，'replace' 解码只有一个 U+FFFD
+SOURCE = b'const a = "\xf0\x9f\x98";\nfoo(1);\n'
+
+
+def test_offsets_index_surrogateescape_text():
+    text = SOURCE.decode('utf-8', errors='surrogateescape')
+    m = TokenPattern('foo($$$)').search(text)
+    assert m is not None
+    assert text[m.start:m.end] == 'foo(1)'
+
+
+def test_offsets_on_valid_text():
+    text = 'const a = "ok";\nfoo(bar(1), 2);\n'
+    m = TokenPattern('foo($$$)').search(text)
+    assert text[m.start:m.end] == 'foo(bar(1), 2)'
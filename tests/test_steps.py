@@ -0,0 +1,40 @@
+"""step1~6 的「已生效」判断看的是结果：在当前的时间轴文件上重跑 run_steps.py 不应写任何东西。"""
+import subprocess
+import sys
+
+from toolkit import lookups
+from toolkit.paths import REPO_ROOT, resolve
+
+import step1_imports
+import step6_countdown_ui
+
+
+def test_run_steps_writes_nothing_on_current_timeline():
+    path = resolve(lookups.TIMELINE)
+    before = path.read_bytes()
+    try:
+        out = subprocess.run([sys.executable, 'run_steps.py'], cwd=REPO_ROOT, check=True,
+                             capture_output=True, text=True, encoding='utf-8').stdout
+    finally:
+        after = path.read_bytes()
+        if after != before:
+            path.write_bytes(before)
+    assert after == before
+    assert 'Steps none applied' in out
+
+
+def test_step1_adds_only_missing_bindings():
+    text = resolve(lookups.TIMELINE).read_text(encoding='utf-8')
+    assert step1_imports.imports_done(text)
+    # 去掉 adjustTaskEndTime 的导入：只补这一个，已导入的名字不会再出现一次
+    text = text.replace('  adjustTaskStartTime, \n  adjustTaskEndTime\n', '  adjustTaskStartTime\n', 1)
+    assert step1_imports.missing(text) == ['adjustTaskEndTime']
+    assert step1_imports.import_lines(['adjustTaskEndTime']) == [
+        'import { \n', '  adjustTaskEndTime \n', "} from '@/utils/timelineAdjuster';\n"]
+
+
+def test_step6_accepts_the_replacement_component():
+    assert step6_countdown_ui.countdown_mounted('<TaskVerificationCountdownContent taskId={id} />')
+    assert step6_countdown_ui.countdown_mounted('<StartVerificationCountdown taskId={id} />')
+    # 只在注释里提到不算
+    assert not step6_countdown_ui.countdown_mounted('{/* TaskVerificationCountdownContent */}')
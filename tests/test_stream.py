@@ -0,0 +1,61 @@
+"""分块流式改写必须与整份处理逐字节一致，不管块在哪里切开。"""
+import random
+
+import pytest
+
+from toolkit import stream
+from toolkit.aho import Replacer
+from toolkit.mojibake import repair_bytes, scan
+
+TABLE = {
+    '`r`n': '',
+    '// 任务状态': '// 状态',
+    '任务': 'task',
+    'abcabd': 'X',
+    'abc': 'Y',
+}
+
+
+def _garble(text: str) -> bytes:
+    return text.encode('utf-8').decode('gbk', errors='replace').encode('utf-8')
+
+
+def _sample(rng: random.Random) -> bytes:
+    parts = [
+        b'const a = 1;`r`n', '// 任务状态\n'.encode('utf-8'), b'// ' + _garble('完成按钮区域') + b'\n',
+        b'abcabd abcab abc\n', '中文任务任务\n'.encode('utf-8'), b'bad \xe5\xae\xff bytes\n',
+        b'// ' + _garble('开始验证任务') + b'\n', b'`r`n`r', b'\n',
+    ]
+    return b''.join(rng.choice(parts) for _ in range(60))
+
+
+def _whole(data: bytes, repair: bool) -> tuple[bytes, dict[str, int]]:
+    if repair:
+        data, _applied = repair_bytes(data, scan(data))
+    text, hits = Replacer(TABLE).subn(data.decode('utf-8', errors='surrogateescape'))
+    return text.encode('utf-8', errors='surrogateescape'), hits
+
+
+@pytest.mark.parametrize('repair', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_random_chunks_match_whole_file(tmp_path, monkeypatch, seed, repair):
+    rng = random.Random(seed)
+    data = _sample(rng)
+
+    def random_chunks(path, chunk_size):
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(rng.randint(1, 9))
+                if not chunk:
+                    return
+                yield chunk
+
+    monkeypatch.setattr(stream, '_read_chunks', random_chunks)
+    path = tmp_path / 'sample.tsx'
+    path.write_bytes(data)
+    result = stream.rewrite(path, replacer=Replacer(TABLE), repair=repair)
+
+    expected, hits = _whole(data, repair)
+    assert path.read_bytes() == expected
+    assert result.hits == {k: v for k, v in hits.items() if v}
+    assert result.changed == (expected != data or bool(result.hits))
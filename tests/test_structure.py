@@ -0,0 +1,41 @@
+"""structure 检查与编辑坐标一致：文件里有坏的 UTF-8 字节时也不能误报、漏报。"""
+import pytest
+
+from toolkit.edits import Transaction
+from toolkit.structure import StructureError, check_edits
+
+# 截断的 4 字节序列：surrogateescape 解码是 3 个代理字符，'replace' 解码只有一个 U+FFFD
+SOURCE = b'const a = "\xf0\x9f\x98";\nfunction f() {\n  const g = () => {\n    return 1;\n  };\n}\n'
+
+
+def _write(tmp_path, data=SOURCE):
+    path = tmp_path / 'x.ts'
+    path.write_bytes(data)
+    return path
+
+
+def test_edit_after_invalid_utf8_is_accepted(tmp_path):
+    path = _write(tmp_path)
+    tx = Transaction(path)
+    pos = tx.find('return 1;')
+    tx.replace(pos, pos + len('return 1;'), 'return 2;')
+    assert tx.commit()
+    assert path.read_bytes() == SOURCE.replace(b'return 1;', b'return 2;')
+
+
+def test_broken_edit_after_invalid_utf8_is_refused(tmp_path):
+    path = _write(tmp_path)
+    tx = Transaction(path)
+    pos = tx.find('return 1;')
+    tx.replace(pos, pos + len('return 1;'), 'return (1;')
+    with pytest.raises(StructureError):
+        tx.commit()
+    assert path.read_bytes() == SOURCE
+
+
+def test_check_edits_uses_surrogateescape_offsets():
+    original = SOURCE.decode('utf-8', errors='surrogateescape')
+    pos = original.index('return 1;')
+    assert check_edits(original, [(pos, pos + len('return 1;'), 'return 2;')], jsx=False) == []
+    problems = check_edits(original, [(pos, pos, '{')], jsx=False)
+    assert problems
@@ -0,0 +1,37 @@
+"""sync() 不能漏掉后台线程已经读走、还没并入待处理集合的事件。"""
+import threading
+import time
+
+import pytest
+
+from toolkit import watch
+
+pytestmark = pytest.mark.skipif(watch._libc() is None, reason='需要 inotify')
+
+
+class _SlowClock:
+    """后台线程读到事件后第一次取时间时停一会儿：正好卡在 os.read 和解析之间。"""
+
+    def __init__(self):
+        self.reading = threading.Event()
+
+    def monotonic(self):
+        if threading.current_thread().name == 'toolkit-watch' and not self.reading.is_set():
+            self.reading.set()
+            time.sleep(0.2)
+        return time.monotonic()
+
+
+def test_sync_waits_for_events_being_read(tmp_path, monkeypatch):
+    watcher = watch.Watcher([str(tmp_path)])
+    gen = watcher.sync()
+    clock = _SlowClock()
+    monkeypatch.setattr(watch, 'time', clock)
+    watcher.start()
+    try:
+        (tmp_path / 'a.ts').write_text('x', encoding='utf-8')
+        assert clock.reading.wait(2)
+        _gen, changed = watcher.changes_since(gen)
+        assert changed == {(tmp_path / 'a.ts').as_posix()}
+    finally:
+        watcher.close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""toolkit 守护进程的瘦客户端：只用标准库里的 socket/json，不 import toolkit。
+
+    python tk.py grep -F handleStartTask       等价于 python -m toolkit grep ...
+    python tk.py find_button.py                在守护进程里执行脚本
+    python tk.py - < commands.txt              一行一个命令，共用一个连接
+    python tk.py --time lookup --all           在 stderr 上打印服务端耗时
+
+守护进程没在运行时自动启动它（python -m toolkit daemon start 的后台版本）。
+"""
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('TOOLKIT_CACHE_DIR', os.path.join(ROOT, '.toolkit_cache'))
+SOCKET_PATH = os.environ.get('TOOLKIT_SOCKET', os.path.join(CACHE_DIR, 'daemon.sock'))
+RESTART_CODE = 75
+
+
+def to_request(words):
+    if words and words[0].endswith('.py'):
+        return {'script': words[0], 'args': words[1:], 'cwd': os.getcwd()}
+    return {'argv': words}
+
+
+def connect():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+        return sock
+    except OSError:
+        sock.close()
+    subprocess.Popen([sys.executable, '-m', 'toolkit', 'daemon', 'run'], cwd=ROOT,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(SOCKET_PATH)
+            return sock
+        except OSError:
+            sock.close()
+    sys.exit('守护进程没有启动起来，试试 python -m toolkit daemon run 看报错')
+
+
+def run(requests, show_time=False):
+    code = 0
+    pending = list(requests)
+    while pending:
+        sock = connect()
+        with sock, sock.makefile('rb') as reader:
+            while pending:
+                sock.sendall(json.dumps(pending[0], ensure_ascii=False).encode('utf-8') + b'\n')
+                line = reader.readline()
+                if not line:
+                    break           # 守护进程中途退出：重连
+                reply = json.loads(line)
+                if reply.get('restart'):
+                    time.sleep(0.1)
+                    break           # 代码已更新：重启后重试同一个请求
+                pending.pop(0)
+                sys.stdout.write(reply.get('out', ''))
+                sys.stderr.write(reply.get('err', ''))
+                if show_time:
+                    sys.stderr.write(f"[{reply.get('ms', 0):.1f}ms]\n")
+                code = code or reply.get('code', 0)
+    sys.stdout.flush()
+    return code
+
+
+def main(argv):
+    show_time = False
+    if argv and argv[0] == '--time':
+        show_time, argv = True, argv[1:]
+    if not argv:
+        print(__doc__)
+        return 2
+    if argv == ['-']:
+        requests = [to_request(shlex.split(line)) for line in sys.stdin
+                    if line.strip() and not line.lstrip().startswith('#')]
+    else:
+        requests = [to_request(argv)]
+    return run(requests, show_time)
+
+
+if __name__ == '__main__':
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    sys.exit(main(sys.argv[1:]))
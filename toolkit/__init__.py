@@ -0,0 +1,18 @@
+"""ManifestOS 源码检索/改写工具集。
+
+根目录下的 find_*/extract_*/step*/fix_* 脚本通过这个包访问 src/，
+命令行入口见 `python -m toolkit --help`。
+"""
+from toolkit.files import CachedFile, cached, read_lines, read_text
+from toolkit.lines import LineFile, LineTable
+from toolkit.paths import CACHE_DIR, REPO_ROOT, SRC_DIR, iter_source_files, relpath, resolve
+from toolkit.spans import Span, SpanIndex, load_spans
+from toolkit.trigram import Hit, TrigramIndex
+
+__all__ = [
+    'CachedFile', 'cached', 'read_lines', 'read_text',
+    'LineFile', 'LineTable',
+    'CACHE_DIR', 'REPO_ROOT', 'SRC_DIR', 'iter_source_files', 'relpath', 'resolve',
+    'Span', 'SpanIndex', 'load_spans',
+    'Hit', 'TrigramIndex',
+]
@@ -0,0 +1,160 @@
+"""Aho-Corasick 多关键字自动机。
+
+纯 Python 的逐字符扫描比 C 实现的 `str.find` 慢一个数量级，所以自动机自带一个
+关键字交替正则 `prefilter`：先用它（C 速度）定位包含任意关键字的区域，再只在
+这些区域上跑自动机拿到完整的、可重叠的匹配。
+
+批量替换要的是不重叠的「最左最长」匹配：`Replacer` 把自动机的 goto 字典树原样
+编译成一个嵌套分组的正则（子树在前、`?` 表示此处可结束），由 re 在 C 里单遍执行，
+每个位置只沿字典树走一条路，不像平铺的交替正则那样逐个关键字重试。
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from typing import Iterable, Iterator, Mapping
+
+from toolkit.files import read_bytes, write_bytes
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS, iter_source_files, relpath
+
+
+class AhoCorasick:
+    """关键字自动机；`iter_matches` 按结束位置顺序产出 (起点, 关键字下标)。"""
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys: list[str] = list(keys)
+        if any(not k for k in self.keys):
+            raise ValueError('关键字不能为空字符串')
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._ends: dict[int, int] = {}     # 状态 -> 恰好在此结束的关键字（重复关键字取第一个）
+        for index, key in enumerate(self.keys):
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] += (index,)
+            self._ends.setdefault(state, index)
+        self._link()
+        self._prefilter: re.Pattern | None = None
+        self._longest: re.Pattern | None = None
+
+    def _link(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    @property
+    def prefilter(self) -> re.Pattern:
+        """所有关键字的交替正则（长的优先），只用来判断「这里有没有关键字」。"""
+        if self._prefilter is None:
+            ordered = sorted(set(self.keys), key=len, reverse=True)
+            self._prefilter = re.compile('|'.join(map(re.escape, ordered)) or '(?!)')
+        return self._prefilter
+
+    @property
+    def longest(self) -> re.Pattern:
+        """字典树对应的正则：从左到右产出不重叠的最左最长匹配。"""
+        if self._longest is None:
+            goto, ends = self._goto, self._ends
+
+            def pattern(state: int) -> str:
+                alts = [re.escape(ch) + pattern(nxt) for ch, nxt in goto[state].items()]
+                if not alts:
+                    return ''
+                body = alts[0] if len(alts) == 1 else '(?:%s)' % '|'.join(alts)
+                # 贪婪的 `?` 先试更长的子树，走不通再在这里结束
+                return '(?:%s)?' % body if state in ends else body
+
+            self._longest = re.compile(pattern(0) or '(?!)')
+        return self._longest
+
+    def iter_longest(self, text: str, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+        """不重叠的最左最长匹配，产出 (起点, 关键字下标)。"""
+        ends, goto = self._ends, self._goto
+        for m in self.longest.finditer(text, start, len(text) if end is None else end):
+            state = 0
+            for ch in m.group():
+                state = goto[state][ch]
+            yield m.start(), ends[state]
+
+    def iter_matches(self, text: str, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+        goto, fail, out, keys = self._goto, self._fail, self._out, self.keys
+        state = 0
+        for i in range(start, len(text) if end is None else end):
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for k in out[state]:
+                yield i - len(keys[k]) + 1, k
+
+    def matched_keys(self, text: str, start: int = 0, end: int | None = None) -> set[int]:
+        return {k for _pos, k in self.iter_matches(text, start, end)}
+
+
+class Replacer:
+    """一次扫描完成整张替换表：最左最长、互不重叠，并统计每个关键字的命中次数。
+
+    与逐条 `content.replace(old, new)` 不同，结果与表里的顺序无关：`'????'` 和
+    `'????????????'` 同时出现时，总是较长的那个先占住位置。
+    """
+
+    def __init__(self, table: Mapping[str, str] | Iterable[tuple[str, str]]):
+        pairs = list(table.items() if isinstance(table, Mapping) else table)
+        self.automaton = AhoCorasick(old for old, _new in pairs)
+        self.table: dict[str, str] = {}
+        for old, new in pairs:
+            self.table.setdefault(old, new)
+
+    def subn(self, text: str) -> tuple[str, dict[str, int]]:
+        """返回 (替换后的文本, {关键字: 命中次数})，只列出命中过的关键字。"""
+        table = self.table
+        hits: dict[str, int] = {}
+
+        def replace(m: re.Match) -> str:
+            old = m.group()
+            hits[old] = hits.get(old, 0) + 1
+            return table[old]
+
+        return self.automaton.longest.sub(replace, text), hits
+
+    def sub(self, text: str) -> str:
+        return self.subn(text)[0]
+
+    def apply_file(self, path: str | os.PathLike, encoding: str = 'utf-8') -> dict[str, int]:
+        """原地替换一个文件（坏字节原样保留）；没有命中时不写。"""
+        text = read_bytes(path).decode(encoding, errors='surrogateescape')
+        new, hits = self.subn(text)
+        if hits:
+            write_bytes(path, new.encode(encoding, errors='surrogateescape'))
+        return hits
+
+    def apply_tree(self, roots=None, exts=None, encoding: str = 'utf-8') -> dict[str, dict[str, int]]:
+        """对 roots 下的所有源码文件执行替换，返回 {相对路径: 命中统计}。
+
+        每个文件只解码、扫描一遍，不管表里有多少条；没有命中的文件不写。
+        """
+        results: dict[str, dict[str, int]] = {}
+        for path in iter_source_files(roots or DEFAULT_ROOTS, exts or SOURCE_EXTS):
+            hits = self.apply_file(path, encoding)
+            if hits:
+                results[relpath(path)] = hits
+        return results
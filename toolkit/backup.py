@@ -0,0 +1,221 @@
+"""改写前快照：按内容寻址、压缩、相对上一版做增量的备份库。
+
+fix_verification_bug.py 之类的脚本每跑一次就在 src/ 里写一份完整的 `*.tsx.backup`，
+既占空间又被各种搜索一起扫到。这里把快照放在 `.toolkit_backups/`（不在任何扫描根下）：
+
+    objects/ab/cdef...   一个版本的内容，文件名是内容哈希（相同内容只存一份）；
+                         第一个字节 F 表示 zlib 压缩的全文，D 表示相对另一个版本的
+                         按行增量（同样压缩），增量链超过 MAX_CHAIN 层就改存全文
+    log.jsonl            追加写的快照记录：哪次改写（补丁 ID）之前，哪个文件是哪个版本
+
+一次只改几行的快照只有几百字节。恢复按补丁 ID 进行：
+
+    snapshot(lookups.TIMELINE, 'fix_verification_bug')
+    python -m toolkit backup restore fix_verification_bug
+"""
+from __future__ import annotations
+
+import difflib
+import json
+import os
+import pickle
+import time
+import zlib
+from typing import Iterable, NamedTuple
+
+from toolkit import cache
+from toolkit.files import read_bytes, write_bytes
+from toolkit.paths import BACKUP_DIR, REPO_ROOT, SKIP_DIRS, relpath
+
+MAX_CHAIN = 32
+# 增量不比全文小这么多时直接存全文
+DELTA_RATIO = 0.5
+DELTA_BASES = 4
+LOG_NAME = 'log.jsonl'
+
+
+class BackupError(LookupError):
+    pass
+
+
+class Snapshot(NamedTuple):
+    patches: tuple[str, ...]    # 紧接着要执行的补丁
+    path: str
+    hash: str
+    size: int
+    time: float
+
+    def describe(self) -> str:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.time))
+        return f'{stamp}  {self.hash[:12]}  {self.path} ({self.size} 字节)  {", ".join(self.patches)}'
+
+
+def _object_path(digest: str):
+    return BACKUP_DIR / 'objects' / digest[:2] / digest[2:]
+
+
+def _read_object(digest: str) -> bytes:
+    try:
+        with open(_object_path(digest), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise BackupError(f'备份库里没有版本 {digest}') from None
+
+
+def _chain_depth(digest: str) -> int:
+    depth = 0
+    raw = _read_object(digest)
+    while raw[:1] == b'D':
+        depth += 1
+        raw = _read_object(raw[1:33].decode('ascii'))
+    return depth
+
+
+def _delta(base: bytes, data: bytes) -> list[tuple[int, int] | bytes]:
+    """按行的增量：(起, 止) 表示复制 base 的这几行，bytes 表示新内容。"""
+    old, new = base.splitlines(keepends=True), data.splitlines(keepends=True)
+    ops: list[tuple[int, int] | bytes] = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append((i1, i2))
+        elif j2 > j1:
+            ops.append(b''.join(new[j1:j2]))
+    return ops
+
+
+def _patch(base: bytes, ops: list[tuple[int, int] | bytes]) -> bytes:
+    old = base.splitlines(keepends=True)
+    return b''.join(b''.join(old[op[0]:op[1]]) if isinstance(op, tuple) else op for op in ops)
+
+
+def _write_object(digest: str, blob: bytes) -> None:
+    target = _object_path(digest)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_bytes(target, blob)
+
+
+def store(data: bytes, bases: Iterable[str] = ()) -> str:
+    """把一个版本放进备份库，返回内容哈希；给了候选 bases 时存成其中最小的增量。"""
+    digest = cache.content_hash(data)
+    if _object_path(digest).exists():
+        return digest
+    blob = b'F' + zlib.compress(data, 9)
+    limit = DELTA_RATIO * len(blob)
+    for base in dict.fromkeys(bases):
+        if base == digest:
+            continue
+        try:
+            if _chain_depth(base) >= MAX_CHAIN:
+                continue
+            ops = _delta(load(base), data)
+        except BackupError:
+            continue
+        delta = b'D' + base.encode('ascii') + zlib.compress(pickle.dumps(ops, protocol=4), 9)
+        if len(delta) < min(limit, len(blob)):
+            blob = delta
+    _write_object(digest, blob)
+    return digest
+
+
+def load(digest: str) -> bytes:
+    """取出一个版本的全文（沿增量链还原，并校验哈希）。"""
+    chain = []
+    raw = _read_object(digest)
+    while raw[:1] == b'D':
+        chain.append(pickle.loads(zlib.decompress(raw[33:])))
+        raw = _read_object(raw[1:33].decode('ascii'))
+    data = zlib.decompress(raw[1:])
+    for ops in reversed(chain):
+        data = _patch(data, ops)
+    if cache.content_hash(data) != digest:
+        raise BackupError(f'版本 {digest} 校验失败，备份库可能损坏')
+    return data
+
+
+def history(path: str | os.PathLike | None = None, patch: str | None = None) -> list[Snapshot]:
+    """按时间顺序列出快照，可按文件、补丁 ID 过滤。"""
+    rel = relpath(path) if path is not None else None
+    snapshots = []
+    try:
+        with open(BACKUP_DIR / LOG_NAME, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                snap = Snapshot(tuple(record['patches']), record['path'], record['hash'],
+                                record['size'], record['time'])
+                if (rel is None or snap.path == rel) and (patch is None or patch in snap.patches):
+                    snapshots.append(snap)
+    except FileNotFoundError:
+        pass
+    return snapshots
+
+
+def snapshot(path: str | os.PathLike, patches: str | Iterable[str],
+             data: bytes | None = None) -> Snapshot:
+    """记录 path 在执行 patches 之前的内容；data 省略时从磁盘读。"""
+    rel = relpath(path)
+    patches = (patches,) if isinstance(patches, str) else tuple(patches)
+    if data is None:
+        data = read_bytes(rel)
+    # 最近几个版本都试一下：恢复、导入旧副本之后，最近一版不一定最像
+    digest = store(data, [snap.hash for snap in reversed(history(rel)[-DELTA_BASES:])])
+    snap = Snapshot(patches, rel, digest, len(data), time.time())
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    with open(BACKUP_DIR / LOG_NAME, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(snap._asdict(), ensure_ascii=False) + '\n')
+    return snap
+
+
+def restore(patch: str, paths: Iterable[str | os.PathLike] | None = None,
+            dry_run: bool = False) -> list[Snapshot]:
+    """把文件恢复到最近一次执行 patch 之前的内容；恢复前的内容也会留一份快照。"""
+    wanted = {relpath(p) for p in paths} if paths is not None else None
+    latest: dict[str, Snapshot] = {}
+    for snap in history(patch=patch):
+        if wanted is None or snap.path in wanted:
+            latest[snap.path] = snap
+    if not latest:
+        raise BackupError(f'没有补丁 {patch} 的快照')
+    for rel, snap in sorted(latest.items()):
+        data = load(snap.hash)
+        if dry_run:
+            continue
+        try:
+            current = read_bytes(rel)
+        except FileNotFoundError:
+            current = None
+        if current == data:
+            continue
+        if current is not None:
+            snapshot(rel, f'restore:{patch}', current)
+        write_bytes(rel, data)
+    return [latest[rel] for rel in sorted(latest)]
+
+
+def import_copies(suffix: str = '.backup', remove: bool = False) -> list[Snapshot]:
+    """把散落在仓库里的 `X.backup` 副本收进备份库，记为文件 X 的快照（补丁 ID 为 legacy-backup）。"""
+    imported = []
+    for dirpath, dirnames, filenames in os.walk(REPO_ROOT):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if not name.endswith(suffix) or name == suffix:
+                continue
+            copy = os.path.join(dirpath, name)
+            imported.append(snapshot(copy[:-len(suffix)], 'legacy-backup', read_bytes(copy)))
+            if remove:
+                os.unlink(copy)
+    return imported
+
+
+def stats() -> dict[str, int]:
+    """snapshots：快照数；objects：不同版本数；stored：磁盘占用；logical：全部快照按全文计的大小。"""
+    objects = stored = 0
+    root = BACKUP_DIR / 'objects'
+    if root.exists():
+        for entry in root.glob('*/*'):
+            objects += 1
+            stored += entry.stat().st_size
+    snapshots = history()
+    return {'snapshots': len(snapshots), 'objects': objects, 'stored': stored,
+            'logical': sum(snap.size for snap in snapshots)}
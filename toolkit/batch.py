@@ -0,0 +1,186 @@
+"""多模式批量查询：N 个具名模式，每个文件只读、只扫一遍。
+
+字面量模式全部放进一个 Aho-Corasick 自动机；正则模式先提取必须出现的字面量
+（见 `trigram.regex_plan`）挂到同一个自动机上，只有字面量条件满足的行才真正跑
+正则；提取不出字面量的正则合并成一个交替正则做逐行预筛。结果按模式名分组。
+
+    q = BatchQuery()
+    q.add_literal('complete', 'completeTask', paths=[TIMELINE])
+    q.add_regex('end', r'scheduledEnd|endTime', paths=[TIMELINE])
+    results = q.run()          # {'complete': [Hit, ...], 'end': [...]}
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from toolkit.aho import AhoCorasick
+from toolkit.files import read_text
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS, iter_source_files, relpath
+from toolkit.trigram import Hit, Plan, TrigramIndex, literal_plan, regex_plan
+
+# 只折叠 ASCII 大小写，保证变换前后字符下标一一对应
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def ascii_lower(text: str) -> str:
+    return text.translate(_ASCII_LOWER)
+
+
+@dataclass
+class _Pattern:
+    name: str
+    source: str
+    regex: re.Pattern | None
+    ignore_case: bool
+    paths: tuple[str, ...] | None
+    plan: Plan = field(default=None)
+
+
+class _Compiled:
+    """某一组模式编译后的扫描器（按模式组合缓存）。"""
+
+    def __init__(self, patterns: list[_Pattern]):
+        self.patterns = patterns
+        keys: dict[str, int] = {}
+
+        def key_of(text: str) -> int:
+            text = ascii_lower(text)
+            if text not in keys:
+                keys[text] = len(keys)
+            return keys[text]
+
+        def bind(plan: Plan):
+            if plan is None:
+                return None
+            kind, arg = plan
+            if kind == 'lit':
+                return ('lit', key_of(arg))
+            return (kind, [bind(p) for p in arg])
+
+        self.literals: list[tuple[_Pattern, int]] = []
+        self.planned: list[tuple[_Pattern, tuple]] = []
+        self.free: list[_Pattern] = []
+        for pattern in patterns:
+            if pattern.regex is None:
+                self.literals.append((pattern, key_of(pattern.source)))
+            elif pattern.plan is not None:
+                self.planned.append((pattern, bind(pattern.plan)))
+            else:
+                self.free.append(pattern)
+        self.automaton = AhoCorasick(keys) if keys else None
+        self.free_filter = re.compile('|'.join('(?:%s)' % p.regex.pattern for p in self.free)) \
+            if self.free and not any(p.regex.flags & ~re.UNICODE for p in self.free) else None
+
+    def scan(self, rel: str, text: str, out: dict[str, list[Hit]]) -> None:
+        newlines = [m.start() for m in re.finditer('\n', text)]
+
+        def line_bounds(lineno: int) -> tuple[int, int]:
+            start = newlines[lineno - 1] + 1 if lineno else 0
+            end = newlines[lineno] if lineno < len(newlines) else len(text)
+            if end > start and text[end - 1] == '\r':
+                end -= 1
+            return start, end
+
+        if self.automaton is not None:
+            lowered = ascii_lower(text)
+            flagged = sorted({bisect_right(newlines, m.start())
+                              for m in self.automaton.prefilter.finditer(lowered)})
+            for lineno in flagged:
+                start, end = line_bounds(lineno)
+                found: dict[int, list[int]] = {}
+                for pos, k in self.automaton.iter_matches(lowered, start, end):
+                    found.setdefault(k, []).append(pos)
+                line = text[start:end]
+                for pattern, k in self.literals:
+                    positions = found.get(k)
+                    if not positions:
+                        continue
+                    if pattern.ignore_case or any(
+                            text.startswith(pattern.source, pos) for pos in positions):
+                        out[pattern.name].append(Hit(rel, lineno + 1, line))
+                for pattern, plan in self.planned:
+                    if _satisfied(plan, found) and pattern.regex.search(line):
+                        out[pattern.name].append(Hit(rel, lineno + 1, line))
+
+        if self.free:
+            for lineno in range(len(newlines) + 1):
+                start, end = line_bounds(lineno)
+                line = text[start:end]
+                if self.free_filter is not None and not self.free_filter.search(line):
+                    continue
+                for pattern in self.free:
+                    if pattern.regex.search(line):
+                        out[pattern.name].append(Hit(rel, lineno + 1, line))
+
+
+def _satisfied(plan, found: dict) -> bool:
+    kind, arg = plan
+    if kind == 'lit':
+        return arg in found
+    if kind == 'and':
+        return all(_satisfied(p, found) for p in arg)
+    return any(_satisfied(p, found) for p in arg)
+
+
+class BatchQuery:
+    """一组具名模式；`run()` 对每个涉及的文件只读取、扫描一次。"""
+
+    def __init__(self, roots: Iterable[str] = DEFAULT_ROOTS, exts: Iterable[str] = SOURCE_EXTS):
+        self.roots = tuple(roots)
+        self.exts = tuple(exts)
+        self._patterns: dict[str, _Pattern] = {}
+        self._compiled: dict[tuple[str, ...], _Compiled] = {}
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, pattern: _Pattern) -> None:
+        if pattern.name in self._patterns:
+            raise ValueError(f'重复的模式名: {pattern.name}')
+        self._patterns[pattern.name] = pattern
+        self._compiled.clear()
+
+    def add_literal(self, name: str, text: str, paths: Iterable[str] | None = None,
+                    ignore_case: bool = False) -> None:
+        if not text:
+            raise ValueError('字面量不能为空')
+        self._add(_Pattern(name, text, None, ignore_case,
+                           tuple(relpath(p) for p in paths) if paths is not None else None,
+                           literal_plan(text)))
+
+    def add_regex(self, name: str, pattern: str, paths: Iterable[str] | None = None,
+                  flags: int = 0) -> None:
+        compiled = re.compile(pattern, flags)
+        self._add(_Pattern(name, pattern, compiled, bool(flags & re.IGNORECASE),
+                           tuple(relpath(p) for p in paths) if paths is not None else None,
+                           regex_plan(pattern, flags)))
+
+    def run(self, index: TrigramIndex | None = None) -> dict[str, list[Hit]]:
+        """执行全部模式。传入 `index` 时，未限定路径的模式先用三元组索引筛掉不可能命中的文件。"""
+        per_file: dict[str, list[_Pattern]] = {}
+        tree: list[str] | None = None
+        for pattern in self._patterns.values():
+            if pattern.paths is not None:
+                targets = pattern.paths
+            else:
+                if tree is None:
+                    tree = [relpath(p) for p in iter_source_files(self.roots, self.exts)]
+                targets = tree
+                if index is not None and pattern.plan is not None:
+                    targets = index.candidate_files(pattern.plan, tree)
+            for rel in targets:
+                per_file.setdefault(rel, []).append(pattern)
+
+        results: dict[str, list[Hit]] = {name: [] for name in self._patterns}
+        for rel, patterns in per_file.items():
+            names = tuple(p.name for p in patterns)
+            compiled = self._compiled.get(names)
+            if compiled is None:
+                compiled = self._compiled[names] = _Compiled(patterns)
+            compiled.scan(rel, read_text(rel), results)
+        for hits in results.values():
+            hits.sort(key=lambda h: (h.path, h.lineno))
+        return results
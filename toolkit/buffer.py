@@ -0,0 +1,278 @@
+"""piece table 文本缓冲区：给需要边改边扫描的改写脚本用。
+
+`lines[j:j] = new_lines`、`lines[:a] + [new] + lines[b:]` 每次都复制整份行列表，
+多处改写就是平方级的复制。这里的缓冲区只记录「原文/追加文本里的哪一段」组成
+当前内容，拼接只改片段表，不复制文本；行号查询用每段源文本的换行位置表二分，
+全文只在 `text()` / `commit()` 时拼出来一次。
+
+    buf = PieceTable.open(TIMELINE)
+    i = buf.find_line("block.status !== 'in_progress' && (", 1981, 1983)
+    mark = buf.marker(buf.line_start(i + 1))      # 之后的插入不会让它错位
+    buf.splice_lines(j, j, new_lines)             # 等价于 lines[j:j] = new_lines
+    buf.commit()
+
+行下标从 0 开始，与 `lines[i]` 一致；行文本不含换行符。
+"""
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
+
+from toolkit import cache, structure
+from toolkit.edits import EditConflict, join_lines
+from toolkit.files import read_bytes, write_bytes
+from toolkit.paths import relpath, resolve
+
+
+class Marker:
+    """随编辑移动的位置。gravity='right' 时，在它正好所在处插入的文本位于它之前。"""
+
+    __slots__ = ('pos', 'gravity')
+
+    def __init__(self, pos: int, gravity: str = 'left'):
+        self.pos = pos
+        self.gravity = gravity
+
+    def _adjust(self, start: int, end: int, inserted: int) -> None:
+        if self.pos > end or (self.pos == end and end > start):
+            self.pos += inserted - (end - start)
+        elif self.pos >= start:
+            self.pos = start + inserted if self.gravity == 'right' else start
+
+    def __index__(self) -> int:
+        return self.pos
+
+    def __repr__(self) -> str:
+        return f'Marker({self.pos}, {self.gravity!r})'
+
+
+class PieceTable:
+    def __init__(self, text: str = ''):
+        self._sources: list[str] = [text]
+        self._newlines: list[list[int] | None] = [None]
+        # 片段：(源下标, 源内起点, 长度)
+        self._pieces: list[tuple[int, int, int]] = [(0, 0, len(text))] if text else []
+        self._starts: list[int] | None = None    # 每个片段在当前内容中的起点
+        self._nl_before: list[int] | None = None  # 每个片段之前的换行数
+        self._length = len(text)
+        self._markers: list[Marker] = []
+        self.path: str | None = None
+        self.encoding = 'utf-8'
+        self._stat: tuple[int, int] | None = None
+        self._original = text
+        self.check = True       # 提交前做结构检查（toolkit.structure）
+
+    @classmethod
+    def open(cls, path: str | os.PathLike, encoding: str = 'utf-8') -> 'PieceTable':
+        buf = cls(read_bytes(path).decode(encoding, errors='surrogateescape'))
+        buf.path = relpath(resolve(path))
+        buf.encoding = encoding
+        buf._stat = cache.stat_key(resolve(path))
+        return buf
+
+    # -- 内部索引 --------------------------------------------------------------
+
+    def _source_newlines(self, src: int) -> list[int]:
+        nl = self._newlines[src]
+        if nl is None:
+            text = self._sources[src]
+            nl = []
+            pos = text.find('\n')
+            while pos != -1:
+                nl.append(pos)
+                pos = text.find('\n', pos + 1)
+            self._newlines[src] = nl
+        return nl
+
+    def _piece_newlines(self, piece: tuple[int, int, int]) -> int:
+        src, start, length = piece
+        nl = self._source_newlines(src)
+        return bisect_left(nl, start + length) - bisect_left(nl, start)
+
+    def _index(self) -> None:
+        if self._starts is not None:
+            return
+        starts, nl_before = [], []
+        offset = newlines = 0
+        for piece in self._pieces:
+            starts.append(offset)
+            nl_before.append(newlines)
+            offset += piece[2]
+            newlines += self._piece_newlines(piece)
+        nl_before.append(newlines)
+        self._starts, self._nl_before = starts, nl_before
+
+    def _split(self, offset: int) -> int:
+        """保证 offset 处是片段边界，返回从 offset 开始的片段下标。"""
+        self._index()
+        if offset >= self._length:
+            return len(self._pieces)
+        k = bisect_right(self._starts, offset) - 1
+        delta = offset - self._starts[k]
+        if delta == 0:
+            return k
+        src, start, length = self._pieces[k]
+        self._pieces[k:k + 1] = [(src, start, delta), (src, start + delta, length - delta)]
+        self._starts = None
+        return k + 1
+
+    # -- 读取 ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._length
+
+    def get(self, start: int = 0, end: int | None = None) -> str:
+        """当前内容的 [start, end) 区间，只拼接涉及的片段。"""
+        end = self._length if end is None else min(end, self._length)
+        if start >= end:
+            return ''
+        self._index()
+        k = bisect_right(self._starts, start) - 1
+        chunks = []
+        while k < len(self._pieces) and self._starts[k] < end:
+            src, s, length = self._pieces[k]
+            lo = max(start - self._starts[k], 0)
+            hi = min(end - self._starts[k], length)
+            chunks.append(self._sources[src][s + lo:s + hi])
+            k += 1
+        return ''.join(chunks)
+
+    def text(self) -> str:
+        return ''.join(self._sources[src][s:s + length] for src, s, length in self._pieces)
+
+    def line_count(self) -> int:
+        """行数，与 `text.split('\\n')` 去掉末尾空串后的长度一致。"""
+        self._index()
+        newlines = self._nl_before[-1]
+        if self._length and self.get(self._length - 1) != '\n':
+            return newlines + 1
+        return newlines
+
+    def line_start(self, i: int) -> int:
+        """第 i 行（从 0 开始）行首的偏移；超过最后一行时返回内容长度。"""
+        if i <= 0:
+            return 0
+        self._index()
+        if i > self._nl_before[-1]:
+            return self._length
+        # 第 i 个换行所在的片段
+        k = bisect_left(self._nl_before, i) - 1
+        src, start, _length = self._pieces[k]
+        nl = self._source_newlines(src)
+        pos = nl[bisect_left(nl, start) + (i - self._nl_before[k]) - 1]
+        return self._starts[k] + (pos - start) + 1
+
+    def line_of(self, offset: int) -> int:
+        """偏移所在的行下标。"""
+        self._index()
+        k = bisect_right(self._starts, offset) - 1
+        if k < 0:
+            return 0
+        src, start, _length = self._pieces[k]
+        nl = self._source_newlines(src)
+        within = bisect_left(nl, start + offset - self._starts[k]) - bisect_left(nl, start)
+        return self._nl_before[k] + within
+
+    def line(self, i: int) -> str:
+        return self.get(self.line_start(i), self.line_start(i + 1)).rstrip('\n')
+
+    def lines(self, first: int = 0, last: int | None = None) -> Iterator[tuple[int, str]]:
+        """第 first..last 行（含），产出 (行下标, 文本)。"""
+        last = self.line_count() - 1 if last is None else min(last, self.line_count() - 1)
+        for i in range(max(first, 0), last + 1):
+            yield i, self.line(i)
+
+    def find(self, needle: str, start: int = 0, end: int | None = None) -> int:
+        """逐片段查找（相邻片段之间保留 len(needle)-1 个字符的重叠），找不到返回 -1。"""
+        end = self._length if end is None else min(end, self._length)
+        if not needle:
+            return start
+        self._index()
+        k = max(bisect_right(self._starts, start) - 1, 0)
+        carry, carry_start = '', start
+        while k < len(self._pieces) and self._starts[k] < end:
+            src, s, length = self._pieces[k]
+            lo = max(start - self._starts[k], 0)
+            hi = min(end - self._starts[k], length)
+            window = carry + self._sources[src][s + lo:s + hi]
+            pos = window.find(needle)
+            if pos != -1:
+                return carry_start + pos
+            keep = min(len(needle) - 1, len(window))
+            carry = window[len(window) - keep:] if keep else ''
+            carry_start = self._starts[k] + hi - len(carry)
+            k += 1
+        return -1
+
+    def find_line(self, needle: str, first: int = 0, last: int | None = None) -> int:
+        """第 first..last 行（含）中第一个包含 needle 的行下标，找不到返回 -1。"""
+        for i, text in self.lines(first, last):
+            if needle in text:
+                return i
+        return -1
+
+    # -- 修改 ------------------------------------------------------------------
+
+    def marker(self, pos: int, gravity: str = 'left') -> Marker:
+        mark = Marker(pos, gravity)
+        self._markers.append(mark)
+        return mark
+
+    def splice(self, start: int, end: int, text: str = '') -> None:
+        """把 [start, end) 换成 text；不复制已有内容。"""
+        start, end = int(start), int(end)
+        if not 0 <= start <= end <= self._length:
+            raise IndexError(f'区间 [{start}, {end}) 超出缓冲区范围（长度 {self._length}）')
+        a = self._split(start)
+        b = self._split(end)
+        new = []
+        if text:
+            self._sources.append(text)
+            self._newlines.append(None)
+            new.append((len(self._sources) - 1, 0, len(text)))
+        self._pieces[a:b] = new
+        self._starts = self._nl_before = None
+        self._length += len(text) - (end - start)
+        for mark in self._markers:
+            mark._adjust(start, end, len(text))
+
+    def insert(self, pos: int, text: str) -> None:
+        self.splice(pos, pos, text)
+
+    def delete(self, start: int, end: int) -> None:
+        self.splice(start, end)
+
+    def replace_in_line(self, i: int, old: str, new: str) -> bool:
+        """把第 i 行里第一个 old 换成 new。"""
+        pos = self.find(old, self.line_start(i), self.line_start(i + 1))
+        if pos < 0:
+            return False
+        self.splice(pos, pos + len(old), new)
+        return True
+
+    def splice_lines(self, first: int, last: int, lines: str | Iterable[str] = ()) -> None:
+        """等价于 `lines[first:last] = new`（半开区间，行下标从 0 开始）。"""
+        start = self.line_start(first)
+        end = self.line_start(last)
+        self.splice(start, end, join_lines(lines))
+
+    # -- 提交 ------------------------------------------------------------------
+
+    def commit(self) -> bool:
+        """把当前内容写回 open() 时的文件；内容未变时不写，返回是否写了。"""
+        if self.path is None:
+            raise RuntimeError('缓冲区不是从文件打开的')
+        text = self.text()
+        if text == self._original:
+            return False
+        if cache.stat_key(resolve(self.path)) != self._stat:
+            raise EditConflict(f'{self.path} 在编辑期间被修改，放弃写入')
+        if self.check:
+            # 片段表不保留编辑列表：取新旧全文的最小差异区间检查
+            structure.ensure_valid(self.path, self._original,
+                                   [structure.changed_range(self._original, text)], text)
+        write_bytes(self.path, text.encode(self.encoding, errors='surrogateescape'))
+        self._original = text
+        self._stat = cache.stat_key(resolve(self.path))
+        return True
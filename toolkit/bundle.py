@@ -0,0 +1,334 @@
+"""import 图与首包体积：找出改成动态 import（React.lazy）后能从首屏包里拿掉最多字节的模块。
+
+src/ 里还没有一个 React.lazy，FloatingAIChat、NavigationModeView 这类几千行的组件和
+它们背后的 service 全在首屏包里。这里：
+
+1. 逐个文件（walker 增量缓存）收集 import：静态的 `import ... from` / `import '...'` /
+   `export ... from`，动态的 `import('...')`；只有类型的 import 编译后不存在，跳过；
+2. 按 vite.config.ts 里的 resolve.alias（`'@': path.resolve(__dirname, './src')`）和相对
+   路径解析到文件，依次试 .ts/.tsx/.js/.jsx/.json 和目录下的 index.*，每个模块按源文件
+   字节数计重；npm 包不计；
+3. 从入口（默认 src/main.tsx）沿静态边走出首屏包，在这张图上求支配树：模块 v 支配的
+   子树就是「只能经过 v 才能到达」的那些模块，把 v 的所有静态 import 改成动态 import，
+   这棵子树整个离开首屏包；按子树字节数排序给出候选切分点。
+
+源文件字节只是近似：没算压缩和 tree-shaking，桶文件（index.ts）里没用到的导出实际
+会被摇掉。排序看相对大小即可。
+
+    python -m toolkit bundle --limit 20
+    python -m toolkit bundle --why src/components/ai/FloatingAIChat.tsx
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from toolkit.files import read_text
+from toolkit.paths import DEFAULT_ROOTS, REPO_ROOT, SOURCE_EXTS, relpath
+from toolkit.tokenizer import Token, is_jsx_file, significant, tokens_for
+from toolkit.walker import WalkResult, walk
+
+BUNDLE_VERSION = 1
+VITE_CONFIG = 'vite.config.ts'
+DEFAULT_ENTRY = 'src/main.tsx'
+# 切出去也没有意义的入口壳
+DEFAULT_KEEP = ('src/main.tsx', 'src/App.tsx')
+RESOLVE_EXTS = ('.ts', '.tsx', '.js', '.jsx', '.json')
+_ALIAS = re.compile(r"""['"]?([@~][\w/-]*)['"]?\s*:\s*path\.resolve\(\s*__dirname\s*,\s*['"]([^'"]+)['"]\s*\)""")
+
+
+class Import(NamedTuple):
+    spec: str
+    lineno: int
+    dynamic: bool
+
+
+class Candidate(NamedTuple):
+    path: str
+    own: int                  # 自身字节数
+    removed: int              # 改成动态 import 后离开首屏包的字节数（支配子树）
+    modules: int              # 一起离开的模块数
+    importers: tuple[str, ...]
+    default_export: bool      # React.lazy 要求 default export
+    parent: str | None        # 支配树上的父节点（立即支配者）
+
+    def describe(self, initial: int) -> str:
+        share = self.removed * 100 / initial if initial else 0
+        sites = '、'.join(self.importers[:3]) + (f' 等 {len(self.importers)} 处' if len(self.importers) > 3 else '')
+        lazy = '' if self.default_export or not self.path.endswith(('.tsx', '.jsx')) else '（没有 default export，React.lazy 需包一层）'
+        return (f'{self.path}: -{self.removed / 1024:.1f} KiB（{share:.1f}%，{self.modules} 个模块，'
+                f'自身 {self.own / 1024:.1f} KiB）{lazy}\n      被 {sites} 静态引入'
+                + (f'；已含在 {self.parent} 的子树里' if self.parent else ''))
+
+
+# ---------------------------------------------------------------------------
+# 收集 import
+
+def _is(toks: list[Token], i: int, kind: str, *values: str) -> bool:
+    if not 0 <= i < len(toks):
+        return False
+    t = toks[i]
+    return t.kind == kind and (not values or t.value in values)
+
+
+def _type_only(toks: list[Token], a: int, b: int) -> bool:
+    """`import type ...`，或花括号里全是 `type X` 且没有默认导入。"""
+    if _is(toks, a + 1, 'ident', 'type') and not _is(toks, a + 2, 'punct', ',') \
+            and not _is(toks, a + 2, 'ident', 'from'):
+        return True
+    if not _is(toks, a + 1, 'punct', '{'):
+        return False
+    names = types = 0
+    k = a + 2
+    while k < b and not _is(toks, k, 'punct', '}'):
+        if _is(toks, k, 'ident') and (k == a + 2 or _is(toks, k - 1, 'punct', ',')):
+            names += 1
+            if toks[k].value == 'type' and _is(toks, k + 1, 'ident'):
+                types += 1
+        k += 1
+    return names > 0 and names == types
+
+
+def _lineno(text: str, offset: int) -> int:
+    return text.count('\n', 0, offset) + 1
+
+
+def file_imports(rel: str, text: str) -> tuple[list[Import], bool]:
+    """walker 任务：(一个文件的 import 列表, 是否有 default export)。"""
+    _digest, tokens = tokens_for(text.encode('utf-8'), is_jsx_file(rel))
+    toks = significant(tokens)
+    found: list[Import] = []
+    default_export = False
+    for i, t in enumerate(toks):
+        if t.kind != 'ident' or _is(toks, i - 1, 'punct', '.', '?.'):
+            continue
+        if t.value == 'export' and _is(toks, i + 1, 'ident', 'default'):
+            default_export = True
+        if t.value == 'import' and _is(toks, i + 1, 'punct', '(') and _is(toks, i + 2, 'string'):
+            found.append(Import(toks[i + 2].value[1:-1], _lineno(text, t.start), True))
+            continue
+        if t.value not in ('import', 'export'):
+            continue
+        if t.value == 'import' and _is(toks, i + 1, 'string'):        # import './x.css'
+            found.append(Import(toks[i + 1].value[1:-1], _lineno(text, t.start), False))
+            continue
+        # import ... from '...' / export { ... } from '...' / export * from '...'
+        if t.value == 'export' and not _is(toks, i + 1, 'punct', '{', '*') \
+                and not (_is(toks, i + 1, 'ident', 'type') and _is(toks, i + 2, 'punct', '{')):
+            continue
+        k = i + 1
+        while k < len(toks) and k < i + 400 and not _is(toks, k, 'ident', 'from') \
+                and not _is(toks, k, 'punct', ';') and not _is(toks, k, 'ident', 'import', 'export'):
+            k += 1
+        if not (_is(toks, k, 'ident', 'from') and _is(toks, k + 1, 'string')):
+            continue
+        if _type_only(toks, i, k):
+            continue
+        found.append(Import(toks[k + 1].value[1:-1], _lineno(text, t.start), False))
+    return found, default_export
+
+
+def collect(roots: Iterable[str] = DEFAULT_ROOTS, paths: Iterable[str] | None = None,
+            workers: int | None = None) -> WalkResult:
+    """results 为 {相对路径: ([Import], 是否有 default export)}。"""
+    return walk(file_imports, 'bundle:v%d' % BUNDLE_VERSION, tuple(roots), SOURCE_EXTS,
+                paths=paths, workers=workers)
+
+
+# ---------------------------------------------------------------------------
+# 解析
+
+def aliases(config: str = VITE_CONFIG) -> dict[str, str]:
+    """vite.config.ts 的 resolve.alias：别名 -> 相对仓库根目录的路径。读不到时按 tsconfig 的 @ -> src。"""
+    try:
+        text = read_text(config)
+    except OSError:
+        text = ''
+    found = {name: relpath(REPO_ROOT / target) for name, target in _ALIAS.findall(text)}
+    return found or {'@': 'src'}
+
+
+def _probe(base: Path) -> str | None:
+    if base.is_file():
+        return relpath(base)
+    for ext in RESOLVE_EXTS:
+        candidate = base.with_name(base.name + ext)
+        if candidate.is_file():
+            return relpath(candidate)
+    for ext in RESOLVE_EXTS:
+        candidate = base / ('index' + ext)
+        if candidate.is_file():
+            return relpath(candidate)
+    return None
+
+
+class Resolver:
+    def __init__(self, alias: dict[str, str] | None = None):
+        # 长的别名优先，'@/x' 不会被 '@' 以外的前缀误配
+        self.alias = sorted((alias or aliases()).items(), key=lambda item: -len(item[0]))
+        self._memo: dict[tuple[str, str], str | None] = {}
+
+    def __call__(self, importer: str, spec: str) -> str | None:
+        """spec 在 importer 里解析到的仓库相对路径；npm 包和找不到的返回 None。"""
+        key = (os.path.dirname(importer), spec)
+        if key not in self._memo:
+            self._memo[key] = self._resolve(importer, spec.split('?', 1)[0])
+        return self._memo[key]
+
+    def _resolve(self, importer: str, spec: str) -> str | None:
+        if spec.startswith('.'):
+            return _probe((REPO_ROOT / importer).parent / spec)
+        for name, target in self.alias:
+            if spec == name or spec.startswith(name + '/'):
+                return _probe(REPO_ROOT / target / spec[len(name) + 1:])
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 图
+
+class Graph:
+    """模块 import 图：static / dynamic 两种边，节点按源文件字节数计重。"""
+
+    def __init__(self, result: WalkResult, resolver: Resolver | None = None):
+        resolver = resolver or Resolver()
+        self.static: dict[str, list[str]] = {}
+        self.dynamic: dict[str, list[str]] = {}
+        self.importers: dict[str, list[str]] = {}   # 静态引入者
+        self.default_export: dict[str, bool] = {}
+        self.unresolved: list[tuple[str, Import]] = []
+        pending = deque(sorted(result.results))
+        seen = set(pending)
+        while pending:
+            rel = pending.popleft()
+            entry = result.results.get(rel)
+            if entry is None:                      # .css / .json 之类：叶子
+                self.static.setdefault(rel, [])
+                self.dynamic.setdefault(rel, [])
+                continue
+            imports, self.default_export[rel] = entry
+            static, dynamic = self.static.setdefault(rel, []), self.dynamic.setdefault(rel, [])
+            for imp in imports:
+                target = resolver(rel, imp.spec)
+                if target is None:
+                    if imp.spec.startswith(('.', '@/')):
+                        self.unresolved.append((rel, imp))
+                    continue
+                edges = dynamic if imp.dynamic else static
+                if target not in edges:
+                    edges.append(target)
+                    if not imp.dynamic:
+                        self.importers.setdefault(target, []).append(rel)
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        self.sizes: dict[str, int] = {}
+        for rel in self.static:
+            try:
+                self.sizes[rel] = os.stat(REPO_ROOT / rel).st_size
+            except OSError:
+                self.sizes[rel] = 0
+
+    def reachable(self, entry: str) -> list[str]:
+        """从 entry 沿静态边能到的模块（首屏包），按深度优先后序的逆序（RPO）。"""
+        order: list[str] = []
+        seen = {entry}
+        stack = [(entry, iter(self.static.get(entry, ())))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append((child, iter(self.static.get(child, ()))))
+                    break
+            else:
+                order.append(node)
+                stack.pop()
+        order.reverse()
+        return order
+
+    def dominators(self, entry: str) -> tuple[list[str], dict[str, str]]:
+        """(RPO, 立即支配者)：Cooper-Harvey-Kennedy 迭代算法，只看静态边。"""
+        rpo = self.reachable(entry)
+        index = {node: i for i, node in enumerate(rpo)}
+        preds: dict[str, list[str]] = {node: [] for node in rpo}
+        for node in rpo:
+            for child in self.static.get(node, ()):
+                preds[child].append(node)
+        idom: dict[str, str] = {entry: entry}
+
+        def intersect(a: str, b: str) -> str:
+            while a != b:
+                while index[a] > index[b]:
+                    a = idom[a]
+                while index[b] > index[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for node in rpo[1:]:
+                new = None
+                for pred in preds[node]:
+                    if pred in idom:
+                        new = pred if new is None else intersect(pred, new)
+                if new is not None and idom.get(node) != new:
+                    idom[node] = new
+                    changed = True
+        return rpo, idom
+
+    def path_to(self, entry: str, target: str) -> list[str] | None:
+        """entry 到 target 的最短静态 import 链。"""
+        parent: dict[str, str | None] = {entry: None}
+        queue = deque([entry])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parent[node]
+                return chain[::-1]
+            for child in self.static.get(node, ()):
+                if child not in parent:
+                    parent[child] = node
+                    queue.append(child)
+        return None
+
+
+class Report(NamedTuple):
+    entry: str
+    initial: int                  # 首屏包字节数
+    modules: int                  # 首屏包模块数
+    total: int                    # 图里全部模块字节数
+    candidates: list[Candidate]
+
+
+def analyze(graph: Graph, entry: str = DEFAULT_ENTRY, keep: Iterable[str] = DEFAULT_KEEP) -> Report:
+    rpo, idom = graph.dominators(entry)
+    subtree = {node: graph.sizes.get(node, 0) for node in rpo}
+    count = dict.fromkeys(rpo, 1)
+    for node in reversed(rpo[1:]):           # 后序：子节点先于支配者累加
+        parent = idom[node]
+        subtree[parent] += subtree[node]
+        count[parent] += count[node]
+    keep = set(keep) | {entry}
+    candidates = [
+        Candidate(node, graph.sizes.get(node, 0), subtree[node], count[node],
+                  tuple(graph.importers.get(node, ())), graph.default_export.get(node, False),
+                  idom[node] if idom[node] not in keep else None)
+        for node in rpo if node not in keep
+    ]
+    candidates.sort(key=lambda c: (-c.removed, c.path))
+    return Report(entry, subtree[entry], len(rpo), sum(graph.sizes.values()), candidates)
+
+
+def run(entry: str = DEFAULT_ENTRY, roots: Iterable[str] = DEFAULT_ROOTS,
+        workers: int | None = None) -> tuple[Graph, Report, WalkResult]:
+    result = collect(roots, workers=workers)
+    graph = Graph(result)
+    return graph, analyze(graph, entry), result
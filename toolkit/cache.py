@@ -0,0 +1,141 @@
+"""`.toolkit_cache/` 下的持久化缓存：pickle + 原子替换；以及进程内按估算字节数限额的 LRU。"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from toolkit.paths import CACHE_DIR
+
+# 缓存格式变化时递增，旧缓存会被自动丢弃
+FORMAT_VERSION = 1
+
+
+def cache_path(*parts: str) -> Path:
+    return CACHE_DIR.joinpath(*parts)
+
+
+def load(name: str, default: Any = None) -> Any:
+    """读取缓存对象；文件不存在、损坏或版本不符时返回 default。"""
+    try:
+        with open(cache_path(name), 'rb') as f:
+            version, obj = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+        return default
+    return obj if version == FORMAT_VERSION else default
+
+
+def save(name: str, obj: Any) -> None:
+    """写临时文件再 rename，避免中断时留下半个缓存。"""
+    target = cache_path(name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((FORMAT_VERSION, obj), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def discard(name: str) -> None:
+    try:
+        os.unlink(cache_path(name))
+    except FileNotFoundError:
+        pass
+
+
+def stat_key(path: str | os.PathLike) -> tuple[int, int]:
+    """(mtime_ns, size)：判断文件是否变化的廉价键。"""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def content_hash(data: bytes) -> str:
+    """按内容缓存（分词、span 索引等）用的哈希。"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def shard_name(key: str) -> str:
+    """把任意键（通常是相对路径）映射成稳定的缓存文件名。"""
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+class LRU:
+    """进程内的 LRU：总大小（sizeof 估算的字节数）超过 max_bytes 时淘汰最久没用的项。
+
+    守护进程里常驻，内存要有上限；命中 / 未命中 / 淘汰次数见 stats()。
+    """
+
+    def __init__(self, name: str, max_bytes: int, sizeof: Callable[[Any], int] = len):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = self.misses = self.evictions = 0
+        self.bytes = 0
+        self._items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int | None = None) -> Any:
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return value            # 比整个上限还大：用完即弃，不挤掉别的
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _key, (_value, dropped) = self._items.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
+        return value
+
+    def resize(self, key: Hashable, size: int) -> None:
+        """项的内容变大了（例如补算了派生数据）时更新估算大小。"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return
+        self.put(key, item[0], size)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self.bytes -= item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def stats(self) -> dict[str, int]:
+        return {'items': len(self._items), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,165 @@
+"""全仓库编码普查：每个文件一行健康状况，输出 JSON/CSV 报告。
+
+乱码往往要等到构建失败才被发现，然后又多一个只针对某个文件的 fix_*encoding*.py。
+这里把 src/、api/ 和根目录文档一次扫完，按原始字节归类：
+
+    utf16          UTF-16 文件（PowerShell 的 `>` 重定向默认写出这种），其余检查在转成
+                   UTF-8 之后进行
+    invalid_utf16  UTF-16 里解不开的码元（奇数长度截断、孤立的代理项），去掉后继续检查
+    bom            UTF-8 BOM
+    crlf           全部是 CRLF 换行
+    mixed_eol      CRLF 与 LF 混用，或有孤立的 CR
+    invalid_utf8   有解不开的字节（多半是 GBK 原字节）
+    fffd           U+FFFD 连续段：原字节已经丢失
+    question_runs  连续 3 个以上的 `?`：有损转码留下的问号
+    backtick_rn    PowerShell 留下的字面量 `r`n
+    mojibake       mojibake.scan 认为可以往返恢复的段
+
+结果经 walker 按内容哈希增量缓存，没变的文件不重读，整棵树的夜间巡检只需几秒。
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+from typing import Iterable, NamedTuple
+
+from toolkit.mojibake import scan
+from toolkit.paths import REPO_ROOT, iter_source_files, relpath
+from toolkit.walker import WalkResult, walk
+
+CENSUS_VERSION = 2
+CENSUS_ROOTS = ('src', 'api')
+CENSUS_EXTS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.css', '.json', '.html', '.md', '.txt')
+DOC_EXTS = ('.md', '.txt')
+CLASSES = ('utf16', 'invalid_utf16', 'bom', 'crlf', 'mixed_eol', 'invalid_utf8', 'fffd', 'question_runs', 'backtick_rn', 'mojibake')
+
+_FFFD_RUN = re.compile(b'(?:\xef\xbf\xbd)+')
+_QUESTION_RUN = re.compile(rb'\?{3,}')
+_BACKTICK_RN = re.compile(rb'`r`n')
+
+
+class FileHealth(NamedTuple):
+    path: str
+    size: int                           # 磁盘上的字节数（UTF-16 文件也是转码前的）
+    counts: dict[str, int]              # 类别 -> 出现次数（只含出现过的类别）
+    first_line: dict[str, int]          # 类别 -> 第一次出现的行号
+
+    @property
+    def classes(self) -> tuple[str, ...]:
+        return tuple(c for c in CLASSES if self.counts.get(c))
+
+    @property
+    def clean(self) -> bool:
+        return not self.counts
+
+
+def _lineno(data: bytes, pos: int) -> int:
+    return data.count(b'\n', 0, pos) + 1
+
+
+def census_task(rel: str, data: bytes) -> FileHealth:
+    """walker 任务（raw=True）：归类一个文件。"""
+    counts: dict[str, int] = {}
+    first: dict[str, int] = {}
+
+    def note(name: str, count: int, pos: int) -> None:
+        if count:
+            counts[name] = count
+            first[name] = _lineno(data, pos)
+
+    size = len(data)
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        note('utf16', 1, 0)
+        try:
+            text = data.decode('utf-16')
+        except UnicodeDecodeError as exc:
+            # 截断、孤立代理项：记下个数后丢掉这些码元继续查，而不是让整个文件变成读取失败；
+            # 不换成 U+FFFD，免得再被算成一次 fffd
+            text = data.decode('utf-16', errors='ignore')
+            counts['invalid_utf16'] = data.decode('utf-16', errors='replace').count('\ufffd') - text.count('\ufffd')
+            first['invalid_utf16'] = data[:exc.start].decode('utf-16', errors='replace').count('\n') + 1
+        data = text.encode('utf-8')
+    elif data.startswith(b'\xef\xbb\xbf'):
+        note('bom', 1, 0)
+
+    crlf = data.count(b'\r\n')
+    bare_lf = data.count(b'\n') - crlf
+    bare_cr = data.count(b'\r') - crlf
+    if crlf and not bare_lf and not bare_cr:
+        note('crlf', crlf, data.find(b'\r\n'))
+    elif crlf or bare_cr:
+        note('mixed_eol', crlf + bare_cr, data.find(b'\r'))
+
+    for name, pattern in (('fffd', _FFFD_RUN), ('question_runs', _QUESTION_RUN),
+                          ('backtick_rn', _BACKTICK_RN)):
+        first_match = pattern.search(data)
+        if first_match:
+            note(name, sum(1 for _ in pattern.finditer(data, first_match.start())), first_match.start())
+
+    if not data.isascii():
+        try:
+            data.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            text = data.decode('utf-8', errors='surrogateescape')
+            bad = sum(1 for ch in text if '\udc80' <= ch <= '\udcff')
+            note('invalid_utf8', bad, exc.start)
+        recoverable = [f for f in scan(data) if f.after is not None]
+        if recoverable:
+            note('mojibake', len(recoverable), recoverable[0].start)
+
+    return FileHealth(rel, size, counts, first)
+
+
+def census_paths(roots: Iterable[str] = CENSUS_ROOTS, exts: Iterable[str] = CENSUS_EXTS,
+                 docs: bool = True) -> list[str]:
+    """roots 下的文件，加上仓库根目录的文档（不递归）。"""
+    paths = [relpath(p) for p in iter_source_files(tuple(r for r in roots if (REPO_ROOT / r).exists()),
+                                                   exts)]
+    if docs:
+        paths.extend(sorted(entry.name for entry in os.scandir(REPO_ROOT)
+                            if entry.is_file() and entry.name.endswith(DOC_EXTS)))
+    return paths
+
+
+def run(roots: Iterable[str] = CENSUS_ROOTS, exts: Iterable[str] = CENSUS_EXTS, docs: bool = True,
+        workers: int | None = None) -> WalkResult:
+    """并行、增量地普查；results 为 {相对路径: FileHealth}。"""
+    roots, exts = tuple(roots), tuple(exts)
+    return walk(census_task, 'census:v%d:%s' % (CENSUS_VERSION, docs), roots, exts,
+                paths=census_paths(roots, exts, docs), workers=workers, raw=True)
+
+
+def summary(results: Iterable[FileHealth]) -> dict[str, int]:
+    """每个类别涉及的文件数，外加 files / clean 两项。"""
+    out = {'files': 0, 'clean': 0, **{c: 0 for c in CLASSES}}
+    for health in results:
+        out['files'] += 1
+        if health.clean:
+            out['clean'] += 1
+        for c in health.classes:
+            out[c] += 1
+    return out
+
+
+def write_json(results: Iterable[FileHealth], path: str | os.PathLike) -> None:
+    results = sorted(results)
+    report = {
+        'version': CENSUS_VERSION,
+        'summary': summary(results),
+        'files': [{'path': h.path, 'size': h.size, 'classes': list(h.classes),
+                   'counts': h.counts, 'first_line': h.first_line} for h in results],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def write_csv(results: Iterable[FileHealth], path: str | os.PathLike) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['path', 'size', 'classes', *CLASSES, *(c + '_line' for c in CLASSES)])
+        for h in sorted(results):
+            writer.writerow([h.path, h.size, ' '.join(h.classes) or 'clean',
+                             *(h.counts.get(c, 0) for c in CLASSES),
+                             *(h.first_line.get(c, '') for c in CLASSES)])
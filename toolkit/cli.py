@@ -0,0 +1,507 @@
+"""`python -m toolkit <命令>` 的入口。"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from toolkit.trigram import TrigramIndex
+
+
+def _print_hits(hits, width: int) -> None:
+    for hit in hits:
+        print(f'{hit.path}:{hit.lineno}: {hit.line.strip()[:width]}')
+
+
+def cmd_index(args) -> int:
+    start = time.perf_counter()
+    index = TrigramIndex.open(refresh=False)
+    changed = index.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'索引 {len(index.files)} 个文件，更新 {len(changed)} 个，用时 {elapsed:.1f}ms')
+    return 0
+
+
+def cmd_grep(args) -> int:
+    index = TrigramIndex.open()
+    paths = args.path or None
+    if args.fixed:
+        hits = index.search(args.pattern, paths=paths, ignore_case=args.ignore_case, limit=args.limit)
+    else:
+        import re
+        flags = re.IGNORECASE if args.ignore_case else 0
+        hits = index.search_regex(args.pattern, paths=paths, flags=flags, limit=args.limit)
+    _print_hits(hits, args.width)
+    return 0 if hits else 1
+
+
+def cmd_lookup(args) -> int:
+    from toolkit import lookups
+    names = sorted(lookups.LOOKUPS) if args.all or not args.names else args.names
+    unknown = [n for n in names if n not in lookups.LOOKUPS]
+    if unknown:
+        print(f'未知查询: {", ".join(unknown)}（可用: {", ".join(sorted(lookups.LOOKUPS))}）')
+        return 2
+    start = time.perf_counter()
+    results = lookups.run(names)
+    for name in names:
+        print(f'=== {name} ({len(results[name])}) ===')
+        lookups.report(name, results[name])
+    print(f'\n{len(names)} 个查询，用时 {(time.perf_counter() - start) * 1000:.1f}ms')
+    return 0
+
+
+def cmd_usages(args) -> int:
+    from toolkit.walker import find_usages
+    start = time.perf_counter()
+    result = find_usages(args.pattern, require=args.require or (), roots=args.root or ('src',),
+                         workers=args.workers)
+    for rel, hits in sorted(result.results.items()):
+        print(f'=== {rel} ===')
+        for lineno, text in hits[:args.limit]:
+            print(f'{lineno}: {text[:args.width]}')
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'\n扫描 {result.scanned} / 复用 {result.cached + result.rehashed} 个文件，'
+          f'{len(result.errors)} 个错误，用时 {elapsed:.1f}ms')
+    return 1 if result.errors else 0
+
+
+def cmd_spans(args) -> int:
+    from toolkit.files import read_text
+    from toolkit.spans import load_spans
+    index = load_spans(args.path)
+    text = read_text(args.path)
+    if args.name:
+        spans = index.find(args.name, args.kind)
+        if not spans:
+            print(f'未找到 {args.name}')
+            return 1
+        span = spans[0]
+        print(text[span.start:span.end])
+        return 0
+    for span in index:
+        if args.kind and span.kind != args.kind:
+            continue
+        line = text.count('\n', 0, span.start) + 1
+        end_line = text.count('\n', 0, span.end) + 1
+        print(f'{line}-{end_line}\t{span.kind}\t{span.name or ""}')
+    return 0
+
+
+def cmd_extract(args) -> int:
+    from toolkit.extract import AnchorNotFound, dump
+    try:
+        dump(args.path, args.anchor, within=args.within, nth=args.nth, whole_lines=not args.exact)
+    except AnchorNotFound as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_xref(args) -> int:
+    from toolkit.xref import XrefDB, format_ref, report
+    db = XrefDB.open(workers=args.workers)
+    for error in db.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    if args.kind:
+        refs = db.bound(args.name, args.path) if args.kind == 'bound' else \
+            db.refs(args.name, args.kind, args.path)
+        for ref in refs:
+            print(format_ref(ref))
+        return 0 if refs else 1
+    report(db, args.name, args.path)
+    return 0 if db.refs(args.name) or db.bound(args.name) else 1
+
+
+def cmd_mojibake(args) -> int:
+    from toolkit.mojibake import format_finding, repair_tree, scan_tree
+    from toolkit.paths import SOURCE_EXTS
+    start = time.perf_counter()
+    roots = args.root or ('src',)
+    exts = tuple(args.ext) if args.ext else SOURCE_EXTS
+    if args.fix or args.dry_run:
+        repaired = repair_tree(roots, exts, paths=args.path or None, workers=args.workers,
+                               min_confidence=args.min_confidence, dry_run=args.dry_run)
+        for rel, applied in sorted(repaired.items()):
+            for f in applied:
+                print(format_finding(rel, f))
+        verb = '将修复' if args.dry_run else '已修复'
+        print(f'\n{verb} {sum(map(len, repaired.values()))} 处，涉及 {len(repaired)} 个文件，'
+              f'用时 {(time.perf_counter() - start) * 1000:.1f}ms')
+        return 0
+    result = scan_tree(roots, exts, paths=args.path or None, workers=args.workers)
+    for rel, findings in sorted(result.results.items()):
+        for f in findings:
+            print(format_finding(rel, f))
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    found = sum(map(len, result.results.values()))
+    print(f'\n{found} 处乱码，{len(result.results)} 个文件，用时 {(time.perf_counter() - start) * 1000:.1f}ms')
+    return 1 if found or result.errors else 0
+
+
+def cmd_census(args) -> int:
+    from toolkit import census
+    start = time.perf_counter()
+    roots = tuple(args.root) if args.root else census.CENSUS_ROOTS
+    result = census.run(roots, docs=not args.no_docs, workers=args.workers)
+    healths = list(result.results.values())
+    if args.json:
+        census.write_json(healths, args.json)
+    if args.csv:
+        census.write_csv(healths, args.csv)
+    for health in sorted(healths):
+        if health.clean and not args.all:
+            continue
+        detail = ', '.join(f'{c}×{health.counts[c]}@{health.first_line[c]}' for c in health.classes)
+        print(f'{health.path}: {detail or "clean"}')
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    totals = census.summary(healths)
+    print('\n' + '  '.join(f'{name}={count}' for name, count in totals.items()))
+    print(f'扫描 {result.scanned} / 复用 {result.cached + result.rehashed} 个文件，'
+          f'用时 {(time.perf_counter() - start) * 1000:.1f}ms')
+    return 1 if totals['files'] != totals['clean'] or result.errors else 0
+
+
+def cmd_hotpath(args) -> int:
+    from toolkit import hotpath
+    start = time.perf_counter()
+    result = hotpath.run(tuple(args.root) if args.root else hotpath.DEFAULT_ROOTS,
+                         paths=args.path, workers=args.workers)
+    ranked = hotpath.rank(result.results, args.items, args.inner)
+    for rel, total, allocations in ranked[:args.files] if args.files else ranked:
+        props = sum(1 for a in allocations if a.prop)
+        print(f'{rel}: 每次渲染约 {total} 次分配，{len(allocations)} 处（JSX 属性里 {props} 处）')
+        for allocation in allocations[:args.limit] if args.limit else allocations:
+            print('  ' + allocation.describe(args.items, args.inner))
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    print(f'\n{len(ranked)} 个文件，扫描 {result.scanned} / 复用 {result.cached + result.rehashed} 个，'
+          f'用时 {(time.perf_counter() - start) * 1000:.1f}ms')
+    return 0
+
+
+def cmd_stores(args) -> int:
+    from toolkit import stores as zs
+    stores = zs.find_stores()
+    if args.store:
+        stores = {hook: s for hook, s in stores.items() if hook in args.store}
+    result = zs.run(tuple(args.root) if args.root else zs.DEFAULT_ROOTS, paths=args.path, workers=args.workers)
+    subs = zs.subscriptions(result, stores)
+    if args.whole:
+        subs = [s for s in subs if s.mode != 'selector']
+    if args.diff:
+        sys.stdout.write(zs.diff(subs))
+        return 0
+    if args.write:
+        written = zs.write(subs)
+        for rel in written:
+            print(f'已改写 {rel}')
+        print(f'{len(written)} 个文件，可用 python -m toolkit backup restore {zs.PATCH_ID} 撤销')
+        return 0
+    for hook, store in sorted(stores.items()):
+        mine = [s for s in subs if s.hook == hook]
+        if not mine:
+            continue
+        actions = sum(1 for kind in store.fields.values() if kind == 'action')
+        getters = len(store.getters)
+        whole = [s for s in mine if s.mode == 'whole']
+        unstable = sum(1 for s in mine if s.mode == 'unstable')
+        print(f'{hook}（{store.path}，{store.state_type or "?"}: {len(store.fields) - actions - getters} 个状态字段、'
+              f'{actions} 个 action、{getters} 个 getter）')
+        print(f'  整仓订阅 {len(whole)} 处（可改写 {sum(1 for s in whole if s.rewritable)}），'
+              f'selector {len(mine) - len(whole)} 处（不稳定 {unstable}）')
+        for sub in mine:
+            fields = ', '.join(f + {'action': '()', 'getter': '()*', 'state': ''}.get(store.kind(f), '(不在 store 里)')
+                               for f in sub.fields) if store.fields else ', '.join(sub.fields)
+            fields = fields or '?'
+            mode = {'whole': '整仓', 'selector': 'selector', 'unstable': '不稳定'}[sub.mode]
+            where = f'{sub.path}:{sub.lineno}' + (f' [{sub.scope}]' if sub.scope else '')
+            tail = '  → 可改写' if sub.rewritable else (f'  ({sub.note})' if sub.note else '')
+            print(f'  {where}  {mode}  {fields}{tail}')
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    return 0
+
+
+def cmd_bundle(args) -> int:
+    from toolkit import bundle
+    graph, report, result = bundle.run(args.entry, workers=args.workers)
+    if args.why:
+        target = bundle.relpath(args.why)
+        chain = graph.path_to(args.entry, target)
+        if chain is None:
+            print(f'{target} 不在 {args.entry} 的首屏包里（没有静态 import 链）')
+            return 1
+        print(' -> '.join(chain))
+        return 0
+    print(f'首屏包（{report.entry} 静态可达）: {report.modules} 个模块，{report.initial / 1024:.1f} KiB 源码'
+          f'（图里共 {report.total / 1024:.1f} KiB）')
+    shown = [c for c in report.candidates if c.removed >= args.min_kb * 1024]
+    for candidate in shown[:args.limit] if args.limit else shown:
+        print('  ' + candidate.describe(report.initial))
+    for rel, imp in graph.unresolved:
+        print(f'无法解析 {rel}:{imp.lineno} {imp.spec!r}', file=sys.stderr)
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    return 0
+
+
+def cmd_records(args) -> int:
+    from toolkit import records
+    result = records.run(tuple(args.root) if args.root else records.DEFAULT_ROOTS, paths=args.path,
+                         workers=args.workers)
+    states = records.rank(result.results, args.tasks, args.small)
+    if args.timers:
+        states = [s for s in states if any(u.timer for u in s.updates if u.copies)]
+    if args.diff:
+        sys.stdout.write(records.diff(states))
+        return 0
+    if args.write:
+        written = records.write(states)
+        for rel in written:
+            print(f'已改写 {rel}')
+        print(f'{len(written)} 个文件，可用 python -m toolkit backup restore {records.PATCH_ID} 撤销')
+        return 0
+    for state in states[:args.limit] if args.limit else states:
+        print(state.describe(args.tasks, args.small))
+        for update in state.updates:
+            if update.copies:
+                key = f'[{update.key}]' if update.key else '展开'
+                timer = f'  ← 计时器：{update.timer}' if update.timer else ''
+                print(f'  {update.lineno}: {key}{timer}')
+        print('  → 可改成 useReducer' if state.rewritable else f'  不改写：{state.note}')
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    return 0
+
+
+def cmd_timers(args) -> int:
+    from toolkit import timers
+    result = timers.run(tuple(args.root) if args.root else timers.DEFAULT_ROOTS, paths=args.path,
+                        workers=args.workers)
+    inv = timers.inventory(result.results, args.tasks)
+    steady = [r for r in inv.rows if r.wakeups != 0]
+    for row in steady[:args.limit] if args.limit else steady:
+        print(row.describe())
+    if args.all:
+        for row in inv.one_shot:
+            print(row.describe())
+    items = sum(1 for r in inv.rows if r.per_item and r.wakeups)
+    print(f'\n{args.tasks} 个可见任务：稳定状态约 {inv.total:.1f} 次唤醒/秒，其中任务列表项里 {items} 处计时器 '
+          f'{inv.per_item:.1f} 次/秒')
+    if inv.per_item:
+        tick, rate = inv.shared_tick(args.tick)
+        print(f'列表项计时器合并成一个 {tick:.4g}ms 的共享 tick：{rate:.1f} 次/秒'
+              f'（总计约 {inv.total - inv.per_item + rate:.1f} 次/秒）')
+    print(f'周期未知 {len(inv.unknown)} 处，一次性 setTimeout / rAF {len(inv.one_shot)} 处（不计入，--all 列出）')
+    for error in result.errors:
+        print(f'读取失败 {error.path}: {error.error}', file=sys.stderr)
+    return 0
+
+
+def cmd_backup(args) -> int:
+    from toolkit import backup
+    if args.action == 'list':
+        snapshots = backup.history(args.path[0] if args.path else None, args.patch)
+        for snap in snapshots[-args.limit:] if args.limit else snapshots:
+            print(snap.describe())
+        return 0
+    if args.action == 'restore':
+        if not args.patch:
+            print('restore 需要补丁 ID，例如: python -m toolkit backup restore fix_verification_bug')
+            return 2
+        try:
+            restored = backup.restore(args.patch, args.path or None, dry_run=args.dry_run)
+        except backup.BackupError as exc:
+            print(exc)
+            return 1
+        verb = '将恢复' if args.dry_run else '已恢复'
+        for snap in restored:
+            print(f'{verb} {snap.path} -> {snap.hash[:12]}（{", ".join(snap.patches)} 之前）')
+        return 0
+    if args.action == 'import':
+        for snap in backup.import_copies(remove=args.remove):
+            print(f'已导入 {snap.path}.backup -> {snap.hash[:12]}')
+    totals = backup.stats()
+    print(f'{totals["snapshots"]} 个快照，{totals["objects"]} 个版本，'
+          f'占用 {totals["stored"] / 1024:.1f} KiB（全文合计 {totals["logical"] / 1024:.1f} KiB）')
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    from toolkit import daemon
+    if args.action == 'run':
+        daemon.serve()
+        return 0
+    if args.action == 'start':
+        status = daemon.start()
+        print(f'守护进程 pid {status["pid"]}，已处理 {status["served"]} 个请求')
+        return 0
+    if args.action == 'stop':
+        print('已停止' if daemon.stop() else '守护进程没有在运行')
+        return 0
+    status = daemon.ping()
+    if status is None:
+        print('守护进程没有在运行')
+        return 1
+    print(f'守护进程 pid {status["pid"]}，运行 {status["uptime"]}s，已处理 {status["served"]} 个请求')
+    if status.get('watching'):
+        print(f'inotify 监视 {", ".join(status["watching"])}，第 {status["generation"]} 批改动')
+    else:
+        print('没有 inotify 监视，查询前按 stat 检查新旧')
+    files = status.get('files')
+    if files:
+        print(f'文件缓存 {files["items"]} 个，约 {files["bytes"] / 2**20:.1f}/{files["max_bytes"] / 2**20:.0f} MB，'
+              f'命中 {files["hits"]} / 未命中 {files["misses"]}，淘汰 {files["evictions"]}')
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m toolkit', description='ManifestOS 源码工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('index', help='增量刷新 src/ 的三元组索引')
+    p.set_defaults(func=cmd_index)
+
+    p = sub.add_parser('grep', help='通过三元组索引按行查找')
+    p.add_argument('pattern')
+    p.add_argument('-F', '--fixed', action='store_true', help='按字面量匹配而不是正则')
+    p.add_argument('-i', '--ignore-case', action='store_true')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--limit', type=int)
+    p.add_argument('--width', type=int, default=150)
+    p.set_defaults(func=cmd_grep)
+
+    p = sub.add_parser('lookup', help='批量执行 find_*.py 对应的查询（每个文件只读一遍）')
+    p.add_argument('names', nargs='*')
+    p.add_argument('--all', action='store_true')
+    p.set_defaults(func=cmd_lookup)
+
+    p = sub.add_parser('usages', help='跨文件正则搜索（进程池 + 增量缓存）')
+    p.add_argument('pattern')
+    p.add_argument('--require', action='append', help='文件必须包含的字面量（可重复）')
+    p.add_argument('--root', action='append', help='搜索根目录，默认 src')
+    p.add_argument('--workers', type=int)
+    p.add_argument('--limit', type=int, default=3)
+    p.add_argument('--width', type=int, default=200)
+    p.set_defaults(func=cmd_usages)
+
+    p = sub.add_parser('spans', help='列出文件的函数/JSX/对象 span，或按名字取出源码')
+    p.add_argument('path')
+    p.add_argument('name', nargs='?')
+    p.add_argument('--kind', choices=('function', 'arrow', 'jsx', 'object'))
+    p.set_defaults(func=cmd_spans)
+
+    p = sub.add_parser('extract', help='按结构锚点（symbol:/text:/comment:）提取代码片段')
+    p.add_argument('path')
+    p.add_argument('anchor')
+    p.add_argument('--within', help='改取外层最近的 span，如 jsx:button、arrow')
+    p.add_argument('--nth', type=int, default=0, help='第几个匹配（从 0 开始）')
+    p.add_argument('--exact', action='store_true', help='不扩展到整行')
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser('xref', help='符号交叉引用：定义、import、JSX 属性绑定、调用点')
+    p.add_argument('name')
+    p.add_argument('--kind', choices=('def', 'import', 'prop', 'call', 'member', 'bound'))
+    p.add_argument('--path', help='限定文件')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_xref)
+
+    p = sub.add_parser('mojibake', help='在原始字节上检测 GBK/UTF-8 乱码，可按置信度往返修复')
+    p.add_argument('--root', action='append', help='扫描根目录，默认 src')
+    p.add_argument('--ext', action='append', help='文件扩展名，默认 .ts/.tsx（可重复，如 --ext .md）')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--fix', action='store_true', help='写回可恢复的段')
+    p.add_argument('--dry-run', action='store_true', help='只列出将要修复的段')
+    p.add_argument('--min-confidence', type=float, default=0.8)
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_mojibake)
+
+    p = sub.add_parser('census', help='编码普查：BOM、换行、U+FFFD、问号串、`r`n、乱码，输出 JSON/CSV')
+    p.add_argument('--root', action='append', help='普查根目录，默认 src 和 api')
+    p.add_argument('--no-docs', action='store_true', help='不包括仓库根目录的 *.md / *.txt')
+    p.add_argument('--json', help='JSON 报告路径')
+    p.add_argument('--csv', help='CSV 报告路径')
+    p.add_argument('--all', action='store_true', help='干净的文件也列出来')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_census)
+
+    p = sub.add_parser('hotpath', help='列表渲染回调（.map）里每次渲染新建的闭包、style 对象、数组，按文件排序')
+    p.add_argument('--root', action='append', help='扫描根目录，默认 src')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--items', type=int, default=100, help='看不出长度的最外层列表按多少个元素估算')
+    p.add_argument('--inner', type=int, default=10, help='看不出长度的内层列表按多少个元素估算')
+    p.add_argument('--files', type=int, help='只列出前几个文件')
+    p.add_argument('--limit', type=int, default=10, help='每个文件列出几处（0 为全部）')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_hotpath)
+
+    p = sub.add_parser('stores', help='zustand store 订阅审计：整仓订阅、读到的字段，--diff 输出改成 selector 的补丁')
+    p.add_argument('--store', action='append', help='只看某个 store 的 hook，如 useTaskStore（可重复）')
+    p.add_argument('--root', action='append', help='扫描根目录，默认 src')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--whole', action='store_true', help='只列出整仓订阅和不稳定的 selector')
+    p.add_argument('--diff', action='store_true', help='输出可改写订阅的统一 diff（可 git apply）')
+    p.add_argument('--write', action='store_true', help='直接改写文件（改前自动快照）')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_stores)
+
+    p = sub.add_parser('bundle', help='import 图 + 支配树：按能从首屏包拿掉的字节数排出动态 import 切分点')
+    p.add_argument('--entry', default='src/main.tsx', help='入口模块，默认 src/main.tsx')
+    p.add_argument('--limit', type=int, default=20, help='列出前几个候选（0 为全部）')
+    p.add_argument('--min-kb', type=float, default=0, help='只列出至少能拿掉这么多 KiB 的候选')
+    p.add_argument('--why', metavar='PATH', help='打印入口到 PATH 的最短静态 import 链')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_bundle)
+
+    p = sub.add_parser('records', help='按 key 存放的 state 用 {...prev, [k]: v} 整张复制的更新，--diff 输出改成 useReducer 的补丁')
+    p.add_argument('--root', action='append', help='扫描根目录，默认 src')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--tasks', type=int, default=100, help='按任务 ID 存放的表按多少个 key 估算')
+    p.add_argument('--small', type=int, default=10, help='其他表按多少个 key 估算')
+    p.add_argument('--timers', action='store_true', help='只看由计时器 / 倒计时驱动更新的 state')
+    p.add_argument('--limit', type=int, help='只列出前几个 state')
+    p.add_argument('--diff', action='store_true', help='输出可改写 state 的统一 diff（可 git apply）')
+    p.add_argument('--write', action='store_true', help='直接改写文件（改前自动快照）')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_records)
+
+    p = sub.add_parser('timers', help='setInterval / setTimeout / requestAnimationFrame 清单：周期、所属组件、N 个任务时每秒唤醒次数')
+    p.add_argument('--root', action='append', help='扫描根目录，默认 src')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--tasks', type=int, default=20, help='可见任务数（任务列表项里的计时器按这么多份计）')
+    p.add_argument('--tick', type=float, help='共享 tick 的周期（毫秒），默认取列表项计时器里最短的周期')
+    p.add_argument('--limit', type=int, help='只列出唤醒最多的前几处')
+    p.add_argument('--all', action='store_true', help='同时列出一次性的 setTimeout / rAF')
+    p.add_argument('--workers', type=int)
+    p.set_defaults(func=cmd_timers)
+
+    p = sub.add_parser('backup', help='改写前快照：list / restore <补丁 ID> / import 旧的 *.backup / stats')
+    p.add_argument('action', choices=('list', 'restore', 'import', 'stats'))
+    p.add_argument('patch', nargs='?', help='补丁 ID（list 时用来过滤）')
+    p.add_argument('--path', action='append', help='限定文件（可重复）')
+    p.add_argument('--limit', type=int, help='list 只显示最近几条')
+    p.add_argument('--dry-run', action='store_true', help='restore 时只列出将要恢复的文件')
+    p.add_argument('--remove', action='store_true', help='import 之后删除原来的 *.backup 副本')
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser('daemon', help='常驻进程：start / stop / status；run 在前台运行（客户端见根目录 tk.py）')
+    p.add_argument('action', choices=('start', 'stop', 'status', 'run'))
+    p.set_defaults(func=cmd_daemon)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:  # 输出被 head 之类截断
+        sys.stderr.close()
+        return 0
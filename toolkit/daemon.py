@@ -0,0 +1,264 @@
+"""常驻守护进程：把 find_*/extract_*/check_* 脚本和 `python -m toolkit` 命令放进一个热进程里跑。
+
+连续排查时几十个小脚本挨个启动，每个都要付 Python 启动、import toolkit、重新打开
+同一个 5000 行文件、重新加载三元组索引的代价。守护进程只启动一次，分词、span、
+行表、三元组索引都留在内存里（各模块按内容哈希的 _memo，TrigramIndex.open 复用已
+加载的实例），之后每个请求只剩真正的查询时间。
+
+协议：`.toolkit_cache/daemon.sock` 上的 Unix 域套接字，每行一个 JSON 请求、一行 JSON 应答，
+一个连接可以连续发多个请求：
+
+    {"argv": ["grep", "-F", "handleStartTask"]}            python -m toolkit 的子命令
+    {"script": "find_button.py", "args": [], "cwd": "..."}  仓库里的脚本（runpy 执行）
+    {"op": "ping"} / {"op": "stop"}
+    -> {"code": 0, "out": "...", "err": "...", "ms": 1.2}
+
+toolkit 自身的源码变了，守护进程回一个 restart 应答后退出，客户端（根目录 tk.py）
+会自动重启它再重试。请求串行执行：stdout/argv/cwd 都是进程级状态。
+
+守护进程同时用 inotify 监视 src/ 和 api/（toolkit.watch）：三元组索引和 walk 的结果
+只为改过的文件重算，查询前不再把整棵树 stat 一遍；一批改动合并好后还会在后台先把
+索引和改过文件的 span 算好（放进 toolkit.files 的文件缓存）。
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import runpy
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from toolkit.paths import CACHE_DIR, REPO_ROOT
+
+SOCKET_PATH = Path(os.environ.get('TOOLKIT_SOCKET', CACHE_DIR / 'daemon.sock'))
+# 应答里表示「代码已更新，请重启后重试」的退出码（EX_TEMPFAIL）
+RESTART_CODE = 75
+_TOOLKIT_DIR = Path(__file__).resolve().parent
+
+
+def _code_stamp() -> tuple[int, ...]:
+    return tuple(sorted(p.stat().st_mtime_ns for p in _TOOLKIT_DIR.glob('*.py')))
+
+
+@contextmanager
+def _captured(argv: list[str], cwd: str | None) -> Iterator[dict[str, Any]]:
+    """把 stdout/stderr 接到内存里。脚本常见的 `io.TextIOWrapper(sys.stdout.buffer)`
+    也能用：包的是同一个 BytesIO。"""
+    out, err = io.BytesIO(), io.BytesIO()
+    saved = sys.stdout, sys.stderr, sys.argv, os.getcwd()
+    # 自己留着包装对象的引用：脚本替换 sys.stdout 后它若被回收，会顺手关掉 BytesIO
+    wrappers = [io.TextIOWrapper(buf, encoding='utf-8', errors='replace', write_through=True)
+                for buf in (out, err)]
+    sys.stdout, sys.stderr = wrappers
+    sys.argv = argv
+    if cwd:
+        os.chdir(cwd)
+    result: dict[str, Any] = {}
+    try:
+        yield result
+    finally:
+        try:
+            for stream in (sys.stdout, sys.stderr, *wrappers):
+                try:
+                    stream.flush()
+                except ValueError:      # 脚本自己把流关掉了
+                    pass
+            # 必须在恢复 sys.stdout 之前取：脚本自己的包装对象随后被回收时会关掉 BytesIO
+            result['out'] = out.getvalue().decode('utf-8', errors='replace') if not out.closed else ''
+            result['err'] = err.getvalue().decode('utf-8', errors='replace') if not err.closed else ''
+        finally:
+            sys.stdout, sys.stderr, sys.argv = saved[:3]
+            os.chdir(saved[3])
+
+
+def _exit_code(exc: SystemExit) -> int:
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def _run(request: dict) -> int:
+    if 'argv' in request:
+        from toolkit.cli import main
+        return main(list(request['argv']))
+    script = Path(request['script'])
+    if not script.is_absolute():
+        script = Path(request.get('cwd') or REPO_ROOT) / script
+    # 脚本 import 的同级模块（step1_imports 之类）每次重新加载，改了马上生效
+    before = set(sys.modules)
+    try:
+        runpy.run_path(str(script), run_name='__main__')
+    finally:
+        for name in set(sys.modules) - before:
+            origin = getattr(sys.modules[name], '__file__', None)
+            if origin and Path(origin).resolve().parent != _TOOLKIT_DIR:
+                del sys.modules[name]
+    return 0
+
+
+def handle(request: dict) -> dict:
+    """执行一个请求（在守护进程里），返回应答。"""
+    start = time.perf_counter()
+    argv = ['python -m toolkit', *request['argv']] if 'argv' in request else \
+        [request['script'], *request.get('args', ())]
+    with _captured(argv, request.get('cwd')) as result:
+        try:
+            code = _run(request)
+        except SystemExit as exc:
+            code = _exit_code(exc)
+        except BaseException as exc:   # 请求失败不能拖垮守护进程
+            import traceback
+            traceback.print_exc()
+            code = 1 if not isinstance(exc, KeyboardInterrupt) else 130
+    result['code'] = code if isinstance(code, int) else 0
+    result['ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server: Server = self.server      # type: ignore[assignment]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            op = request.get('op')
+            if op == 'ping':
+                from toolkit import watch
+                from toolkit.files import cache_stats
+                watcher = watch.active()
+                reply = {'code': 0, 'pid': os.getpid(), 'served': server.served,
+                         'uptime': round(time.time() - server.started, 1),
+                         'watching': list(watcher.roots) if watcher else [],
+                         'generation': watcher.generation if watcher else None,
+                         'files': cache_stats()}
+            elif op == 'stop':
+                reply = {'code': 0, 'out': '守护进程已停止\n'}
+                server.stop()
+            elif _code_stamp() != server.stamp:
+                reply = {'code': RESTART_CODE, 'restart': True,
+                         'err': 'toolkit 源码已更新，守护进程退出\n'}
+                server.stop()
+            else:
+                with server.lock:
+                    reply = handle(request)
+                server.served += 1
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if server.stopping:
+                return
+
+
+class Server(socketserver.UnixStreamServer):
+    def __init__(self, path: Path = SOCKET_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            if ping(path) is not None:
+                raise RuntimeError(f'守护进程已经在运行（{path}）')
+            path.unlink()       # 上次异常退出留下的套接字
+        super().__init__(str(path), _Handler)
+        self.path = path
+        self.stamp = _code_stamp()
+        self.started = time.time()
+        self.served = 0
+        self.stopping = False
+        # 请求和监视器的预热互斥：两边都会动各模块的内存缓存
+        self.lock = threading.RLock()
+
+    def stop(self) -> None:
+        self.stopping = True
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _prewarm(server: Server, changed: set[str] | None) -> None:
+    """监视器合并出一批改动后，趁空闲把三元组索引和改过文件的分词、span 先算好。"""
+    from toolkit.files import cached
+    from toolkit.paths import is_source_file
+    from toolkit.trigram import TrigramIndex
+    with server.lock:
+        try:
+            TrigramIndex.open()
+            for rel in sorted(changed or ()):
+                if is_source_file(rel):
+                    try:
+                        cached(rel).spans()
+                    except OSError:
+                        pass
+        except Exception:       # 预热失败不影响之后的请求，请求里会照常重算
+            import traceback
+            traceback.print_exc()
+
+
+def serve(path: Path = SOCKET_PATH) -> None:
+    """前台运行，直到收到 stop 或代码更新。"""
+    os.chdir(REPO_ROOT)
+    from toolkit import watch
+    with Server(path) as server:
+        watch.start(on_change=lambda changed: _prewarm(server, changed))
+        try:
+            server.serve_forever()
+        finally:
+            watch.stop()
+            server.server_close()
+
+
+# -- 客户端一侧 ------------------------------------------------------------------
+
+def request(payload: dict, path: Path = SOCKET_PATH, timeout: float | None = None) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+def ping(path: Path = SOCKET_PATH) -> dict | None:
+    try:
+        return request({'op': 'ping'}, path, timeout=2)
+    except (OSError, ValueError):
+        return None
+
+
+def start(path: Path = SOCKET_PATH, wait: float = 10.0) -> dict:
+    """在后台启动守护进程并等它就绪；已经在运行时直接返回它的状态。"""
+    status = ping(path)
+    if status is not None:
+        return status
+    env = dict(os.environ, TOOLKIT_SOCKET=str(path))
+    subprocess.Popen([sys.executable, '-m', 'toolkit', 'daemon', 'run'], cwd=REPO_ROOT, env=env,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        status = ping(path)
+        if status is not None:
+            return status
+        time.sleep(0.05)
+    raise TimeoutError(f'守护进程 {wait:.0f}s 内没有就绪')
+
+
+def stop(path: Path = SOCKET_PATH) -> bool:
+    try:
+        request({'op': 'stop'}, path, timeout=5)
+    except (OSError, ValueError):
+        return False
+    return True
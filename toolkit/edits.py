@@ -0,0 +1,189 @@
+"""批量编辑事务：step*.py 这类改写脚本的统一写入口。
+
+所有插入/替换/删除都用「原始文件」的坐标登记，互不影响；提交时按位置排序、
+检查重叠，一遍线性拼接出新内容，只写一次文件。前面的编辑让后面的位置整体
+下移这件事由事务负责，脚本里的行号不再需要手工加上前几步插入的行数：
+
+    with Transaction(TIMELINE) as tx:
+        tx.insert_lines(22, NEW_IMPORTS)      # 第 22 行之后
+        tx.insert_lines(83, NEW_STATES)       # 仍然是原始文件的第 83 行
+    # 退出 with 时提交；块内抛异常则什么都不写
+
+文件按 UTF-8 + surrogateescape 解码，坏字节原样写回；换行符保持原样。
+提交前只对改动所在的函数 / JSX 元素做结构检查，括号或标签被改坏时抛
+structure.StructureError，文件不动。
+"""
+from __future__ import annotations
+
+import os
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from toolkit import cache, structure
+from toolkit.files import read_bytes, write_bytes
+from toolkit.paths import relpath, resolve
+
+if TYPE_CHECKING:
+    from toolkit.patterns import TokenMatch, TokenPattern
+
+
+class EditConflict(ValueError):
+    """编辑区间重叠，或文件在事务期间被别的程序改过。"""
+
+
+class Edit(NamedTuple):
+    start: int      # 原始文本中的字符偏移（含）
+    end: int        # 不含；start == end 表示纯插入
+    text: str
+    order: int      # 登记顺序：同一位置的多个插入按登记顺序排列
+
+
+def join_lines(lines: str | Iterable[str]) -> str:
+    """接受整段文本或行列表（行尾可带可不带换行）。"""
+    if isinstance(lines, str):
+        return lines
+    return ''.join(line if line.endswith('\n') else line + '\n' for line in lines)
+
+
+class Transaction:
+    def __init__(self, path: str | os.PathLike, encoding: str = 'utf-8', check: bool = True):
+        self.path = relpath(resolve(path))
+        self.encoding = encoding
+        self.check = check      # 提交前做结构检查（toolkit.structure），改坏了就不写
+        self._stat = cache.stat_key(resolve(path))
+        self.original = read_bytes(path).decode(encoding, errors='surrogateescape')
+        self.edits: list[Edit] = []
+        self._line_starts: list[int] | None = None
+        self.committed = False
+
+    # -- 坐标 ------------------------------------------------------------------
+
+    def line_offset(self, lineno: int) -> int:
+        """第 lineno 行（从 1 开始）行首的字符偏移；lineno = 行数 + 1 表示文件末尾。"""
+        if self._line_starts is None:
+            text = self.original
+            starts = [0]
+            pos = text.find('\n')
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = text.find('\n', pos + 1)
+            if starts[-1] != len(text):
+                starts.append(len(text))
+            self._line_starts = starts
+        if not 1 <= lineno <= len(self._line_starts):
+            raise IndexError(f'{self.path} 只有 {len(self._line_starts) - 1} 行，没有第 {lineno} 行')
+        return self._line_starts[lineno - 1]
+
+    def lineno(self, offset: int) -> int:
+        """原始文本中 offset 所在的行号（从 1 开始）。"""
+        self.line_offset(1)
+        return bisect_right(self._line_starts, offset)
+
+    def line_count(self) -> int:
+        self.line_offset(1)
+        return len(self._line_starts) - 1
+
+    def find(self, needle: str, start: int = 0) -> int:
+        """在原始文本中查找，找不到时抛 LookupError 而不是返回 -1。"""
+        pos = self.original.find(needle, start)
+        if pos < 0:
+            raise LookupError(f'{self.path} 中找不到 {needle[:60]!r}')
+        return pos
+
+    def anchor(self, pattern: 'TokenPattern', nth: int = 0) -> 'TokenMatch':
+        """原始文本中 pattern 的第 nth 处匹配（负数从末尾数），没有时抛 LookupError。"""
+        matches = pattern.finditer(self.original)
+        if nth >= 0:
+            match = next((m for i, m in enumerate(matches) if i == nth), None)
+        else:
+            found = list(matches)
+            match = found[nth] if len(found) >= -nth else None
+        if match is None:
+            raise LookupError(f'{self.path} 中找不到锚点 {pattern.snippet!r}（nth={nth}）')
+        return match
+
+    # -- 登记编辑 --------------------------------------------------------------
+
+    def replace(self, start: int, end: int, text: str) -> None:
+        if not 0 <= start <= end <= len(self.original):
+            raise IndexError(f'区间 [{start}, {end}) 超出 {self.path} 的范围')
+        self.edits.append(Edit(start, end, text, len(self.edits)))
+
+    def insert(self, offset: int, text: str) -> None:
+        self.replace(offset, offset, text)
+
+    def delete(self, start: int, end: int) -> None:
+        self.replace(start, end, '')
+
+    def insert_lines(self, after: int, lines: str | Iterable[str]) -> None:
+        """在原始文件第 after 行之后插入（after=0 表示文件开头），等价于 `lines[after:after] = new`。"""
+        self.insert(self.line_offset(after + 1), join_lines(lines))
+
+    def replace_lines(self, first: int, last: int, lines: str | Iterable[str]) -> None:
+        """替换原始文件的第 first..last 行（含）。"""
+        self.replace(self.line_offset(first), self.line_offset(last + 1), join_lines(lines))
+
+    def delete_lines(self, first: int, last: int) -> None:
+        self.replace_lines(first, last, '')
+
+    # -- 提交 ------------------------------------------------------------------
+
+    def _ordered(self) -> list[Edit]:
+        # 同一位置：纯插入排在替换之前，再按登记顺序
+        edits = sorted(self.edits, key=lambda e: (e.start, e.end > e.start, e.order))
+        reached = 0
+        for i, edit in enumerate(edits):
+            if edit.start < reached:
+                prev = next(e for e in edits[:i] if e.end > edit.start)
+                raise EditConflict(f'{self.path}: 编辑 [{prev.start}, {prev.end}) 与 '
+                                   f'[{edit.start}, {edit.end}) 重叠')
+            reached = max(reached, edit.end)
+        return edits
+
+    def rebase(self, offset: int) -> int:
+        """原始偏移在应用全部编辑后的位置；落在被替换区间里的偏移映射到替换文本开头。"""
+        shift = 0
+        for edit in self._ordered():
+            if edit.start > offset or (edit.start == offset and edit.end > edit.start):
+                break
+            if edit.end > offset:
+                return edit.start + shift
+            shift += len(edit.text) - (edit.end - edit.start)
+        return offset + shift
+
+    def apply(self) -> str:
+        """一遍拼接出编辑后的全文（不写文件）。"""
+        original = self.original
+        chunks: list[str] = []
+        pos = 0
+        for edit in self._ordered():
+            chunks.append(original[pos:edit.start])
+            chunks.append(edit.text)
+            pos = edit.end
+        chunks.append(original[pos:])
+        return ''.join(chunks)
+
+    def commit(self) -> bool:
+        """写回文件；没有编辑或结果与原文相同时不写，返回是否写了。"""
+        if self.committed:
+            raise RuntimeError('事务已经提交过')
+        self.committed = True
+        if not self.edits:
+            return False
+        text = self.apply()
+        if text == self.original:
+            return False
+        if cache.stat_key(resolve(self.path)) != self._stat:
+            raise EditConflict(f'{self.path} 在事务期间被修改，放弃写入')
+        if self.check:
+            structure.ensure_valid(self.path, self.original,
+                                   [(e.start, e.end, e.text) for e in self._ordered()], text)
+        write_bytes(self.path, text.encode(self.encoding, errors='surrogateescape'))
+        return True
+
+    def __enter__(self) -> 'Transaction':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and not self.committed:
+            self.commit()
@@ -0,0 +1,166 @@
+"""按结构锚点提取代码片段，取代写死的行号区间和 temp_*.txt 快照。
+
+锚点写法：
+    symbol:handleStartTask      span 索引里同名的函数 / 箭头函数 / 对象
+    text:间隔                   包含这段文字的 JSX 文本或字符串所在的最内层 JSX 元素
+    comment:间隔按钮            包含这段文字的注释之后紧跟的第一个结构
+
+`within='jsx:button'`（或 'arrow'、'object' 等）改为取锚点所在位置外层最近的该类
+span，JSX 可以再限定标签名。解析走按内容哈希缓存的 token/span/行偏移表，结果是
+文件 mmap 上的 memoryview 切片，不复制、不落盘：
+
+    with extract(TIMELINE, 'comment:间隔按钮') as region:
+        sys.stdout.buffer.write(region.view)
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+
+from toolkit import cache
+from toolkit.lines import LineTable, table_for
+from toolkit.paths import relpath, resolve
+from toolkit.spans import Span, SpanIndex, spans_for
+from toolkit.tokenizer import Token, is_jsx_file, tokens_for
+
+ANCHOR_KINDS = ('symbol', 'text', 'comment')
+
+
+class AnchorNotFound(LookupError):
+    pass
+
+
+def parse_anchor(anchor: str) -> tuple[str, str]:
+    kind, sep, needle = anchor.partition(':')
+    if not sep or kind not in ANCHOR_KINDS or not needle:
+        raise ValueError(f'锚点格式应为 symbol:/text:/comment: 加内容，收到 {anchor!r}')
+    return kind, needle
+
+
+def _parse_within(within: str | None) -> tuple[str | None, str | None]:
+    if not within:
+        return None, None
+    kind, _sep, tag = within.partition(':')
+    return kind, tag or None
+
+
+def _enclosing(index: SpanIndex, offset: int, kind: str | None, tag: str | None) -> Span | None:
+    span = index.enclosing(offset, kind)
+    while span is not None and tag is not None and span.name != tag:
+        span = next((s for s in index.ancestors(span) if s.kind == kind), None)
+    return span
+
+
+def resolve_anchor(index: SpanIndex, tokens: list[Token], anchor: str,
+                   within: str | None = None, nth: int = 0) -> Span:
+    """在一个文件版本里把锚点解析成 span（字符偏移）。"""
+    kind, needle = parse_anchor(anchor)
+    within_kind, within_tag = _parse_within(within)
+
+    if kind == 'symbol':
+        found = index.find(needle)
+        if len(found) <= nth:
+            raise AnchorNotFound(f'找不到第 {nth + 1} 个 {anchor}')
+        span = found[nth]
+        if within_kind is not None:
+            span = _enclosing(index, span.start, within_kind, within_tag) or span
+        return span
+
+    if kind == 'comment':
+        hits = [t for t in tokens if t.kind == 'comment' and needle in t.value]
+    else:  # JSX 文本优先，其次才是字符串
+        hits = [t for t in tokens if t.kind == 'jsx_text' and needle in t.value] + \
+            [t for t in tokens if t.kind in ('string', 'template') and needle in t.value]
+    if len(hits) <= nth:
+        raise AnchorNotFound(f'找不到第 {nth + 1} 个 {anchor}')
+    token = hits[nth]
+
+    if within_kind is not None:
+        span = _enclosing(index, token.start, within_kind, within_tag)
+    elif kind == 'text':
+        span = index.enclosing(token.start, 'jsx')
+    else:
+        span = index.following(token.end)
+    if span is None:
+        raise AnchorNotFound(f'{anchor} 附近没有符合条件的结构')
+    return span
+
+
+class Region:
+    """锚点解析出的片段：`view` 是文件 mmap 上的零拷贝切片。用完需要 close()。"""
+
+    def __init__(self, path: str, span: Span, start: int, end: int,
+                 first_line: int, last_line: int, view: memoryview, mm: mmap.mmap | None):
+        self.path = path
+        self.span = span
+        self.start = start          # 字节偏移
+        self.end = end
+        self.first_line = first_line  # 从 1 开始，含
+        self.last_line = last_line
+        self.view = view
+        self._mm = mm
+
+    def text(self) -> str:
+        return str(self.view, 'utf-8', 'replace')
+
+    def close(self) -> None:
+        self.view.release()
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> 'Region':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'<Region {self.path}:{self.first_line}-{self.last_line} {self.span.kind} {self.span.name!r}>'
+
+
+def extract(path: str | os.PathLike, anchor: str, within: str | None = None,
+            nth: int = 0, whole_lines: bool = False) -> Region:
+    """把锚点解析成当前文件中的字节区间并返回零拷贝切片。
+
+    whole_lines=True 时区间扩展到首尾所在的整行（便于带缩进打印）。
+    """
+    real = resolve(path)
+    with open(real, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+    data = mm if mm is not None else b''
+    try:
+        digest = cache.content_hash(data)
+        # 同一份 mmap 只哈希一次：分词、span、行表都用这个 digest 查缓存
+        _digest, tokens = tokens_for(data, is_jsx_file(real), digest)
+        span = resolve_anchor(spans_for(data, is_jsx_file(real), digest), tokens, anchor, within, nth)
+        table: LineTable = table_for(data, digest)
+        start = table.char_to_byte(span.start, data)
+        end = table.char_to_byte(span.end, data)
+        first, last = table.line_of_byte(start), table.line_of_byte(max(start, end - 1))
+        if whole_lines:
+            start = table.byte_starts[first]
+            end = table.byte_starts[last + 1]
+    except BaseException:
+        if mm is not None:
+            mm.close()
+        raise
+    return Region(relpath(real), span, start, end, first + 1, last + 1,
+                  memoryview(data)[start:end], mm)
+
+
+def dump(path: str | os.PathLike, anchor: str, within: str | None = None, nth: int = 0,
+         whole_lines: bool = True) -> Region:
+    """把片段（整行）直接写到 stdout，前面加一行 `# 路径:起-止`。返回已关闭的 Region。"""
+    with extract(path, anchor, within=within, nth=nth, whole_lines=whole_lines) as region:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+        out.write(f'# {region.path}:{region.first_line}-{region.last_line} '
+                  f'({region.span.kind} {region.span.name or ""})\n'.encode('utf-8'))
+        out.write(region.view)
+        if region.view[-1:] != b'\n':
+            out.write(b'\n')
+        out.flush()
+    return region
@@ -0,0 +1,194 @@
+"""统一的文件读写入口：所有工具都按 UTF-8 解码，坏字节替换成 U+FFFD 而不是悄悄丢掉；
+写入一律先写同目录临时文件再 rename，中断时不会留下半个源文件。
+
+读过的文件按 (realpath, mtime_ns, size) 放进进程内的 LRU（总大小上限 FILE_CACHE_BYTES），
+解码后的文本、行表、token 流都挂在同一项上按需补算：同一进程里（守护进程、run_steps
+之类连着跑的脚本）反复读一个没变的文件，不再重新读盘、解码、哈希。`src/...`、绝对路径、
+旧的 `w:/001jiaweis/22222/...` 写法解析到同一个 realpath，共用一项。
+
+    entry = cached(TIMELINE)
+    entry.text, entry.lines, entry.tokens()
+"""
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+from toolkit import cache
+from toolkit.paths import relpath, resolve
+
+if TYPE_CHECKING:
+    from toolkit.lines import LineTable
+    from toolkit.spans import SpanIndex
+    from toolkit.tokenizer import Token
+
+FILE_CACHE_BYTES = int(os.environ.get('TOOLKIT_FILE_CACHE_MB', '128')) * 1024 * 1024
+# 按内容哈希的分词 / span 内存缓存（tokenizer、spans 的 _memo）各自的上限
+MEMO_BYTES = FILE_CACHE_BYTES // 2
+# 一个 Token（NamedTuple 加上 value 字符串）大致占用的内存，用来估算缓存大小
+TOKEN_BYTES = 150
+
+
+class CachedFile:
+    """文件的一个版本：原始字节，以及按需补算的文本、内容哈希、行表、token、span。"""
+
+    __slots__ = ('key', 'path', 'data', '_text', '_digest', '_lines', '_tokens', '_spans')
+
+    def __init__(self, key: tuple[str, int, int], data: bytes):
+        self.key = key                  # (realpath, mtime_ns, size)
+        self.path = relpath(key[0])
+        self.data = data
+        self._text: str | None = None
+        self._digest: str | None = None
+        self._lines: LineTable | None = None
+        self._tokens: dict[bool, list[Token]] = {}
+        self._spans: dict[bool, SpanIndex] = {}
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.data.decode('utf-8', errors='replace')
+            self._grown()
+        return self._text
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = cache.content_hash(self.data)
+        return self._digest
+
+    @property
+    def lines(self) -> LineTable:
+        """含字符偏移的行表（toolkit.lines.table_for）。"""
+        if self._lines is None:
+            from toolkit.lines import table_for
+            self._lines = table_for(self.data, self.digest)
+            self._grown()
+        return self._lines
+
+    def tokens(self, jsx: bool | None = None) -> list[Token]:
+        """分词结果；jsx 省略时按扩展名判断。"""
+        from toolkit.tokenizer import is_jsx_file, tokens_for
+        jsx = is_jsx_file(self.path) if jsx is None else jsx
+        tokens = self._tokens.get(jsx)
+        if tokens is None:
+            _digest, tokens = tokens_for(self.data, jsx, self.digest)
+            self._tokens[jsx] = tokens
+            self._grown()
+        return tokens
+
+    def spans(self, jsx: bool | None = None) -> SpanIndex:
+        from toolkit.spans import spans_for
+        from toolkit.tokenizer import is_jsx_file
+        jsx = is_jsx_file(self.path) if jsx is None else jsx
+        index = self._spans.get(jsx)
+        if index is None:
+            index = self._spans[jsx] = spans_for(self.data, jsx, self.digest)
+            self._grown()
+        return index
+
+    def size(self) -> int:
+        """估算的内存占用（字节）。"""
+        size = len(self.data)
+        if self._text is not None:
+            size += len(self._text) * (1 if self._text.isascii() else 4)
+        if self._lines is not None:
+            size += self._lines.nbytes()
+        size += sum(len(t) for t in self._tokens.values()) * TOKEN_BYTES
+        size += sum(len(s.spans) for s in self._spans.values()) * TOKEN_BYTES
+        return size
+
+    def _grown(self) -> None:
+        _files.resize(self.key, self.size())
+
+
+_files = cache.LRU('files', FILE_CACHE_BYTES, CachedFile.size)
+# realpath -> 缓存里该文件的最新键；文件变了以后旧版本马上让位，不等 LRU 淘汰
+_latest: dict[str, tuple[str, int, int]] = {}
+
+
+def cached(path: str | os.PathLike) -> CachedFile:
+    """读文件（没变就直接用缓存），返回 CachedFile。只多一次 open + fstat。"""
+    real = os.path.realpath(resolve(path))
+    with open(real, 'rb') as f:
+        st = os.fstat(f.fileno())
+        key = (real, st.st_mtime_ns, st.st_size)
+        entry = _files.get(key)
+        if entry is not None:
+            return entry
+        entry = CachedFile(key, f.read())
+    previous = _latest.get(real)
+    if previous is not None and previous != key:
+        _files.discard(previous)
+    _latest[real] = key
+    return _files.put(key, entry)
+
+
+def _forget(path: str | os.PathLike) -> None:
+    """自己写过的文件：mtime 精度不够时 (mtime_ns, size) 可能不变，直接丢掉缓存项。"""
+    key = _latest.pop(os.path.realpath(resolve(path)), None)
+    if key is not None:
+        _files.discard(key)
+
+
+def cache_stats() -> dict[str, int]:
+    """文件缓存的项数、估算字节数、上限、命中 / 未命中 / 淘汰次数。"""
+    return _files.stats()
+
+
+def read_bytes(path: str | os.PathLike) -> bytes:
+    return cached(path).data
+
+
+def read_text(path: str | os.PathLike) -> str:
+    return cached(path).text
+
+
+def read_lines(path: str | os.PathLike) -> list[str]:
+    """相当于 `open(path, encoding='utf-8').readlines()`（保留行尾），但走缓存。"""
+    return io.StringIO(read_text(path)).readlines()
+
+
+@contextmanager
+def atomic_writer(path: str | os.PathLike) -> Iterator[BinaryIO]:
+    """边写边落盘的原子写入：写进同目录临时文件，正常退出时 rename 覆盖目标。
+
+    块内抛异常则删掉临时文件、目标不动；调用方也可以抛 `Discard` 主动放弃写入。
+    """
+    target = resolve(path)
+    try:
+        mode = os.stat(target).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, target)
+        _forget(target)
+    except BaseException as exc:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        if not isinstance(exc, Discard):
+            raise
+
+
+class Discard(Exception):
+    """在 atomic_writer 块内抛出：丢弃临时文件，不覆盖目标。"""
+
+
+def write_bytes(path: str | os.PathLike, data: bytes) -> None:
+    """原子写入，保留原文件的权限位。"""
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def write_text(path: str | os.PathLike, text: str) -> None:
+    write_bytes(path, text.encode('utf-8'))
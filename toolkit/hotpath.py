@@ -0,0 +1,274 @@
+"""渲染热路径分析：列表渲染回调（`.map(item => <... />)`）里每次渲染都新建的闭包、对象、数组。
+
+时间轴上几百个块都从同一个 `.map` 渲染出来，回调里的 `onClick={() => ...}`、
+`style={{...}}` 每个块、每次渲染都各分配一份，React.memo 的子组件也因此每次都收到新
+props。这里用 JSX 感知的分词器和 span 索引逐个 TSX 文件找这些分配：
+
+- 列表回调：作为 map / flatMap 参数、函数体里有 JSX 的箭头函数或 function；
+- 分配点：回调（及嵌套的列表回调）里直接执行的箭头函数、function、对象字面量，以及
+  JSX 属性里的数组字面量；立即执行的 `{(() => {...})()}` 本身算一次闭包分配，函数体照样
+  每次渲染都执行；写在别的闭包里面的（onClick 的函数体内）只在事件时执行，不算；
+- 嵌套深度是外层列表回调的层数；每次渲染的估计次数是各层元素数之积。接收者是数组
+  字面量、`Array.from({ length: N })`、`.slice(0, N)` 时用真实长度，否则最外层按 items
+  （默认 DEFAULT_ITEMS），内层（块里的标签、子任务）按 inner（默认 DEFAULT_INNER_ITEMS）。
+
+结果经 walker 按文件缓存，报告按文件汇总排序：
+
+    python -m toolkit hotpath --items 200
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from math import prod
+from typing import Iterable, NamedTuple
+
+from toolkit.paths import DEFAULT_ROOTS
+from toolkit.spans import Span, SpanIndex, spans_for
+from toolkit.tokenizer import Token, significant, tokens_for
+from toolkit.walker import WalkResult, walk
+
+HOTPATH_VERSION = 1
+HOTPATH_EXTS = ('.tsx', '.jsx')
+LIST_CALLEES = frozenset({'map', 'flatMap'})
+# 看不出列表长度时按多少个元素估算：最外层（时间轴一天几百个块）和内层（块里的标签、子任务）
+DEFAULT_ITEMS = 100
+DEFAULT_INNER_ITEMS = 10
+RECEIVER_WIDTH = 40
+
+_SIZED_RECEIVER = re.compile(r'Array(?:\.from\(\s*\{\s*length\s*:\s*(\d+)\s*\}|\((\d+)\))'
+                             r'(?:\.\w+\([^()]*\))*\s*$')
+_KEYWORDS = frozenset({'return', 'await', 'typeof', 'void', 'yield', 'case', 'in', 'of', 'else'})
+_SLICED_RECEIVER = re.compile(r'\.slice\(\s*(?:(\d+)\s*,\s*(\d+)|([\w.]+)\s*,\s*\3\s*\+\s*(\d+))\s*\)\s*$')
+
+
+class Loop(NamedTuple):
+    lineno: int
+    receiver: str | None      # `.map` 前面的表达式（截断到 RECEIVER_WIDTH）
+    items: int | None         # 从字面量看得出的元素数
+
+
+class Allocation(NamedTuple):
+    path: str
+    lineno: int
+    kind: str                 # closure / object / array
+    name: str | None          # JSX 属性名（onClick、style）或变量名
+    prop: bool                # 直接写在 JSX 属性值里
+    loops: tuple[Loop, ...]   # 外层列表回调，由内到外
+
+    @property
+    def depth(self) -> int:
+        return len(self.loops)
+
+    def per_render(self, items: int = DEFAULT_ITEMS, inner: int = DEFAULT_INNER_ITEMS) -> int:
+        """一次渲染里这处分配执行的估计次数。"""
+        outermost = len(self.loops) - 1
+        return prod(loop.items if loop.items is not None else (items if i == outermost else inner)
+                    for i, loop in enumerate(self.loops))
+
+    def describe(self, items: int = DEFAULT_ITEMS, inner: int = DEFAULT_INNER_ITEMS) -> str:
+        where = ' ← '.join(f'{loop.receiver or "?"}.map@{loop.lineno}' for loop in self.loops)
+        label = f'{self.name}=' if self.prop and self.name else (self.name or '')
+        return (f'{self.path}:{self.lineno}: {self.kind:<7} {label:<16} '
+                f'深度 {self.depth}  ×{self.per_render(items, inner)}/渲染  {where}')
+
+
+class _FileScan:
+    def __init__(self, rel: str, text: str, toks: list[Token], index: SpanIndex):
+        self.rel = rel
+        self.text = text
+        self.toks = toks
+        self.index = index
+        self.newlines = [m.start() for m in re.finditer('\n', text)]
+        self.jsx_starts = [s.start for s in index.spans if s.kind == 'jsx']
+
+    def lineno(self, offset: int) -> int:
+        return bisect_right(self.newlines, offset - 1) + 1
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        if not 0 <= i < len(self.toks):
+            return False
+        t = self.toks[i]
+        return t.kind == kind and (not values or t.value in values)
+
+    def parent(self, span: Span) -> Span | None:
+        return self.index.spans[span.parent] if span.parent >= 0 else None
+
+    def renders(self, span: Span) -> bool:
+        i = bisect_right(self.jsx_starts, span.start)
+        return i < len(self.jsx_starts) and self.jsx_starts[i] < span.end
+
+    def is_list_callback(self, span: Span) -> bool:
+        return span.kind in ('function', 'arrow') and span.callee in LIST_CALLEES and self.renders(span)
+
+    def loop(self, span: Span) -> Loop:
+        """列表回调 span 的接收者和可知长度：`recv.map(` 里 recv 的最后一个 token 在回调前 4 个。"""
+        first = span.first
+        if self.is_(first - 1, 'punct', '(') and self.is_(first - 2, 'ident'):
+            dot = first - 3
+        else:
+            dot = -1
+        receiver = None
+        items = None
+        if self.is_(dot, 'punct', '.', '?.'):
+            end = self.toks[dot].start
+            start = self._receiver_start(dot - 1)
+            if start is not None:
+                receiver = ' '.join(self.text[self.toks[start].start:end].split())
+                if len(receiver) > RECEIVER_WIDTH:
+                    receiver = '…' + receiver[-RECEIVER_WIDTH + 1:]
+            if self.is_(dot - 1, 'punct', ']') and start == self._opener(dot - 1):
+                items = self._array_length(dot - 1)
+            head = self.text[max(0, end - 200):end]
+            m = _SIZED_RECEIVER.search(head)
+            if m:
+                items = int(m.group(1) or m.group(2))
+            m = _SLICED_RECEIVER.search(head)
+            if m:
+                items = int(m.group(4)) if m.group(4) else max(0, int(m.group(2)) - int(m.group(1)))
+        return Loop(self.lineno(span.start), receiver, items)
+
+    def _opener(self, close: int) -> int | None:
+        """从 `)` / `]` / `}` 往回找配对的开括号。"""
+        depth = 0
+        for i in range(close, -1, -1):
+            t = self.toks[i]
+            if t.kind in ('punct', 'jsx_brace') and t.value in (')', ']', '}'):
+                depth += 1
+            elif t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${'):
+                depth -= 1
+                if depth == 0:
+                    return i
+        return None
+
+    def _receiver_start(self, last: int) -> int | None:
+        """接收者表达式的第一个 token：往回跨过标识符、`.` / `?.` 和成对的 () []。"""
+        i, start = last, None
+        while i >= 0:
+            if self.is_(i, 'punct', ')', ']'):
+                opener = self._opener(i)
+                if opener is None:
+                    return start
+                start = opener
+                # f(x) / a[i]：前面紧跟被调用、被取下标的表达式；否则 (a || b) 本身就是接收者
+                if (self.is_(opener - 1, 'ident') and self.toks[opener - 1].value not in _KEYWORDS) \
+                        or self.is_(opener - 1, 'punct', ')', ']'):
+                    i = opener - 1
+                    continue
+                return start
+            if not self.is_(i, 'ident') or self.toks[i].value in _KEYWORDS:
+                return start
+            start = i
+            if not self.is_(i - 1, 'punct', '.', '?.'):
+                return start
+            i -= 2
+        return start
+
+    def _array_length(self, close: int) -> int | None:
+        """`[a, b, c]` 的元素个数（从 `]` 往回数顶层逗号）。"""
+        opener = self._opener(close)
+        if opener is None or self.toks[opener].value != '[':
+            return None
+        if opener == close - 1:
+            return 0
+        depth = commas = 0
+        for t in self.toks[opener + 1:close]:
+            if t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${'):
+                depth += 1
+            elif t.kind in ('punct', 'jsx_brace') and t.value in (')', ']', '}'):
+                depth -= 1
+            elif depth == 0 and t.kind == 'punct' and t.value == ',':
+                commas += 1
+        return commas + 1 - self.is_(close - 1, 'punct', ',')
+
+    def is_iife(self, span: Span) -> bool:
+        """`(() => {...})()`：渲染时当场执行。"""
+        return self.is_(span.first - 1, 'punct', '(') and self.is_(span.last + 1, 'punct', ')') \
+            and self.is_(span.last + 2, 'punct', '(')
+
+    def loops(self, span: Span | None) -> tuple[Loop, ...] | None:
+        """从 span 往外：经过的列表回调（由内到外），跳过立即执行的函数；遇到别的函数就停。
+        不在列表回调里时为 None。"""
+        found: list[Loop] = []
+        while span is not None:
+            if span.kind in ('function', 'arrow'):
+                if self.is_list_callback(span):
+                    found.append(self.loop(span))
+                elif not self.is_iife(span):
+                    break
+            span = self.parent(span)
+        return tuple(found) or None
+
+    def in_params(self, owner: Span, span: Span) -> bool:
+        """span 是不是 owner 参数列表里的解构模式（`({ id, title }) =>`）。"""
+        i = owner.first
+        while i < len(self.toks) and i < owner.first + 20 and not self.is_(i, 'punct', '('):
+            i += 1
+        if not self.is_(i, 'punct', '(') or span.first <= i:
+            return False
+        depth = 0
+        for j in range(i, min(owner.last, len(self.toks))):
+            t = self.toks[j]
+            if t.kind == 'punct' and t.value in ('(', '[', '{', '${'):
+                depth += 1
+            elif t.kind == 'punct' and t.value in (')', ']', '}'):
+                depth -= 1
+                if depth == 0:
+                    return span.last < j
+        return False
+
+    def is_prop(self, first: int) -> bool:
+        return self.is_(first - 1, 'jsx_brace', '{') and self.is_(first - 2, 'punct', '=') \
+            and self.is_(first - 3, 'jsx_attr')
+
+    def run(self) -> list[Allocation]:
+        found: list[Allocation] = []
+        for span in self.index.spans:
+            if span.kind not in ('function', 'arrow', 'object'):
+                continue
+            parent = self.parent(span)
+            if span.kind == 'object' and parent is not None and parent.kind in ('function', 'arrow') \
+                    and self.in_params(parent, span):
+                continue
+            loops = self.loops(parent)
+            if loops is None:
+                continue
+            kind = 'object' if span.kind == 'object' else 'closure'
+            name = span.name or ('IIFE' if kind == 'closure' and self.is_iife(span) else None)
+            found.append(Allocation(self.rel, self.lineno(span.start), kind, name,
+                                    self.is_prop(span.first), loops))
+        for i, t in enumerate(self.toks):
+            if t.kind == 'punct' and t.value == '[' and self.is_prop(i):
+                loops = self.loops(self.index.enclosing(t.start))
+                if loops is not None:
+                    found.append(Allocation(self.rel, self.lineno(t.start), 'array',
+                                            self.toks[i - 3].value, True, loops))
+        found.sort(key=lambda a: a.lineno)
+        return found
+
+
+def file_allocations(rel: str, text: str) -> list[Allocation]:
+    """walker 任务：一个 TSX 文件里列表回调中的内联分配。"""
+    data = text.encode('utf-8')
+    _digest, tokens = tokens_for(data, True)
+    return _FileScan(rel, text, significant(tokens), spans_for(data, True)).run()
+
+
+def run(roots: Iterable[str] = DEFAULT_ROOTS, paths: Iterable[str] | None = None,
+        workers: int | None = None) -> WalkResult:
+    """results 为 {相对路径: [Allocation]}。"""
+    return walk(file_allocations, 'hotpath:v%d' % HOTPATH_VERSION, tuple(roots), HOTPATH_EXTS,
+                paths=paths, workers=workers)
+
+
+def rank(results: dict[str, list[Allocation]], items: int = DEFAULT_ITEMS,
+         inner: int = DEFAULT_INNER_ITEMS) -> list[tuple[str, int, list[Allocation]]]:
+    """按文件汇总：(路径, 每次渲染的估计分配总数, 按次数排序的分配点)，总数大的在前。"""
+    ranked = []
+    for rel, allocations in results.items():
+        if not allocations:
+            continue
+        ordered = sorted(allocations, key=lambda a: (-a.per_render(items, inner), a.lineno))
+        ranked.append((rel, sum(a.per_render(items, inner) for a in allocations), ordered))
+    ranked.sort(key=lambda entry: (-entry[1], entry[0]))
+    return ranked
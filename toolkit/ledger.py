@@ -0,0 +1,147 @@
+"""补丁账本：让改写脚本可以重复执行。
+
+step1~6、integrate_countdown.py、complete_fix.py 以前没有任何「已经改过」的判断，
+跑两次就会插入两份 import 和 state。现在每个补丁声明一个「已生效」判断，由账本
+统一执行，并把结果记在 `.toolkit_cache/ledger.pkl`：
+
+    (补丁 ID, 文件) -> 输入哈希、输出哈希、写入后的 (mtime_ns, size)
+
+再次运行时：
+1. 文件的 (mtime_ns, size) 与账本一致：补丁已生效，直接跳过，连文件都不读；
+2. 不一致但内容哈希等于记录的输出哈希（只是被 touch 过）：跳过并更新 stat；
+3. 否则读一次文件，逐个补丁执行「已生效」判断，只把没生效的放进同一个编辑事务。
+
+账本丢失时第 3 步的判断仍然保证不会重复插入，只是慢一点。写文件之后，原内容
+会按补丁 ID 存进备份库（toolkit.backup），可以随时撤销。
+
+    patches = [Patch('step1_imports', step1.edit, step1.imports_done), ...]
+    statuses = Ledger.open().run(lookups.TIMELINE, patches)
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Iterable, NamedTuple
+
+from toolkit import backup, cache
+from toolkit.edits import Transaction
+from toolkit.paths import relpath, resolve
+
+LEDGER_NAME = 'ledger.pkl'
+
+
+class Patch(NamedTuple):
+    id: str
+    edit: Callable[[Transaction], None]
+    done: str | Callable[[str], bool]   # 字符串：文本里出现它就算已生效
+
+    def applied(self, text: str) -> bool:
+        return self.done in text if isinstance(self.done, str) else self.done(text)
+
+
+class Entry(NamedTuple):
+    patch: str
+    path: str
+    input_hash: str
+    output_hash: str
+    stat: tuple[int, int]
+    status: str         # 'applied'：本账本写入的；'satisfied'：发现时已经生效
+    time: float
+
+
+def _digest(text: str, encoding: str) -> str:
+    return cache.content_hash(text.encode(encoding, errors='surrogateescape'))
+
+
+class Ledger:
+    def __init__(self, entries: dict[tuple[str, str], Entry] | None = None):
+        self.entries: dict[tuple[str, str], Entry] = entries or {}
+        self.dirty = False
+
+    @classmethod
+    def open(cls) -> 'Ledger':
+        return cls(cache.load(LEDGER_NAME, {}))
+
+    def save(self) -> None:
+        if self.dirty:
+            cache.save(LEDGER_NAME, self.entries)
+            self.dirty = False
+
+    def get(self, patch: str, path: str | os.PathLike) -> Entry | None:
+        return self.entries.get((patch, relpath(path)))
+
+    def fresh(self, patch: str, path: str | os.PathLike) -> bool:
+        """账本记录的 stat 与文件当前 stat 一致（不读文件）。"""
+        entry = self.get(patch, path)
+        if entry is None:
+            return False
+        try:
+            return cache.stat_key(resolve(path)) == entry.stat
+        except OSError:
+            return False
+
+    def _record(self, patch: str, rel: str, input_hash: str, output_hash: str,
+                stat: tuple[int, int], status: str) -> None:
+        self.entries[(patch, rel)] = Entry(patch, rel, input_hash, output_hash, stat, status, time.time())
+        self.dirty = True
+
+    def run(self, path: str | os.PathLike, patches: Iterable[Patch],
+            encoding: str = 'utf-8', dry_run: bool = False) -> dict[str, str]:
+        """对一个文件执行一组补丁，返回 {补丁 ID: 状态}。
+
+        skipped：账本确认已生效（可能完全没读文件）；satisfied：读文件后发现已生效；
+        applied：本次写入；unverified：执行了但写完仍判断为未生效（锚点变了）。
+        所有补丁共用一个事务，只写一次文件。
+        """
+        patches = list(patches)
+        rel = relpath(path)
+        statuses = {p.id: 'skipped' for p in patches if self.fresh(p.id, rel)}
+        pending = [p for p in patches if p.id not in statuses]
+        if not pending:
+            return statuses
+
+        tx = Transaction(path, encoding)
+        before = _digest(tx.original, encoding)
+        for p in pending:
+            entry = self.entries.get((p.id, rel))
+            if entry is not None and entry.output_hash == before:
+                statuses[p.id] = 'skipped'
+            elif p.applied(tx.original):
+                statuses[p.id] = 'satisfied'
+            else:
+                p.edit(tx)
+                statuses[p.id] = 'applied'
+        if dry_run:
+            return statuses
+
+        wrote = tx.commit()
+        if wrote:
+            # 留下改写前的快照：python -m toolkit backup restore <补丁 ID> 可以撤销
+            backup.snapshot(rel, [p.id for p in pending if statuses[p.id] == 'applied'],
+                            tx.original.encode(encoding, errors='surrogateescape'))
+        after_text = tx.apply() if wrote else tx.original
+        after = _digest(after_text, encoding)
+        stat = cache.stat_key(resolve(rel))
+        for p in patches:
+            entry = self.entries.get((p.id, rel))
+            if not p.applied(after_text):
+                # 补丁没能生效（锚点找不到之类），或被同批其他补丁改掉：不记账，下次重新判断
+                if entry is not None:
+                    del self.entries[(p.id, rel)]
+                    self.dirty = True
+                if statuses[p.id] == 'applied':
+                    statuses[p.id] = 'unverified'
+                continue
+            if statuses[p.id] == 'applied':
+                self._record(p.id, rel, before, after, stat, 'applied')
+            elif entry is None:
+                self._record(p.id, rel, before, after, stat, 'satisfied')
+            elif entry.stat != stat or entry.output_hash != after:
+                self._record(p.id, rel, entry.input_hash, after, stat, entry.status)
+        self.save()
+        return statuses
+
+
+def run_patches(path: str | os.PathLike, patches: Iterable[Patch], dry_run: bool = False) -> dict[str, str]:
+    """打开账本、执行、保存的便捷写法。"""
+    return Ledger.open().run(path, patches, dry_run=dry_run)
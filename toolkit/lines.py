@@ -0,0 +1,189 @@
+"""行偏移表与按行切片。
+
+`LineTable` 记录每行起始的字节偏移（以及按需计算的字符偏移），负责「行号 <-> 偏移」
+换算；`LineFile` 把表和文件的 mmap 放在一起，取「第 i..j 行」或「字节 k 所在行」
+只解码用到的那几行，和文件大小无关：
+
+    with LineFile.open('src/components/calendar/NewTimelineView.tsx') as lf:
+        for lineno, text in lf.context(2099, before=15, after=4):
+            print(lineno, text)
+
+按内容哈希的表给 tokenizer/span 使用（字符偏移 -> 字节偏移）；按 (mtime_ns, size)
+的表给只需要行切片的脚本使用，不必为了算哈希读整个文件。
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from typing import Iterator
+
+from toolkit import cache
+from toolkit.paths import relpath, resolve
+
+LINES_VERSION = 1
+
+
+class LineTable:
+    """`byte_starts[i]` 是第 i 行（从 0 开始）的起始字节偏移，末尾有一个等于文件长度的哨兵。
+
+    `char_starts` 同理，只有需要字符偏移换算时才构建。
+    """
+
+    __slots__ = ('byte_starts', 'char_starts')
+
+    def __init__(self, byte_starts: array, char_starts: array | None = None):
+        self.byte_starts = byte_starts
+        self.char_starts = char_starts
+
+    @classmethod
+    def build(cls, data, chars: bool = True) -> 'LineTable':
+        byte_starts = array('Q', [0])
+        byte_starts.extend(m.end() for m in re.finditer(b'\n', data))
+        if byte_starts[-1] != len(data):
+            byte_starts.append(len(data))
+        table = cls(byte_starts)
+        if chars:
+            table.build_chars(data)
+        return table
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.byte_starts, self.char_starts) if a is not None)
+
+    def build_chars(self, data) -> None:
+        starts = self.byte_starts
+        char_starts = array('Q', [0])
+        chars = 0
+        for i in range(len(starts) - 1):
+            chars += len(str(data[starts[i]:starts[i + 1]], 'utf-8', 'replace'))
+            char_starts.append(chars)
+        self.char_starts = char_starts
+
+    def __len__(self) -> int:
+        """行数。"""
+        return len(self.byte_starts) - 1
+
+    def line_of_byte(self, offset: int) -> int:
+        return max(0, min(bisect_right(self.byte_starts, offset) - 1, len(self) - 1))
+
+    def line_of_char(self, offset: int) -> int:
+        return max(0, min(bisect_right(self.char_starts, offset) - 1, len(self) - 1))
+
+    def char_to_byte(self, offset: int, data) -> int:
+        """字符偏移 -> 字节偏移；只解码偏移所在的那一行。"""
+        if not len(self):
+            return 0
+        if self.char_starts is None:
+            self.build_chars(data)
+        line = self.line_of_char(offset)
+        start = self.byte_starts[line]
+        prefix = offset - self.char_starts[line]
+        if not prefix:
+            return start
+        text = str(data[start:self.byte_starts[line + 1]], 'utf-8', 'replace')
+        return start + len(text[:prefix].encode('utf-8'))
+
+    def byte_range(self, first: int, last: int) -> tuple[int, int]:
+        """第 first..last 行（从 0 开始，含 last）的字节区间。"""
+        first = max(0, first)
+        last = min(last, len(self) - 1)
+        if last < first:
+            return 0, 0
+        return self.byte_starts[first], self.byte_starts[last + 1]
+
+
+_memo = cache.LRU('lines', 16 * 1024 * 1024, lambda table: table.nbytes())
+
+
+def table_for(data, digest: str | None = None) -> LineTable:
+    """按内容哈希缓存的行偏移表（含字符偏移）；data 可以是 bytes 或 mmap。"""
+    digest = digest or cache.content_hash(data)
+    table = _memo.get(digest)
+    if table is None:
+        name = 'lines/v%d-%s.pkl' % (LINES_VERSION, digest)
+        state = cache.load(name)
+        if state is None:
+            table = LineTable.build(data)
+            cache.save(name, (table.byte_starts, table.char_starts))
+        else:
+            table = LineTable(*state)
+        _memo.put(digest, table)
+    return table
+
+
+_file_memo: dict[str, tuple[tuple[int, int], LineTable]] = {}
+
+
+def _decode(raw) -> str:
+    return str(raw, 'utf-8', 'replace').rstrip('\r\n')
+
+
+class LineFile:
+    """文件的 mmap + 按 (mtime_ns, size) 缓存的行偏移表。行号参数都从 0 开始。"""
+
+    def __init__(self, path: str, table: LineTable, mm: mmap.mmap | None):
+        self.path = path
+        self.table = table
+        self._mm = mm
+        self._data = mm if mm is not None else b''
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> 'LineFile':
+        real = resolve(path)
+        rel = relpath(real)
+        with open(real, 'rb') as f:
+            st = os.fstat(f.fileno())
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else None
+        key = (st.st_mtime_ns, st.st_size)
+        memo = _file_memo.get(rel)
+        if memo is not None and memo[0] == key:
+            return cls(rel, memo[1], mm)
+        name = 'lines/file-%s.pkl' % cache.shard_name(rel)
+        state = cache.load(name)
+        if state is not None and state[0] == key:
+            table = LineTable(state[1])
+        else:
+            table = LineTable.build(mm if mm is not None else b'', chars=False)
+            cache.save(name, (key, table.byte_starts))
+        _file_memo[rel] = (key, table)
+        return cls(rel, table, mm)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._data = b''
+
+    def __enter__(self) -> 'LineFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def line(self, i: int) -> str:
+        start, end = self.table.byte_range(i, i)
+        return _decode(self._data[start:end])
+
+    def lines(self, first: int, last: int) -> Iterator[tuple[int, str]]:
+        """第 first..last 行（含），产出 (行号, 文本)。"""
+        starts = self.table.byte_starts
+        data = self._data
+        for i in range(max(0, first), min(last, len(self) - 1) + 1):
+            yield i, _decode(data[starts[i]:starts[i + 1]])
+
+    def view(self, first: int, last: int) -> memoryview:
+        """第 first..last 行（含）的零拷贝字节切片。"""
+        start, end = self.table.byte_range(first, last)
+        return memoryview(self._data)[start:end]
+
+    def line_at_byte(self, offset: int) -> int:
+        return self.table.line_of_byte(offset)
+
+    def context(self, lineno: int, before: int = 5, after: int = 5) -> list[tuple[int, str]]:
+        """以 1 开始的行号为中心取上下文，返回 [(从 1 开始的行号, 文本)]。"""
+        return [(i + 1, text) for i, text in self.lines(lineno - 1 - before, lineno - 1 + after)]
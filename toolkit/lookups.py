@@ -0,0 +1,100 @@
+"""根目录 find_*.py 查询脚本的声明式版本。
+
+每个查询只描述「在哪个文件、找哪些行」；`run()` 把选中的查询合并成一个
+`BatchQuery`，所以一次跑完全部查询时每个文件只读一遍：
+
+    python -m toolkit lookup --all
+    python -m toolkit lookup complete time_display
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from toolkit.batch import BatchQuery
+from toolkit.lines import LineFile
+from toolkit.trigram import Hit
+
+TIMELINE = 'src/components/calendar/NewTimelineView.tsx'
+DASHBOARD = 'src/pages/Dashboard.tsx'
+TASK_STORE = 'src/stores/taskStore.ts'
+TIMELINE_CALENDAR = 'src/components/calendar/TimelineCalendar.tsx'
+
+
+@dataclass(frozen=True)
+class Lookup:
+    path: str
+    pattern: str                                   # 正则；多个字面量用 | 连接
+    where: Callable[[str], bool] | None = None     # 命中行的二次过滤
+    width: int = 120
+    context: tuple[int, int] = (0, 0)              # 打印命中行前/后若干行
+    first_only: bool = False
+
+
+LOOKUPS: dict[str, Lookup] = {
+    'complete': Lookup(TIMELINE, r'completeTask|showCelebration|celebrationGold'),
+    'status_complete': Lookup(TIMELINE, r'completed',
+                              where=lambda line: 'status' in line or 'Status' in line),
+    'endtime': Lookup(TIMELINE, r'endTime:', width=0,
+                      where=lambda line: 'block' in line or 'task' in line or 'scheduledEnd' in line),
+    'time_display': Lookup(TIMELINE, r'scheduledEnd|endTime', width=0,
+                           where=lambda line: 'format' in line.lower() or 'tolocale' in line.lower()
+                           or ':' in line),
+    'editing_usage': Lookup(TIMELINE, r'setEditingTask', width=150),
+    'dashboard_create': Lookup(DASHBOARD, r'TaskCreate|taskCreate', width=150),
+    'dashboard_createtask': Lookup(DASHBOARD, r'createTask', width=0, context=(0, 24),
+                                   where=lambda line: 'const' in line or 'function' in line or '=' in line),
+    'store_create': Lookup(TASK_STORE, r'createTask', width=150, context=(0, 29), first_only=True,
+                           where=lambda line: ':' in line or '=' in line or 'async' in line),
+    'create_flow': Lookup(TIMELINE, r'onTaskCreate', width=150, context=(5, 14),
+                          where=lambda line: 'await' in line),
+    'timeline_calendar_create': Lookup(TIMELINE_CALENDAR, r'onTaskCreate', width=0,
+                                       where=lambda line: 'const' in line or '=' in line
+                                       or 'function' in line),
+    'blocks': Lookup(TIMELINE, r'const blocks|blocks =', width=0, context=(0, 19), first_only=True),
+    'handle_start_task': Lookup(TIMELINE, r'const handleStartTask', width=0, context=(0, 99),
+                                first_only=True),
+}
+
+
+def run(names: Iterable[str]) -> dict[str, list[Hit]]:
+    """把多个查询合并成一次批量扫描，返回 {查询名: 命中行}。"""
+    query = BatchQuery()
+    selected = {name: LOOKUPS[name] for name in names}
+    for name, lookup in selected.items():
+        query.add_regex(name, lookup.pattern, paths=[lookup.path])
+    results = query.run()
+    for name, lookup in selected.items():
+        hits = [h for h in results[name] if lookup.where is None or lookup.where(h.line)]
+        results[name] = hits[:1] if lookup.first_only else hits
+    return results
+
+
+def _clip(text: str, width: int, *, summary: bool = False) -> str:
+    """截断到 width 列；width=0 的单行命中摘要去掉缩进，上下文行始终保留缩进。"""
+    text = text.rstrip()
+    if width:
+        return text[:width]
+    return text.lstrip() if summary else text
+
+
+def report(name: str, hits: list[Hit]) -> None:
+    lookup = LOOKUPS[name]
+    before, after = lookup.context
+    if not (before or after) or not hits:
+        for hit in hits:
+            print(f'{hit.lineno}: {_clip(hit.line, lookup.width, summary=True)}')
+        return
+    with LineFile.open(lookup.path) as lf:
+        for hit in hits:
+            print(f'\nFound at line {hit.lineno}:')
+            for lineno, text in lf.context(hit.lineno, before, after):
+                print(f'{lineno}: {_clip(text, lookup.width)}')
+
+
+def main(*names: str) -> None:
+    """供根目录脚本调用：`lookups.main('complete')`。"""
+    for name, hits in run(names).items():
+        if len(names) > 1:
+            print(f'=== {name} ===')
+        report(name, hits)
@@ -0,0 +1,271 @@
+"""GBK/UTF-8 乱码检测与往返修复。
+
+fix_* 脚本以前用 `errors='ignore'` 读文件（原始字节当场丢失），再靠手工维护的
+「乱码 → 中文」对照表逐条替换。这里直接在原始字节上工作：
+
+1. 找出所有非 ASCII 字节段（有 numpy 时用 `np.frombuffer` 向量化，没有时用字节
+   正则，结果相同）；纯 ASCII 的文件一步判完。
+2. 每段按 UTF-8 解码（surrogateescape 保留坏字节），U+FFFD 连续段单独记为
+   `lost`：原字节已经没了，只报告、不修。
+3. 其余部分尝试两种往返：
+   - `gbk`：文件里混进了 GBK 字节，按 GBK 重新解码；
+   - `utf8_as_gbk`：UTF-8 文本曾被当成 GBK 读出再存成 UTF-8（`鍒犻櫎` 这类），
+     编码回 GBK 再按 UTF-8 解码。
+   候选文本和当前文本都用「常用汉字占比」打分，置信度是候选把差距补上了多少。
+4. 写回时只替换置信度达标的那几段字节，其余字节原样保留。
+
+    findings = scan(read_bytes(path))
+    data, applied = repair_bytes(data, findings)
+    python -m toolkit mojibake --fix --min-confidence 0.9
+"""
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from toolkit.files import read_bytes, write_bytes
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS
+from toolkit.walker import WalkResult, walk
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选的：没有时退回字节正则
+    np = None
+
+MOJIBAKE_VERSION = 1
+MIN_CONFIDENCE = 0.8
+# 候选文本本身的常用字占比低于这个值时不报告（emoji、制表符之类本来就不在 GB2312 里）
+MIN_SCORE = 0.5
+
+_HIGH_RUN = re.compile(rb'[\x80-\xff]+')
+_LOST_RUN = re.compile('�+')
+
+
+class Finding(NamedTuple):
+    start: int              # 字节偏移（含）
+    end: int                # 不含
+    kind: str               # 'gbk' | 'utf8_as_gbk' | 'lost'
+    before: str             # 这段字节按 UTF-8 + surrogateescape 解码的文本
+    after: str | None       # 修复后的文本；无法恢复时为 None
+    confidence: float
+    lineno: int = 0         # 从 1 开始；scan() 填写
+
+
+def high_runs(data: bytes) -> list[tuple[int, int]]:
+    """所有连续非 ASCII 字节段的 [起点, 终点)。"""
+    if np is not None and len(data) >= 4096:
+        high = np.frombuffer(data, dtype=np.uint8) >= 0x80
+        if not high.any():
+            return []
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], high, [False])).astype(np.int8)))
+        return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+    return [m.span() for m in _HIGH_RUN.finditer(data)]
+
+
+@lru_cache(maxsize=None)
+def _char_score(ch: str) -> float:
+    if ord(ch) < 0x80:
+        return 1.0
+    try:
+        lead = ch.encode('gb2312')[0]
+    except UnicodeEncodeError:
+        return 0.0
+    if 0xB0 <= lead <= 0xD7 or 0xA1 <= lead <= 0xA3:   # 一级汉字、中文标点/全角字符
+        return 1.0
+    if 0xD8 <= lead <= 0xF7:                           # 二级汉字：真文本里少见
+        return 0.5
+    return 0.0
+
+
+def score(text: str) -> float:
+    """非 ASCII 字符里常用汉字/中文标点的加权占比；没有非 ASCII 字符时为 1。"""
+    wide = [ch for ch in text if ord(ch) >= 0x80]
+    if not wide:
+        return 1.0
+    return sum(map(_char_score, wide)) / len(wide)
+
+
+def _misread(text: str) -> tuple[int, int, str] | None:
+    """`utf8_as_gbk` 往返：返回 (起始字符, 结束字符, 修复文本)。
+
+    紧挨着 U+FFFD 的段首尾常常是半个 UTF-8 字符，所以两端各允许裁掉最多两个字符；
+    UTF-8 严格解码本身就验证了对齐。
+    """
+    for lo in range(min(3, len(text))):
+        for hi in range(len(text), max(lo, len(text) - 3), -1):
+            try:
+                return lo, hi, text[lo:hi].encode('gbk').decode('utf-8')
+            except (UnicodeEncodeError, UnicodeDecodeError):
+                continue
+    return None
+
+
+def _best(start: int, raw: bytes, text: str, near_lost: bool) -> Finding | None:
+    candidates = []
+    try:
+        # 紧挨着已丢失的字节时，GBK 双字节的对齐可能是错的
+        candidates.append(('gbk', 0, len(text), raw.decode('gbk'), 0.75 if near_lost else 1.0))
+    except UnicodeDecodeError:
+        pass
+    misread = _misread(text)
+    if misread is not None:
+        # 两端裁过字符说明段边界不是字符边界，和紧挨丢失字节一样降权：
+        # 否则「寮�濮嬮獙…鍔�」只修中间一截也能拿到满分
+        lo, hi, _after = misread
+        trimmed = lo > 0 or hi < len(text)
+        candidates.append(('utf8_as_gbk', *misread, 0.75 if near_lost or trimmed else 1.0))
+    best = None
+    for kind, lo, hi, after, weight in candidates:
+        before = text[lo:hi]
+        if after == before or sum(ord(ch) >= 0x80 for ch in after) < 2:
+            continue
+        current, repaired = score(before), score(after)
+        gain = repaired - current
+        if repaired < MIN_SCORE or gain <= 0:
+            continue
+        confidence = round(weight * gain / (1 - current), 3)
+        if best is None or confidence > best.confidence:
+            a = start + len(text[:lo].encode('utf-8', errors='surrogateescape'))
+            b = a + len(before.encode('utf-8', errors='surrogateescape'))
+            best = Finding(a, b, kind, before, after, confidence)
+    return best
+
+
+def _is_escaped(ch: str) -> bool:
+    return '\udc80' <= ch <= '\udcff'
+
+
+def _scan_piece(start: int, raw: bytes, near_lost: bool) -> list[Finding]:
+    text = raw.decode('utf-8', errors='surrogateescape')
+    broken = any(map(_is_escaped, text))
+    if not broken and score(text) >= 0.9:
+        return []
+    found = _best(start, raw, text, near_lost)
+    if not broken or (found is not None and found.confidence >= MIN_CONFIDENCE):
+        return [found] if found else []
+    # 整段解不通：多半是正常 UTF-8 中文和 GBK 字节挨在一起。只修含坏字节的
+    # 「非常用字符」连续段（坏字节前后被误解成 UTF-8 的字符也算在内）
+    offsets = [0]
+    for ch in text:
+        offsets.append(offsets[-1] + len(ch.encode('utf-8', errors='surrogateescape')))
+    out = []
+    i = 0
+    while i < len(text):
+        if _char_score(text[i]) >= 1 and not _is_escaped(text[i]):
+            i += 1
+            continue
+        j = i
+        while j < len(text) and (_is_escaped(text[j]) or _char_score(text[j]) < 1):
+            j += 1
+        if any(map(_is_escaped, text[i:j])):
+            found = _best(start + offsets[i], raw[offsets[i]:offsets[j]], text[i:j], near_lost)
+            if found is not None:
+                out.append(found)
+        i = j
+    return out or ([found] if found else [])
+
+
+@lru_cache(maxsize=8192)
+def _scan_run(chunk: bytes) -> tuple[Finding, ...]:
+    """一个非 ASCII 字节段的检测结果，偏移相对段首。同样的中文词在文件里反复
+    出现，按段内容缓存后大部分段不用重新解码打分。"""
+    text = chunk.decode('utf-8', errors='surrogateescape')
+    lost = list(_LOST_RUN.finditer(text))
+    if not lost:
+        return tuple(_scan_piece(0, chunk, False))
+    # 按 U+FFFD 段切开：FFFD 本身记为 lost，其余部分照常尝试修复
+    findings: list[Finding] = []
+    offset = 0      # text 中已处理到的字符位置
+    byte = 0
+    for m in lost:
+        head = text[offset:m.start()].encode('utf-8', errors='surrogateescape')
+        if head:
+            findings.extend(_scan_piece(byte, head, True))
+        byte += len(head)
+        size = 3 * (m.end() - m.start())
+        findings.append(Finding(byte, byte + size, 'lost', m.group(), None, 0.0))
+        byte += size
+        offset = m.end()
+    tail = text[offset:].encode('utf-8', errors='surrogateescape')
+    if tail:
+        findings.extend(_scan_piece(byte, tail, True))
+    return tuple(findings)
+
+
+def scan(data: bytes) -> list[Finding]:
+    """检测一段字节里的乱码，按位置排序。"""
+    findings: list[Finding] = []
+    lineno, pos = 1, 0
+    for start, end in high_runs(data):
+        for f in _scan_run(data[start:end]):
+            lineno += data.count(b'\n', pos, start + f.start)
+            pos = start + f.start
+            findings.append(f._replace(start=pos, end=start + f.end, lineno=lineno))
+    return findings
+
+
+def repair_bytes(data: bytes, findings: Iterable[Finding],
+                 min_confidence: float = MIN_CONFIDENCE) -> tuple[bytes, list[Finding]]:
+    """只替换置信度达标、且原字节与检测时一致的段；返回 (新字节, 实际应用的 findings)。"""
+    chunks: list[bytes] = []
+    applied: list[Finding] = []
+    pos = 0
+    for f in sorted(findings, key=lambda f: f.start):
+        if f.after is None or f.confidence < min_confidence or f.start < pos:
+            continue
+        if data[f.start:f.end] != f.before.encode('utf-8', errors='surrogateescape'):
+            continue
+        chunks.append(data[pos:f.start])
+        chunks.append(f.after.encode('utf-8'))
+        applied.append(f)
+        pos = f.end
+    chunks.append(data[pos:])
+    return b''.join(chunks), applied
+
+
+def repair_file(path: str | os.PathLike, min_confidence: float = MIN_CONFIDENCE,
+                dry_run: bool = False) -> list[Finding]:
+    """检测并原地修复一个文件；返回应用（dry_run 时为将要应用）的 findings。"""
+    data = read_bytes(path)
+    new, applied = repair_bytes(data, scan(data), min_confidence)
+    if applied and not dry_run:
+        write_bytes(path, new)
+    return applied
+
+
+def scan_task(rel: str, data: bytes) -> list[Finding]:
+    """walker 任务（raw=True）。"""
+    return scan(data)
+
+
+def scan_tree(roots: Iterable[str] = DEFAULT_ROOTS, exts: Iterable[str] = SOURCE_EXTS,
+              paths: Iterable[str] | None = None, workers: int | None = None) -> WalkResult:
+    """并行、增量地检测整棵树；结果只保留有发现的文件。"""
+    result = walk(scan_task, 'mojibake:v%d' % MOJIBAKE_VERSION, roots, exts, paths, workers, raw=True)
+    result.results = {rel: found for rel, found in result.results.items() if found}
+    return result
+
+
+def repair_tree(roots: Iterable[str] = DEFAULT_ROOTS, exts: Iterable[str] = SOURCE_EXTS,
+                paths: Iterable[str] | None = None, workers: int | None = None,
+                min_confidence: float = MIN_CONFIDENCE,
+                dry_run: bool = False) -> dict[str, list[Finding]]:
+    """一次批处理修复整棵树：{相对路径: 应用的 findings}。"""
+    repaired = {}
+    for rel, findings in scan_tree(roots, exts, paths, workers).results.items():
+        if not any(f.after is not None and f.confidence >= min_confidence for f in findings):
+            continue
+        data = read_bytes(rel)
+        new, applied = repair_bytes(data, findings, min_confidence)
+        if applied:
+            if not dry_run:
+                write_bytes(rel, new)
+            repaired[rel] = applied
+    return repaired
+
+
+def format_finding(rel: str, f: Finding) -> str:
+    after = '（原字节已丢失，无法恢复）' if f.after is None else f'{f.after} ({f.kind}, 置信度 {f.confidence:.2f})'
+    return f'{rel}:{f.lineno}: {f.before!r} -> {after}'
@@ -0,0 +1,71 @@
+"""仓库路径约定：把脚本里各种写法的路径统一成仓库内的真实路径。"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = REPO_ROOT / 'src'
+CACHE_DIR = Path(os.environ.get('TOOLKIT_CACHE_DIR', REPO_ROOT / '.toolkit_cache'))
+# 改写前的快照（toolkit.backup）；与缓存分开放，清缓存不会丢备份
+BACKUP_DIR = Path(os.environ.get('TOOLKIT_BACKUP_DIR', REPO_ROOT / '.toolkit_backups'))
+
+# 默认只看 TS/TSX 源码；*.tsx.backup 之类的副本后缀不同，天然被排除
+SOURCE_EXTS = ('.ts', '.tsx')
+DEFAULT_ROOTS = ('src',)
+SKIP_DIRS = {'node_modules', 'dist', '.git', '.toolkit_cache', '.toolkit_backups', '__pycache__'}
+
+# 老脚本里写死的 Windows 工作区前缀，例如 w:/001jiaweis/22222/src/...
+_LEGACY_PREFIXES = ('w:/001jiaweis/22222/',)
+
+
+def resolve(path: str | os.PathLike) -> Path:
+    """把 `src/...`、绝对路径或旧的 `w:\\001jiaweis\\22222\\...` 路径解析到仓库内。"""
+    text = os.fspath(path).replace('\\', '/')
+    lowered = text.lower()
+    for prefix in _LEGACY_PREFIXES:
+        if lowered.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    p = Path(text)
+    if not p.is_absolute():
+        p = REPO_ROOT / p
+    return p
+
+
+def relpath(path: str | os.PathLike) -> str:
+    """仓库内的相对路径（posix 风格），作为各类索引的键。"""
+    p = resolve(path)
+    try:
+        return p.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return p.as_posix()
+
+
+def iter_source_files(roots: Iterable[str] = DEFAULT_ROOTS,
+                      exts: Iterable[str] = SOURCE_EXTS) -> Iterator[Path]:
+    """按固定顺序遍历 roots 下所有匹配扩展名的文件。"""
+    exts = tuple(exts)
+    for root in roots:
+        base = resolve(root)
+        if base.is_file():
+            if base.name.endswith(exts):
+                yield base
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for name in sorted(filenames):
+                if name.endswith(exts):
+                    yield Path(dirpath) / name
+
+
+def is_source_file(rel: str, roots: Iterable[str] = DEFAULT_ROOTS,
+                   exts: Iterable[str] = SOURCE_EXTS) -> bool:
+    """相对路径 rel 是否会被 iter_source_files(roots, exts) 遍历到（不看文件是否存在）。"""
+    if not rel.endswith(tuple(exts)):
+        return False
+    parts = rel.split('/')
+    if any(p in SKIP_DIRS for p in parts[:-1]):
+        return False
+    return any(rel == r or rel.startswith(r.rstrip('/') + '/') for r in roots)
@@ -0,0 +1,457 @@
+"""防回溯的模式匹配：改写脚本里的大正则都走这里。
+
+两种用法：
+
+1. `SafePattern` —— 仍然是 `re`，但编译前先做静态检查，拒绝会灾难性回溯的写法：
+   嵌套的无界重复（`(a+)+`）、无界重复里首字符重叠的分支（`(a.|ab)*`）、
+   相邻且字符集重叠的无界重复（`\\s*\\s*`），以及后面还跟着内容的
+   DOTALL `.*` / `.*?`（匹配失败时对全文是平方级）。每次匹配另有时间预算，
+   超时抛 `PatternTimeout`，不会把脚本卡死。
+
+2. `TokenPattern` —— 对「空白无关」的 JSX/TS 片段不写正则，直接按 token 序列比较：
+   片段和文件用同一个 tokenizer 切分，注释忽略，JSX 文本里的空白折叠。片段中的
+   `$$$` 是一个洞，匹配括号平衡的最短 token 序列（不回溯，最多 `max_hole` 个）：
+
+       pattern = TokenPattern("startPenaltyGold: totalPenalty, $$$ }, }));")
+       for m in pattern.finditer(text):
+           tx.insert(m.end, addition)
+"""
+from __future__ import annotations
+
+import multiprocessing
+import re
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple
+
+from toolkit.tokenizer import Token, text_tokens, tokenize
+
+try:  # Python 3.11+
+    from re import _constants as _sre_c, _parser as _sre_parse
+except ImportError:  # pragma: no cover - 旧版本解释器
+    import sre_constants as _sre_c
+    import sre_parse as _sre_parse
+
+# 单次匹配的默认时间预算（秒）
+DEFAULT_BUDGET = 2.0
+
+_REPEATS = (_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT)
+_UNBOUNDED = _sre_c.MAXREPEAT
+_SPACE = frozenset(' \t\n\r\f\v')
+_DIGIT = frozenset('0123456789')
+
+
+class UnsafePattern(ValueError):
+    """模式可能灾难性回溯。"""
+
+
+class PatternTimeout(TimeoutError):
+    """单次匹配超出时间预算。"""
+
+
+# ---------------------------------------------------------------------------
+# 静态检查
+# ---------------------------------------------------------------------------
+
+# 字符集合的近似：frozenset 里是具体字符或类别标记（\w \W \S \D），None 表示「任意字符」
+_CATEGORIES = {
+    _sre_c.CATEGORY_SPACE: _SPACE,
+    _sre_c.CATEGORY_DIGIT: _DIGIT,
+    _sre_c.CATEGORY_WORD: frozenset({'\\w'}),
+    _sre_c.CATEGORY_NOT_WORD: frozenset({'\\W'}),
+    _sre_c.CATEGORY_NOT_SPACE: frozenset({'\\S'}),
+    _sre_c.CATEGORY_NOT_DIGIT: frozenset({'\\D'}),
+}
+_MARKS = ('\\w', '\\W', '\\S', '\\D')
+
+
+def _in_category(c: str, mark: str) -> bool:
+    if mark == '\\w':
+        return c.isalnum() or c == '_'
+    if mark == '\\W':
+        return not (c.isalnum() or c == '_')
+    if mark == '\\S':
+        return c not in _SPACE
+    return c not in _DIGIT
+
+
+def _item_chars(op, av):
+    if op is _sre_c.LITERAL:
+        return frozenset(chr(av))
+    if op is _sre_c.IN:
+        chars: set[str] = set()
+        for sub_op, sub_av in av:
+            if sub_op is _sre_c.NEGATE:
+                return None
+            if sub_op is _sre_c.LITERAL:
+                chars.add(chr(sub_av))
+            elif sub_op is _sre_c.RANGE and sub_av[1] - sub_av[0] < 256:
+                chars.update(chr(c) for c in range(sub_av[0], sub_av[1] + 1))
+            elif sub_op is _sre_c.CATEGORY and sub_av in _CATEGORIES:
+                chars |= _CATEGORIES[sub_av]
+            else:
+                return None
+        return frozenset(chars)
+    return None
+
+
+def _first_chars(items):
+    """子模式可能的首字符（近似）；None 表示任意。"""
+    first: set[str] = set()
+    for op, av in items:
+        if op is _sre_c.SUBPATTERN:
+            chars, empty = _first_chars(av[-1]), _can_be_empty(av[-1])
+        elif op is _sre_c.BRANCH:
+            chars = set()
+            for branch in av[1]:
+                sub = _first_chars(branch)
+                if sub is None:
+                    return None
+                chars |= sub
+            empty = any(_can_be_empty(b) for b in av[1])
+        elif op in _REPEATS or op is getattr(_sre_c, 'POSSESSIVE_REPEAT', None):
+            chars, empty = _first_chars(av[2]), av[0] == 0 or _can_be_empty(av[2])
+        elif op in (_sre_c.AT, _sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            continue
+        else:
+            chars, empty = _item_chars(op, av), False
+        if chars is None:
+            return None
+        first |= chars
+        if not empty:
+            return frozenset(first)
+    return frozenset(first)
+
+
+def _can_be_empty(items) -> bool:
+    for op, av in items:
+        if op in (_sre_c.AT, _sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            continue
+        if op is _sre_c.SUBPATTERN:
+            if not _can_be_empty(av[-1]):
+                return False
+        elif op is _sre_c.BRANCH:
+            if not any(_can_be_empty(b) for b in av[1]):
+                return False
+        elif op in _REPEATS or op is getattr(_sre_c, 'POSSESSIVE_REPEAT', None):
+            if av[0] > 0 and not _can_be_empty(av[2]):
+                return False
+        else:
+            return False
+    return True
+
+
+def _overlap(a, b) -> bool:
+    if a is None or b is None or a & b:
+        return True
+    marks_a = [m for m in a if m in _MARKS]
+    marks_b = [m for m in b if m in _MARKS]
+    # \w 与 \W 互斥；其余类别两两都有交集
+    for x in marks_a:
+        for y in marks_b:
+            if {x, y} != {'\\w', '\\W'}:
+                return True
+    return any(_in_category(c, m) for m in marks_a for c in b if c not in _MARKS) or \
+        any(_in_category(c, m) for m in marks_b for c in a if c not in _MARKS)
+
+
+def _branches(items) -> Iterator[list]:
+    """子模式里（不进入嵌套重复）所有分支的候选列表。"""
+    for op, av in items:
+        if op is _sre_c.SUBPATTERN:
+            yield from _branches(av[-1])
+        elif op is _sre_c.BRANCH:
+            yield av[1]
+            for branch in av[1]:
+                yield from _branches(branch)
+
+
+def _check(items, dotall: bool, in_repeat: bool, top: bool) -> None:
+    prev_unbounded = None   # 上一个无界重复的字符集（中间只隔着可空的内容）
+    has_prev = False
+    n = len(items)
+    for idx, (op, av) in enumerate(items):
+        if op is _sre_c.SUBPATTERN:
+            add_flags, del_flags = av[1], av[2]
+            sub_dotall = (dotall or bool(add_flags & re.DOTALL)) and not del_flags & re.DOTALL
+            _check(av[-1], sub_dotall, in_repeat, top and idx == n - 1)
+        elif op is _sre_c.BRANCH:
+            for branch in av[1]:
+                _check(branch, dotall, in_repeat, False)
+        elif op in (_sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            _check(av[1], dotall, in_repeat, False)
+        elif op in _REPEATS:
+            lo, hi, body = av
+            if hi == _UNBOUNDED:
+                if in_repeat:
+                    raise UnsafePattern('嵌套的无界重复（如 (a+)+）会指数级回溯')
+                for alternatives in _branches(body):
+                    firsts = [_first_chars(b) for b in alternatives]
+                    for i in range(len(firsts)):
+                        for j in range(i + 1, len(firsts)):
+                            if _overlap(firsts[i], firsts[j]):
+                                raise UnsafePattern('无界重复里的分支首字符重叠（如 (a.|ab)*）')
+                chars = _first_chars(body)
+                if has_prev and _overlap(prev_unbounded, chars):
+                    raise UnsafePattern('相邻的无界重复字符集重叠（如 \\s*\\s*）')
+                if dotall and len(body) == 1 and body[0][0] is _sre_c.ANY \
+                        and not (top and idx == n - 1):
+                    raise UnsafePattern('DOTALL 的 .* / .*? 后面还有内容，匹配失败时对全文是平方级；'
+                                        '改用 TokenPattern 的 $$$ 洞')
+                _check(body, dotall, True, False)
+                prev_unbounded, has_prev = chars, True
+                continue
+            _check(body, dotall, in_repeat, False)
+            if lo == 0 or _can_be_empty(body):
+                continue
+        elif op in (_sre_c.AT,):
+            continue
+        has_prev = False
+
+
+def check_pattern(pattern: str, flags: int = 0) -> None:
+    """静态检查；可能灾难性回溯时抛 UnsafePattern。"""
+    parsed = _sre_parse.parse(pattern, flags)
+    state = getattr(parsed, 'state', None) or parsed.pattern
+    _check(list(parsed), bool(state.flags & re.DOTALL), False, True)
+
+
+# ---------------------------------------------------------------------------
+# 时间预算
+# ---------------------------------------------------------------------------
+
+def _can_alarm() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _deadline(seconds: float | None):
+    """用 SIGALRM 中断超时的匹配（re 在匹配过程中会检查信号）。"""
+    if not seconds or not _can_alarm():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PatternTimeout(f'匹配超过 {seconds}s 预算')
+
+    old_handler = signal.signal(signal.SIGALRM, on_alarm)
+    old_timer = signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+        if old_timer[0]:
+            signal.setitimer(signal.ITIMER_REAL, *old_timer)
+
+
+def _spans_worker(regex: re.Pattern, text: str, pos: int, limit: int | None):
+    out = []
+    for m in regex.finditer(text, pos):
+        out.append(m.regs)
+        if limit is not None and len(out) >= limit:
+            break
+    return out
+
+
+def _match_worker(regex: re.Pattern, text: str, pos: int):
+    m = regex.match(text, pos)
+    return None if m is None else m.regs
+
+
+def _in_subprocess(worker, args: tuple, budget: float | None):
+    """没有 SIGALRM（Windows、非主线程）时：在子进程里匹配，超时就终止子进程。"""
+    with multiprocessing.Pool(1) as pool:
+        pending = pool.apply_async(worker, args)
+        try:
+            return pending.get(budget)
+        except multiprocessing.TimeoutError:
+            pool.terminate()
+            raise PatternTimeout(f'匹配超过 {budget}s 预算') from None
+
+
+class _Match(NamedTuple):
+    """子进程模式下的匹配结果（只有位置和分组）。"""
+    regs: tuple
+    string: str
+
+    def span(self, group: int = 0) -> tuple[int, int]:
+        return self.regs[group]
+
+    def start(self, group: int = 0) -> int:
+        return self.regs[group][0]
+
+    def end(self, group: int = 0) -> int:
+        return self.regs[group][1]
+
+    def group(self, group: int = 0) -> str | None:
+        start, end = self.regs[group]
+        return None if start < 0 else self.string[start:end]
+
+
+class SafePattern:
+    """通过静态检查的正则；finditer/search/sub 的每次匹配都有时间预算。"""
+
+    def __init__(self, pattern: str, flags: int = 0, budget: float | None = DEFAULT_BUDGET):
+        check_pattern(pattern, flags)
+        self.regex = re.compile(pattern, flags)
+        self.budget = budget
+
+    @property
+    def pattern(self) -> str:
+        return self.regex.pattern
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[re.Match | _Match]:
+        if not _can_alarm():
+            for regs in _in_subprocess(_spans_worker, (self.regex, text, pos, None), self.budget):
+                yield _Match(regs, text)
+            return
+        it = self.regex.finditer(text, pos)
+        while True:
+            with _deadline(self.budget):
+                m = next(it, None)
+            if m is None:
+                return
+            yield m
+
+    def match(self, text: str, pos: int = 0):
+        """只在 pos 处尝试匹配。"""
+        if not _can_alarm():
+            regs = _in_subprocess(_match_worker, (self.regex, text, pos), self.budget)
+            return None if regs is None else _Match(regs, text)
+        with _deadline(self.budget):
+            return self.regex.match(text, pos)
+
+    def search(self, text: str, pos: int = 0):
+        return next(self.finditer(text, pos), None)
+
+    def subn(self, repl: str | Callable, text: str, count: int = 0) -> tuple[str, int]:
+        chunks: list[str] = []
+        last = n = 0
+        for m in self.finditer(text):
+            chunks.append(text[last:m.start()])
+            if callable(repl):
+                chunks.append(repl(m))
+            elif isinstance(m, _Match):
+                chunks.append(self.regex.match(text, m.start()).expand(repl))
+            else:
+                chunks.append(m.expand(repl))
+            last = m.end()
+            n += 1
+            if count and n >= count:
+                break
+        chunks.append(text[last:])
+        return ''.join(chunks), n
+
+    def sub(self, repl: str | Callable, text: str, count: int = 0) -> str:
+        return self.subn(repl, text, count)[0]
+
+
+def compile(pattern: str, flags: int = 0, budget: float | None = DEFAULT_BUDGET) -> SafePattern:
+    return SafePattern(pattern, flags, budget)
+
+
+# ---------------------------------------------------------------------------
+# token 序列匹配
+# ---------------------------------------------------------------------------
+
+HOLE = '$$$'
+_TEXT_ATOM = re.compile(r'[\w$]+|\S')
+_SPLIT_KINDS = frozenset({'punct', 'jsx_open', 'jsx_end', 'jsx_brace'})
+_OPENERS = frozenset('([{')
+_CLOSERS = frozenset(')]}')
+
+
+class TokenMatch(NamedTuple):
+    start: int    # 字符偏移（含）
+    end: int      # 不含
+    first: int    # 原子下标（含）
+    last: int
+
+
+def _atoms(tokens: list[Token]) -> list[tuple[int, int, str]]:
+    """把 token 拆成与上下文无关的原子：(起点, 终点, 值)。
+
+    片段脱离了文件上下文，同一段代码可能被切成不同的 token（比如洞后面的 `</button>`
+    在片段里会落进标签属性模式），所以标点一律拆成单个字符，JSX 文本按词和单个
+    符号拆开；标识符、数字、字符串、模板片段保持整体。注释丢弃，空白不参与比较。
+    """
+    out = []
+    for t in tokens:
+        if t.kind == 'comment':
+            continue
+        if t.kind in _SPLIT_KINDS:
+            out.extend((t.start + i, t.start + i + 1, ch) for i, ch in enumerate(t.value) if not ch.isspace())
+        elif t.kind == 'jsx_text':
+            out.extend((t.start + m.start(), t.start + m.end(), m.group(0))
+                       for m in _TEXT_ATOM.finditer(t.value))
+        else:
+            out.append((t.start, t.end, t.value))
+    return out
+
+
+class TokenPattern:
+    """按 token 序列匹配的代码片段，与缩进、换行、注释无关。"""
+
+    def __init__(self, snippet: str, jsx: bool = True, max_hole: int = 2000):
+        self.snippet = snippet
+        self.jsx = jsx
+        self.max_hole = max_hole
+        tokens = tokenize(snippet, jsx=jsx)
+        # 以洞分段：[[值...], [值...], ...]
+        self.segments: list[list[str]] = [[]]
+        for _start, _end, value in _atoms(tokens):
+            if value == HOLE:
+                self.segments.append([])
+            else:
+                self.segments[-1].append(value)
+        if not self.segments[0]:
+            raise ValueError('TokenPattern 不能以 $$$ 开头')
+
+    def _match_at(self, values: list[str], i: int, segment: list[str]) -> bool:
+        return values[i:i + len(segment)] == segment
+
+    def _hole(self, values: list[str], i: int, segment: list[str]) -> int:
+        """从 i 开始找最短的括号平衡前缀，使 segment 紧随其后；返回 segment 起点或 -1。"""
+        depth = 0
+        limit = min(len(values), i + self.max_hole + 1)
+        for k in range(i, limit):
+            if depth == 0 and (not segment or self._match_at(values, k, segment)):
+                return k
+            value = values[k]
+            if value in _OPENERS:
+                depth += 1
+            elif value in _CLOSERS:
+                depth -= 1
+                if depth < 0:
+                    return -1
+        return -1
+
+    def finditer(self, text: str, tokens: list[Token] | None = None) -> Iterator[TokenMatch]:
+        """在 text 中按顺序产出不重叠的匹配，偏移是 text 的下标。tokens 可传入同一份文本的分词结果。"""
+        if tokens is None:
+            # 直接对 text 分词：text 含 surrogateescape 的代理字符时，按字节 'replace' 解码的偏移会错位
+            _digest, tokens = text_tokens(text, self.jsx)
+        atoms = _atoms(tokens)
+        values = [v for _s, _e, v in atoms]
+        head = self.segments[0]
+        i = 0
+        while i <= len(values) - len(head):
+            if values[i] != head[0] or not self._match_at(values, i, head):
+                i += 1
+                continue
+            k = i + len(head)
+            for segment in self.segments[1:]:
+                k = self._hole(values, k, segment)
+                if k < 0:
+                    break
+                k += len(segment)
+            if k < 0 or k == i:
+                i += 1
+                continue
+            yield TokenMatch(atoms[i][0], atoms[k - 1][1], i, k - 1)
+            i = k
+
+    def search(self, text: str, tokens: list[Token] | None = None) -> TokenMatch | None:
+        return next(self.finditer(text, tokens), None)
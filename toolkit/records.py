@@ -0,0 +1,446 @@
+"""按 key 存放的记录型 state：找出每次更新都整张复制的 `setX(prev => ({ ...prev, [id]: v }))`。
+
+NewTimelineView 里 taskStartTimeouts / taskFinishTimeouts / taskActualStartTimes 这类
+`useState<Record<string, T>>` 每写一个任务的值，就把整张表展开复制一遍，再让整个
+组件重渲染；表按任务数增长，写入又常常来自倒计时、超时回调，N 个任务依次触发时总共
+复制 O(N²) 个属性。这里：
+
+1. 逐个文件（walker 增量缓存）找 `const [x, setX] = useState(...)`，以及 setX 的每个
+   调用点：对象展开 + 计算属性（`{ ...prev, [k]: v }`）的记为展开复制，同时记下 key
+   表达式、是否整体替换、setX 是否被当作值传出去；
+2. key 表达式里有 task / block 的按任务数估算表的大小，其余按小表估算；
+3. 调用点位于 setInterval / setTimeout / requestAnimationFrame 回调里，或所在函数、
+   JSX 属性名带 timeout / countdown / tick / timer 之类时标为计时器驱动；
+4. codemod：改成 `useReducer(keyedRecordReducer<T>, init)`，setX 的调用改成 dispatch
+   （set / update / replace 三种动作），辅助模块 src/utils/keyedRecord.ts 不存在时一并
+   生成。set 动作在值没变时返回原对象：计时器反复写同一个标记既不复制也不重渲染。
+
+    python -m toolkit records --tasks 200
+    python -m toolkit records --diff > keyed.patch
+"""
+from __future__ import annotations
+
+import difflib
+import re
+from typing import Iterable, NamedTuple
+
+from toolkit.files import cached
+from toolkit.paths import DEFAULT_ROOTS, REPO_ROOT, SOURCE_EXTS
+from toolkit.spans import SpanIndex, spans_for
+from toolkit.tokenizer import Token, is_jsx_file, significant, tokens_for
+from toolkit.walker import WalkResult, walk
+
+RECORDS_VERSION = 1
+PATCH_ID = 'keyed-record-reducer'
+HELPER_PATH = 'src/utils/keyedRecord.ts'
+HELPER_IMPORT = "import { keyedRecordReducer } from '@/utils/keyedRecord';"
+DEFAULT_TASKS = 100
+DEFAULT_SMALL_KEYS = 10
+TIMER_CALLS = frozenset({'setInterval', 'setTimeout', 'requestAnimationFrame'})
+_TIMER_NAME = re.compile(r'timeout|countdown|tick|interval|timer|elapsed', re.I)
+_PER_TASK_KEY = re.compile(r'task|block', re.I)
+
+HELPER_SOURCE = """\
+// ============================================
+// 按 key 存放的记录型状态（配合 useReducer 使用）
+// ============================================
+
+export type KeyedRecordAction<T> =
+  | { type: 'set'; key: string; value: T }
+  | { type: 'remove'; key: string }
+  | { type: 'replace'; value: Record<string, T> }
+  | { type: 'update'; update: (prev: Record<string, T>) => Record<string, T> };
+
+// 值没变时返回原对象：计时器反复写入同一个标记不会复制整张表，也不会触发重渲染
+export function keyedRecordReducer<T>(state: Record<string, T>, action: KeyedRecordAction<T>): Record<string, T> {
+  switch (action.type) {
+    case 'set':
+      if (action.key in state && state[action.key] === action.value) {
+        return state;
+      }
+      return { ...state, [action.key]: action.value };
+    case 'remove': {
+      if (!(action.key in state)) {
+        return state;
+      }
+      const next = { ...state };
+      delete next[action.key];
+      return next;
+    }
+    case 'replace':
+      return action.value;
+    case 'update':
+      return action.update(state);
+    default:
+      return state;
+  }
+}
+"""
+
+
+class Edit(NamedTuple):
+    start: int
+    end: int
+    text: str
+
+
+class Update(NamedTuple):
+    lineno: int
+    form: str               # set：单个计算属性的展开；spread：其他展开复制；update：别的函数式更新；replace：整体替换
+    key: str | None         # 计算属性的 key 表达式
+    timer: str | None       # 计时器驱动时的依据（回调 / 函数名）
+    edits: tuple[Edit, ...]
+
+    @property
+    def copies(self) -> bool:
+        return self.form in ('set', 'spread')
+
+
+class RecordState(NamedTuple):
+    path: str
+    lineno: int
+    name: str
+    setter: str
+    value_type: str | None  # Record<string, T> 里的 T
+    scope: str | None
+    updates: tuple[Update, ...]
+    edits: tuple[Edit, ...]  # 声明处的改写；不能改写时为空
+    note: str = ''
+
+    @property
+    def per_task(self) -> bool:
+        return any(u.key and _PER_TASK_KEY.search(u.key) for u in self.updates)
+
+    @property
+    def rewritable(self) -> bool:
+        return bool(self.edits)
+
+    def keys(self, tasks: int = DEFAULT_TASKS, small: int = DEFAULT_SMALL_KEYS) -> int:
+        return tasks if self.per_task else small
+
+    def copied(self, tasks: int = DEFAULT_TASKS, small: int = DEFAULT_SMALL_KEYS) -> int:
+        """每个 key 依次写入一次，总共复制的属性数：1 + 2 + ... + K。"""
+        keys = self.keys(tasks, small)
+        return keys * (keys + 1) // 2
+
+    def describe(self, tasks: int = DEFAULT_TASKS, small: int = DEFAULT_SMALL_KEYS) -> str:
+        spreads = [u for u in self.updates if u.copies]
+        timers = [u for u in spreads if u.timer]
+        keys = self.keys(tasks, small)
+        scale = f'按任务数 {keys} 个 key' if self.per_task else f'按小表 {keys} 个 key'
+        line = (f'{self.path}:{self.lineno} {self.name}'
+                + (f' [{self.scope}]' if self.scope else '')
+                + f'：{len(spreads)} 处展开复制，每次复制 ~{keys} 个属性（{scale}），'
+                  f'每个 key 写一遍共 ~{self.copied(tasks, small)} 个')
+        if timers:
+            line += f'；{len(timers)} 处由计时器驱动'
+        return line
+
+
+# ---------------------------------------------------------------------------
+# 扫描
+
+def _pairs(toks: list[Token]) -> list[int]:
+    pair = [-1] * len(toks)
+    stack: list[int] = []
+    for i, t in enumerate(toks):
+        if t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${'):
+            stack.append(i)
+        elif t.kind in ('punct', 'jsx_brace') and t.value in (')', ']', '}') and stack:
+            j = stack.pop()
+            pair[i], pair[j] = j, i
+    return pair
+
+
+class _FileScan:
+    def __init__(self, rel: str, text: str, toks: list[Token], index: SpanIndex):
+        self.rel = rel
+        self.text = text
+        self.toks = toks
+        self.index = index
+        self.pair = _pairs(toks)
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        if not 0 <= i < len(self.toks):
+            return False
+        t = self.toks[i]
+        return t.kind == kind and (not values or t.value in values)
+
+    def lineno(self, i: int) -> int:
+        return self.text.count('\n', 0, self.toks[i].start) + 1
+
+    def source(self, a: int, b: int) -> str:
+        """token a..b（含）的原文。"""
+        return self.text[self.toks[a].start:self.toks[b].end]
+
+    def scope(self, offset: int) -> str | None:
+        span = self.index.enclosing(offset)
+        while span is not None:
+            if span.kind in ('function', 'arrow') and span.name and span.callee is None:
+                return span.name
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return None
+
+    def timer(self, offset: int) -> str | None:
+        span = self.index.enclosing(offset)
+        while span is not None:
+            if span.kind in ('function', 'arrow'):
+                if span.callee in TIMER_CALLS:
+                    return f'{span.callee} 回调'
+                if span.name and _TIMER_NAME.search(span.name):
+                    return span.name
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return None
+
+    def run(self) -> list[RecordState]:
+        toks = self.toks
+        states = []
+        for i, t in enumerate(toks):
+            # const [x, setX] = useState
+            if t.kind == 'ident' and t.value == 'useState' and self.is_(i - 1, 'punct', '=') \
+                    and self.is_(i - 2, 'punct', ']') and self.is_(i - 6, 'punct', '[') \
+                    and self.is_(i - 5, 'ident') and self.is_(i - 4, 'punct', ',') and self.is_(i - 3, 'ident') \
+                    and self.is_(i - 7, 'ident', 'const', 'let'):
+                state = self.state(i)
+                if state is not None:
+                    states.append(state)
+        return states
+
+    def state(self, i: int) -> RecordState | None:
+        toks = self.toks
+        name, setter = toks[i - 5].value, toks[i - 3].value
+        # useState<...>(
+        j, type_text = i + 1, None
+        if self.is_(j, 'punct', '<'):
+            # `Record<string, boolean>>` 的结尾是一个 `>>` token，里面那个 `>` 属于类型本身
+            depth, k, end = 0, j, None
+            while k < len(toks) and end is None:
+                if self.is_(k, 'punct', '<'):
+                    depth += 1
+                elif self.is_(k, 'punct', '>', '>>'):
+                    depth -= len(toks[k].value)
+                    if depth <= 0:
+                        end = toks[k].start + len(toks[k].value) - 1
+                        break
+                k += 1
+            type_text = self.text[toks[j].end:end].strip() if end is not None and depth == 0 else None
+            j = k + 1
+        if not self.is_(j, 'punct', '(') or self.pair[j] < 0:
+            return None
+        close = self.pair[j]
+        init = self.source(j + 1, close - 1) if close > j + 1 else 'undefined'
+        # 只看按 key 存放的表：Record<K, V>、索引签名，或没标类型、初值为 {}
+        if not (re.match(r'Record\s*<|\{\s*\[', type_text or '') or type_text is None and init == '{}'):
+            return None
+        span = self.index.enclosing(toks[i].start)
+        while span is not None and span.kind not in ('function', 'arrow'):
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        last = span.last if span is not None else len(toks) - 1
+
+        updates, escaped = [], None
+        for k in range(close + 1, last + 1):
+            if not self.is_(k, 'ident', setter) or self.is_(k - 1, 'punct', '.', '?.'):
+                continue
+            if self.is_(k + 1, 'punct', '(') and self.pair[k + 1] > k + 1:
+                updates.append(self.update(k, name, setter))
+            elif escaped is None:
+                escaped = self.lineno(k)
+        if not any(u.copies and u.key for u in updates):
+            return None
+
+        value_type = None
+        m = re.fullmatch(r'Record<\s*string\s*,\s*(.+)>', type_text or '', re.S)
+        if m:
+            value_type = m.group(1).strip()
+        dispatch = 'dispatch' + setter[3:] if setter.startswith('set') else 'dispatch' + setter
+        note = ''
+        if escaped is not None:
+            note = f'{setter} 被当作值传出（第 {escaped} 行）'
+        elif value_type is None:
+            note = f'类型不是 Record<string, T>（{type_text or "未标注"}）'
+        elif re.search(r'\b%s\b' % re.escape(dispatch), self.text):
+            note = f'文件里已经有 {dispatch}'
+        elif any(not u.edits for u in updates):
+            note = '有无法改写的更新'
+        edits: tuple[Edit, ...] = ()
+        if not note:
+            edits = (Edit(toks[i - 3].start, toks[i - 3].end, dispatch),
+                     Edit(toks[i].start, toks[close].end, f'useReducer(keyedRecordReducer<{value_type}>, {init})'))
+            lazy = self.is_(j + 1, 'ident', 'function') or self.is_(j + 1, 'ident') and self.is_(j + 2, 'punct', '=>') \
+                or self.is_(j + 1, 'punct', '(') and self.is_(self.pair[j + 1] + 1, 'punct', '=>')
+            if lazy:        # useState(() => ...) 的惰性初始化是 useReducer 的第三个参数
+                edits = edits[:1] + (Edit(toks[i].start, toks[close].end,
+                                          f'useReducer(keyedRecordReducer<{value_type}>, undefined, {init})'),)
+        return RecordState(self.rel, self.lineno(i), name, setter, value_type, self.scope(toks[i].start),
+                           tuple(updates), edits, note)
+
+    def spread_of(self, a: int, b: int, base: str) -> tuple[str, int | None]:
+        """a..b 里的 `{ ...base, ... }`：(set / spread / '', 计算属性 `[` 的下标)。
+
+        展开之后只有一个计算属性时是 set；有多个对象展开时优先取带计算属性的那个。
+        """
+        found: tuple[str, int | None] = ('', None)
+        for k in range(a, b):
+            if not (self.is_(k, 'punct', '{') and self.is_(k + 1, 'punct', '...') and self.is_(k + 2, 'ident', base)):
+                continue
+            entries = self.entries(k + 3, self.pair[k])
+            keys = [e for e in entries if self.is_(e, 'punct', '[')]
+            if keys:
+                return ('set' if len(entries) == 1 else 'spread'), keys[0]
+            found = found if found[0] else ('spread', None)
+        return found
+
+    def entries(self, a: int, end: int) -> list[int]:
+        """对象字面量里 a 之后各个顶层条目的首 token 下标。"""
+        starts, m = [], a
+        while 0 <= m < end:
+            t = self.toks[m]
+            if t.kind == 'punct' and t.value == ',' and m + 1 < end:
+                starts.append(m + 1)
+            if t.kind == 'punct' and t.value in ('(', '[', '{') and self.pair[m] > m:
+                m = self.pair[m] + 1
+                continue
+            m += 1
+        return starts
+
+    def update(self, k: int, name: str, setter: str) -> Update:
+        toks, pair = self.toks, self.pair
+        open_, close = k + 1, pair[k + 1]
+        a = open_ + 1
+        timer = self.timer(toks[k].start)
+        # 函数式更新：prev => ... / (prev) => ... / function (prev) { ... }
+        param = None
+        if self.is_(a, 'ident') and self.is_(a + 1, 'punct', '=>'):
+            param, arrow = toks[a].value, a + 1
+        elif self.is_(a, 'punct', '(') and self.is_(a + 1, 'ident') and self.is_(a + 2, 'punct', ')') \
+                and self.is_(a + 3, 'punct', '=>'):
+            param, arrow = toks[a + 1].value, a + 3
+        dispatch = 'dispatch' + setter[3:] if setter.startswith('set') else 'dispatch' + setter
+        wrap = lambda kind, field: (Edit(toks[k].start, toks[open_].end, f"{dispatch}({{ type: '{kind}', {field}: "),
+                                    Edit(toks[close].start, toks[close].end, ' })'))
+        if param is None:
+            form, key_at = self.spread_of(a, close, name)
+            key = self.source(key_at + 1, pair[key_at] - 1) if key_at is not None else None
+            return Update(self.lineno(k), 'spread' if form else 'replace', key, timer, wrap('replace', 'value'))
+        form, key_at = self.spread_of(arrow + 1, close, param)
+        key = self.source(key_at + 1, pair[key_at] - 1) if key_at is not None else None
+        # 整个函数体就是 ({ ...prev, [k]: v })，且 k、v 里不再引用 prev：可以改成 set 动作
+        body = arrow + 1
+        if form == 'set' and self.is_(body, 'punct', '(') and self.is_(body + 1, 'punct', '{') \
+                and pair[body] == close - 1 and pair[body + 1] == close - 2 \
+                and not any(self.is_(m, 'ident', param) for m in range(key_at, close - 2)) \
+                and self.is_(pair[key_at] + 1, 'punct', ':'):
+            colon = pair[key_at] + 1
+            value_end = close - 3
+            if self.is_(value_end, 'punct', ','):
+                value_end -= 1
+            edits = (Edit(toks[k].start, toks[key_at].end, f"{dispatch}({{ type: 'set', key: "),
+                     Edit(toks[pair[key_at]].start, toks[colon].end, ', value:'),
+                     Edit(toks[value_end].end, toks[close].end, ' })'))
+            return Update(self.lineno(k), 'set', key, timer, edits)
+        return Update(self.lineno(k), 'spread' if form else 'update', key, timer, wrap('update', 'update'))
+
+
+def file_records(rel: str, text: str) -> list[RecordState]:
+    """walker 任务：一个文件里用展开复制更新的记录型 state。"""
+    data = text.encode('utf-8')
+    jsx = is_jsx_file(rel)
+    _digest, tokens = tokens_for(data, jsx)
+    return _FileScan(rel, text, significant(tokens), spans_for(data, jsx)).run()
+
+
+def run(roots: Iterable[str] = DEFAULT_ROOTS, paths: Iterable[str] | None = None,
+        workers: int | None = None) -> WalkResult:
+    """results 为 {相对路径: [RecordState]}。"""
+    return walk(file_records, 'records:v%d' % RECORDS_VERSION, tuple(roots), SOURCE_EXTS,
+                paths=paths, workers=workers)
+
+
+def rank(results: dict[str, list[RecordState]], tasks: int = DEFAULT_TASKS,
+         small: int = DEFAULT_SMALL_KEYS) -> list[RecordState]:
+    """计时器驱动的排前面，其次按总复制量、展开处数。"""
+    states = [s for found in results.values() for s in found]
+    return sorted(states, key=lambda s: (not any(u.timer for u in s.updates if u.copies),
+                                         -s.copied(tasks, small),
+                                         -sum(1 for u in s.updates if u.copies), s.path, s.lineno))
+
+
+# ---------------------------------------------------------------------------
+# codemod
+
+def _import_edits(rel: str) -> list[Edit]:
+    """给 react 的 import 补上 useReducer，并在最后一条 import 之后引入 keyedRecordReducer。"""
+    entry = cached(rel)
+    text, toks = entry.text, significant(entry.tokens())
+    edits: list[Edit] = []
+    last_import_end = None
+    for i, t in enumerate(toks):
+        if not (t.kind == 'ident' and t.value == 'import') or i + 1 < len(toks) and toks[i + 1].value == '(':
+            continue
+        k = i + 1
+        while k < len(toks) and not (toks[k].kind == 'string' and (k == i + 1 or toks[k - 1].value == 'from')):
+            k += 1
+        if k >= len(toks):
+            break
+        last_import_end = toks[k + 1].end if k + 1 < len(toks) and toks[k + 1].value == ';' else toks[k].end
+        if toks[k].value[1:-1] != 'react' or 'useReducer' in text[t.start:toks[k].start]:
+            continue
+        if toks[k - 2].value == '}':                       # import { useState } from 'react'
+            edits.append(Edit(toks[k - 3].end, toks[k - 3].end, ', useReducer'))
+        elif toks[k - 2].kind == 'ident' and toks[k - 3].value == 'import':   # import React from 'react'
+            edits.append(Edit(toks[k - 2].end, toks[k - 2].end, ', { useReducer }'))
+    if 'keyedRecordReducer' not in text and last_import_end is not None:
+        edits.append(Edit(last_import_end, last_import_end, '\n' + HELPER_IMPORT))
+    return edits
+
+
+def _by_path(states: Iterable[RecordState]) -> dict[str, list[Edit]]:
+    edits: dict[str, list[Edit]] = {}
+    for state in states:
+        if state.rewritable:
+            found = edits.setdefault(state.path, [])
+            found.extend(state.edits)
+            for update in state.updates:
+                found.extend(update.edits)
+    for rel, found in edits.items():
+        found.extend(_import_edits(rel))
+    return edits
+
+
+def _transaction(rel: str, edits: list[Edit]):
+    from toolkit.edits import Transaction
+    tx = Transaction(rel)
+    for edit in edits:
+        tx.replace(edit.start, edit.end, edit.text)
+    return tx
+
+
+def diff(states: Iterable[RecordState]) -> str:
+    """改成 useReducer 的统一 diff（含新建的辅助模块），可以直接 git apply。"""
+    chunks = []
+    by_path = _by_path(states)
+    if by_path and not (REPO_ROOT / HELPER_PATH).exists():
+        chunks.extend(difflib.unified_diff([], HELPER_SOURCE.splitlines(keepends=True),
+                                           '/dev/null', f'b/{HELPER_PATH}'))
+    for rel, edits in sorted(by_path.items()):
+        tx = _transaction(rel, edits)
+        chunks.extend(difflib.unified_diff(tx.original.splitlines(keepends=True), tx.apply().splitlines(keepends=True),
+                                           f'a/{rel}', f'b/{rel}'))
+    return ''.join(chunks)
+
+
+def write(states: Iterable[RecordState]) -> list[str]:
+    """经 Transaction 写回（先存快照，补丁 ID 为 PATCH_ID），需要时新建辅助模块，返回改过的文件。"""
+    from toolkit import backup
+    from toolkit.files import write_text
+    by_path = _by_path(states)
+    written = []
+    if by_path and not (REPO_ROOT / HELPER_PATH).exists():
+        write_text(HELPER_PATH, HELPER_SOURCE)
+        written.append(HELPER_PATH)
+    for rel, edits in sorted(by_path.items()):
+        tx = _transaction(rel, edits)
+        backup.snapshot(rel, PATCH_ID)
+        if tx.commit():
+            written.append(rel)
+    return written
@@ -0,0 +1,418 @@
+"""基于 tokenizer 的结构 span 索引。
+
+一遍扫描 token，记录每个函数（function 声明、方法）、箭头函数、JSX 元素和对象字面量
+的起止偏移，按内容哈希缓存。之后按名字取函数是一次字典查找，按偏移找外层结构是
+一次二分：
+
+    index = load_spans('src/components/calendar/NewTimelineView.tsx')
+    span = index.first('handleStartTask')
+    index.enclosing(offset, kind='jsx')
+
+名字的推断规则：`const x = ...` / `x: ...` 取 x；JSX 属性里的处理函数取属性名
+（onClick）；作为参数传入的回调取被调函数名（map、useEffect），
+useCallback/useMemo 包裹的取外层变量名。
+"""
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from typing import Iterator, NamedTuple
+
+from toolkit import cache
+from toolkit.files import MEMO_BYTES, TOKEN_BYTES, cached
+from toolkit.tokenizer import Token, is_jsx_file, significant, text_tokens, tokens_for
+
+KINDS = ('function', 'arrow', 'jsx', 'object')
+
+# 识别规则变化时递增，让旧的 span 缓存失效
+SPANS_VERSION = 2
+
+_OPENERS = {'(', '[', '{', '${'}
+_CLOSERS = {')', ']', '}'}
+_NOT_METHODS = frozenset({
+    'if', 'for', 'while', 'switch', 'catch', 'function', 'with', 'return', 'super', 'import',
+    'typeof', 'await', 'new',
+})
+_MODIFIERS = frozenset({'async', 'static', 'public', 'private', 'protected', 'get', 'set',
+                        'readonly', 'override'})
+_OBJECT_AFTER_PUNCT = frozenset({'=', '(', ',', ':', '?', '[', '...', '||', '&&', '??'})
+_OBJECT_AFTER_WORD = frozenset({'return', 'yield', 'await', 'default'})
+_STATEMENT_WORDS = frozenset({'const', 'let', 'var', 'function', 'export', 'import', 'return',
+                              'if', 'for', 'while', 'class', 'interface', 'type'})
+_WRAPPER_HOOKS = frozenset({'useCallback', 'useMemo'})
+
+
+class Span(NamedTuple):
+    kind: str            # function / arrow / jsx / object
+    name: str | None
+    start: int           # 字符偏移（含）
+    end: int             # 字符偏移（不含）
+    first: int           # 首/尾 token 在 significant(tokens) 中的下标
+    last: int
+    callee: str | None   # 作为回调参数时的被调函数名
+    parent: int          # 外层 span 的下标，-1 表示顶层
+
+
+class _Builder:
+    def __init__(self, toks: list[Token]):
+        self.toks = toks
+        n = len(toks)
+        self.pair = [-1] * n
+        self.enclosing = [-1] * n
+        self.element_end: dict[int, int] = {}
+        self.in_type = bytearray(n)
+        self._match()
+
+    def _is_open(self, t: Token) -> bool:
+        return (t.kind == 'punct' and t.value in _OPENERS) or (t.kind == 'jsx_brace' and t.value == '{')
+
+    def _is_close(self, t: Token) -> bool:
+        return (t.kind == 'punct' and t.value in _CLOSERS) or (t.kind == 'jsx_brace' and t.value == '}')
+
+    def _match(self) -> None:
+        toks, pair, enclosing = self.toks, self.pair, self.enclosing
+        stack: list[int] = []
+        elements: list[int] = []
+        closing = False
+        for i, t in enumerate(toks):
+            enclosing[i] = stack[-1] if stack else -1
+            if self._is_open(t):
+                stack.append(i)
+            elif self._is_close(t):
+                if stack:
+                    o = stack.pop()
+                    pair[o], pair[i] = i, o
+                    enclosing[i] = enclosing[o]
+            elif t.kind == 'jsx_open':
+                if t.value == '<':
+                    elements.append(i)
+                else:
+                    closing = True
+            elif t.kind == 'jsx_end':
+                if (t.value == '/>' or closing) and elements:
+                    self.element_end[elements.pop()] = i
+                    closing = False
+        # interface / type 别名的花括号里是类型字面量，不算对象
+        for i, t in enumerate(toks):
+            if t.kind != 'ident' or t.value not in ('interface', 'type'):
+                continue
+            if i + 1 >= len(toks) or toks[i + 1].kind != 'ident':
+                continue
+            j = i + 2
+            while j < len(toks) and j < i + 40 and not (toks[j].kind == 'punct' and toks[j].value in ('{', ';')):
+                j += 1
+            if j < len(toks) and toks[j].value == '{' and pair[j] > j:
+                self.in_type[j:pair[j] + 1] = b'\x01' * (pair[j] + 1 - j)
+
+    def tok(self, i: int) -> Token | None:
+        return self.toks[i] if 0 <= i < len(self.toks) else None
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        t = self.tok(i)
+        return t is not None and t.kind == kind and (not values or t.value in values)
+
+    # -- 名字推断 --------------------------------------------------------------
+
+    def context(self, i: int) -> tuple[str | None, str | None]:
+        """位于 token i 的函数/对象的 (名字, 被调函数名)。"""
+        p = i - 1
+        t = self.tok(p)
+        if t is None:
+            return None, None
+        if t.kind == 'punct' and t.value == '=':
+            q = p - 1
+            if self.is_(q, 'jsx_attr'):
+                return self.toks[q].value, None
+            if self.is_(q, 'ident') and not self.is_(q - 1, 'punct', '.', ':'):
+                return self.toks[q].value, None
+            # `const X: React.FC = ...`：跳过类型注解找变量名
+            for r in range(q, max(q - 30, -1), -1):
+                if self.is_(r, 'ident', 'const', 'let', 'var'):
+                    return (self.toks[r + 1].value if self.is_(r + 1, 'ident') else None), None
+                if self.is_(r, 'punct', ';', '{', '}'):
+                    break
+            if self.is_(q, 'ident'):        # obj.handler = ...
+                return self.toks[q].value, None
+            return None, None
+        if t.kind == 'punct' and t.value == ':':
+            q = self.tok(p - 1)
+            if q is not None and q.kind in ('ident', 'string', 'num'):
+                return q.value.strip('\'"'), None
+            return None, None
+        if t.kind == 'jsx_brace' and t.value == '{':
+            if self.is_(p - 1, 'punct', '=') and self.is_(p - 2, 'jsx_attr'):
+                return self.toks[p - 2].value, None
+            return None, None
+        if t.kind == 'punct' and t.value in ('(', ','):
+            open_ = p if t.value == '(' else self.enclosing[p]
+            if open_ < 0 or self.toks[open_].value != '(' or not self.is_(open_ - 1, 'ident'):
+                return None, None
+            callee = self.toks[open_ - 1].value
+            if callee in _WRAPPER_HOOKS:
+                start = open_ - 1
+                if self.is_(start - 1, 'punct', '.') and self.is_(start - 2, 'ident'):
+                    start -= 2
+                name, _ = self.context(start)
+                return name or callee, callee
+            return callee, callee
+        if t.kind == 'ident' and t.value == 'default' and self.is_(p - 1, 'ident', 'export'):
+            return 'default', None
+        return None, None
+
+    # -- 各类 span ------------------------------------------------------------
+
+    def _body_after_params(self, close: int) -> int:
+        """参数列表 `)` 之后的函数体 `{` 下标（跳过返回值类型），找不到返回 -1。"""
+        k = close + 1
+        if self.is_(k, 'punct', ':'):
+            k += 1
+            if self.is_(k, 'punct', '{'):       # 返回值类型是对象类型
+                k = self.pair[k] + 1 if self.pair[k] > 0 else k + 1
+        limit = k + 60
+        while k < len(self.toks) and k < limit:
+            t = self.toks[k]
+            if t.kind == 'punct' and t.value == '{':
+                return k
+            if t.kind == 'punct' and t.value in ('(', '[') and self.pair[k] > k:
+                k = self.pair[k] + 1
+                continue
+            if t.kind == 'punct' and t.value in (';', '}', ')', '=>', '='):
+                return -1
+            k += 1
+        return -1
+
+    def _expression_end(self, b: int) -> int:
+        """箭头函数表达式体的最后一个 token 下标。"""
+        toks, pair = self.toks, self.pair
+        e, pending_q = b, 0
+        while e < len(toks):
+            t = toks[e]
+            if self._is_open(t):
+                if pair[e] < 0:
+                    return len(toks) - 1
+                e = pair[e] + 1
+                continue
+            if t.kind == 'jsx_open' and t.value == '<' and e in self.element_end:
+                e = self.element_end[e] + 1
+                continue
+            if self._is_close(t) or (t.kind == 'punct' and t.value in (',', ';')):
+                return e - 1
+            if t.kind == 'punct' and t.value == '?':
+                pending_q += 1
+            elif t.kind == 'punct' and t.value == ':':
+                if not pending_q:
+                    return e - 1
+                pending_q -= 1
+            elif e > b and t.kind == 'ident' and t.value in _STATEMENT_WORDS:
+                return e - 1
+            e += 1
+        return len(toks) - 1
+
+    def spans(self) -> list[tuple]:
+        toks, pair = self.toks, self.pair
+        out: list[tuple] = []
+
+        def add(kind, name, first, last, callee=None):
+            if 0 <= first <= last < len(toks):
+                out.append((kind, name, toks[first].start, toks[last].end, first, last, callee))
+
+        for s, e in self.element_end.items():
+            name = toks[s + 1].value if self.is_(s + 1, 'jsx_name') else ''
+            add('jsx', name, s, e)
+
+        for i, t in enumerate(toks):
+            if t.kind == 'ident' and t.value == 'function':
+                j = i + 1
+                if self.is_(j, 'punct', '*'):
+                    j += 1
+                name = toks[j].value if self.is_(j, 'ident') else None
+                k = j
+                while k < len(toks) and k < j + 20 and not self.is_(k, 'punct', '('):
+                    k += 1
+                if not self.is_(k, 'punct', '(') or pair[k] < 0:
+                    continue
+                body = self._body_after_params(pair[k])
+                if body < 0 or pair[body] < 0:
+                    continue
+                start = i
+                while self.is_(start - 1, 'ident', 'async', 'export', 'default'):
+                    start -= 1
+                callee = None
+                if name is None:
+                    name, callee = self.context(start)
+                add('function', name, start, pair[body], callee)
+
+            elif t.kind == 'punct' and t.value == '=>' and not self.in_type[i]:
+                start = self._arrow_start(i)
+                if start < 0:
+                    continue
+                if self.is_(start - 1, 'ident', 'async'):
+                    start -= 1
+                name, callee = self.context(start)
+                b = i + 1
+                if self.is_(b, 'punct', '{') and pair[b] > b:
+                    last = pair[b]
+                else:
+                    last = self._expression_end(b)
+                add('arrow', name, start, last, callee)
+
+            elif t.kind == 'ident' and t.value not in _NOT_METHODS and self.is_(i + 1, 'punct', '(') \
+                    and pair[i + 1] > i:
+                prev = self.tok(i - 1)
+                if prev is None or not ((prev.kind == 'punct' and prev.value in ('{', '}', ';', ','))
+                                        or (prev.kind == 'ident' and prev.value in _MODIFIERS)):
+                    continue
+                body = self._body_after_params(pair[i + 1])
+                if body < 0 or pair[body] < 0 or body > pair[i + 1] + 30:
+                    continue
+                start = i
+                while self.is_(start - 1, 'ident') and toks[start - 1].value in _MODIFIERS:
+                    start -= 1
+                add('function', t.value, start, pair[body])
+
+            elif t.kind == 'punct' and t.value == '{' and pair[i] > i and not self.in_type[i]:
+                prev = self.tok(i - 1)
+                if prev is None:
+                    continue
+                if (prev.kind == 'punct' and prev.value in _OBJECT_AFTER_PUNCT) \
+                        or (prev.kind == 'ident' and prev.value in _OBJECT_AFTER_WORD) \
+                        or (prev.kind == 'jsx_brace' and prev.value == '{'):
+                    name, callee = self.context(i)
+                    add('object', name, i, pair[i], callee)
+        return out
+
+    def _arrow_start(self, arrow: int) -> int:
+        """箭头函数参数部分的第一个 token 下标。"""
+        p = arrow - 1
+        t = self.tok(p)
+        if t is None:
+            return -1
+        if t.kind == 'punct' and t.value == ')':
+            return self.pair[p]
+        if t.kind == 'ident' and not self.is_(p - 1, 'punct', ':'):
+            return p
+        # 带返回值类型：(a: A): Promise<void> =>
+        q, steps = p, 0
+        while q > 0 and steps < 40:
+            t = self.toks[q]
+            if t.kind == 'punct' and t.value == ':' and self.is_(q - 1, 'punct', ')'):
+                return self.pair[q - 1]
+            if self._is_close(t) and self.pair[q] >= 0:
+                q = self.pair[q] - 1
+            elif t.kind == 'punct' and t.value in (';', '=', '{', '(', '=>'):
+                return -1
+            else:
+                q -= 1
+            steps += 1
+        return -1
+
+
+class SpanIndex:
+    """一个文件版本的全部 span，按起点排序。"""
+
+    def __init__(self, spans: list[Span]):
+        self.spans = spans
+        self._starts = [s.start for s in spans]
+        self._by_name: dict[str, list[int]] = {}
+        for i, s in enumerate(spans):
+            if s.name:
+                self._by_name.setdefault(s.name, []).append(i)
+
+    @classmethod
+    def build(cls, tokens: list[Token]) -> 'SpanIndex':
+        raw = sorted(_Builder(significant(tokens)).spans(), key=lambda s: (s[2], -s[3], s[0] != 'function'))
+        spans: list[Span] = []
+        stack: list[int] = []
+        for kind, name, start, end, first, last, callee in raw:
+            while stack and spans[stack[-1]].end <= start:
+                stack.pop()
+            parent = stack[-1] if stack else -1
+            spans.append(Span(kind, name, start, end, first, last, callee, parent))
+            stack.append(len(spans) - 1)
+        return cls(spans)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[Span]:
+        return iter(self.spans)
+
+    def find(self, name: str, kind: str | None = None) -> list[Span]:
+        return [self.spans[i] for i in self._by_name.get(name, ())
+                if kind is None or self.spans[i].kind == kind]
+
+    def first(self, name: str, kind: str | None = None) -> Span | None:
+        found = self.find(name, kind)
+        return found[0] if found else None
+
+    def names(self, kind: str | None = None) -> list[str]:
+        return sorted(n for n, idx in self._by_name.items()
+                      if kind is None or any(self.spans[i].kind == kind for i in idx))
+
+    def enclosing(self, offset: int, kind: str | None = None) -> Span | None:
+        """包含 offset 的最内层 span（可限定类型）。"""
+        # 起点不超过 offset 的最后一个 span；真正包含 offset 的只可能是它或它的祖先
+        i = bisect_right(self._starts, offset) - 1
+        while i >= 0:
+            span = self.spans[i]
+            if span.start <= offset < span.end and (kind is None or span.kind == kind):
+                return span
+            i = span.parent
+        return None
+
+    def following(self, offset: int) -> Span | None:
+        """起点不早于 offset 的第一个（最外层）span。"""
+        i = bisect_left(self._starts, offset)
+        return self.spans[i] if i < len(self.spans) else None
+
+    def ancestors(self, span: Span) -> Iterator[Span]:
+        while span.parent >= 0:
+            span = self.spans[span.parent]
+            yield span
+
+    def children(self, span: Span) -> list[Span]:
+        """直接子 span。"""
+        i = bisect_left(self._starts, span.start)
+        while self.spans[i] != span:
+            i += 1
+        return [s for s in self.spans[i + 1:bisect_right(self._starts, span.end)] if s.parent == i]
+
+
+_memo = cache.LRU('spans', MEMO_BYTES, lambda index: len(index.spans) * TOKEN_BYTES)
+
+
+def _index(digest: str, tokens: list[Token]) -> SpanIndex:
+    index = _memo.get(digest)
+    if index is None:
+        name = 'spans/v%d-%s.pkl' % (SPANS_VERSION, digest)
+        spans = cache.load(name)
+        if spans is None:
+            index = SpanIndex.build(tokens)
+            cache.save(name, index.spans)
+        else:
+            index = SpanIndex(spans)
+        _memo.put(digest, index)
+    return index
+
+
+def spans_for(data, jsx: bool, digest: str | None = None) -> SpanIndex:
+    """按内容哈希缓存的 span 索引。"""
+    return _index(*tokens_for(data, jsx, digest))
+
+
+def text_spans(text: str, jsx: bool) -> SpanIndex:
+    """已解码文本的 span 索引，偏移是 text 的下标（见 tokenizer.text_tokens）。"""
+    return _index(*text_tokens(text, jsx))
+
+
+def load_spans(path: str | os.PathLike) -> SpanIndex:
+    return cached(path).spans(is_jsx_file(path))
+
+
+def extract(path: str | os.PathLike, name: str, kind: str | None = None) -> str | None:
+    """按名字取出第一个匹配的 span 的源码。"""
+    entry = cached(path)
+    span = entry.spans(is_jsx_file(path)).first(name, kind)
+    if span is None:
+        return None
+    return entry.text[span.start:span.end]
@@ -0,0 +1,655 @@
+"""zustand store 订阅审计：谁在整仓订阅、实际读了哪些字段，以及改成 selector 的 codemod。
+
+`const { tasks, updateTask } = useTaskStore()` 不带 selector，store 里任何字段一变
+（哪怕只是别处的 isLoading），这个组件就重渲染一次；任务越多、改得越频繁，放大得
+越厉害。这里：
+
+1. 读 `src/stores/*.ts` 里的 `export const useXStore = create<State>(...)`，从 State
+   接口 / 类型里分出状态字段和 action（函数类型的字段，引用稳定）；函数体里读 `get()`
+   又不调用 `set()` 的是 getter（如 `getLocations`），引用稳定但返回值跟着状态变，
+   记下它读的状态字段；
+2. 逐个文件（walker 增量缓存）找 `useXStore(...)` 调用：无参数的整仓订阅按用法算出
+   实际读的字段（解构、`store.x` 成员读取、`useXStore().x`），带 selector 的记下
+   selector 读的字段，selector 每次返回新对象 / 新数组（没有 equality 参数）时标为不稳定；
+3. 整仓订阅能改写时生成仓库里已有的写法，一个字段一行：
+   `const tasks = useTaskStore((state) => state.tasks);`
+   渲染时（不在事件处理函数、effect 里）调用的 getter 另外订阅它读的状态字段
+   （`useWorkflowStore((state) => state.locations);`），否则状态变了组件不会重渲染；
+   读了哪些字段看不出来时不改写。
+   输出成可以 `git apply` 的统一 diff，`--write` 时经 Transaction 写回（先存快照）。
+
+    python -m toolkit stores --whole
+    python -m toolkit stores --diff > selectors.patch
+"""
+from __future__ import annotations
+
+import difflib
+import re
+from bisect import bisect_right
+from typing import Iterable, NamedTuple
+
+from toolkit.files import cached
+from toolkit.paths import DEFAULT_ROOTS, REPO_ROOT, SOURCE_EXTS, SRC_DIR, relpath
+from toolkit.spans import SpanIndex, spans_for
+from toolkit.tokenizer import Token, is_jsx_file, significant, tokens_for
+from toolkit.walker import WalkResult, walk
+
+STORES_VERSION = 2
+STORE_DIR = SRC_DIR / 'stores'
+PATCH_ID = 'zustand-selectors'
+HOOK_NAME = re.compile(r'use[A-Z]\w*Store$')
+# selector 里出现这些调用，返回值每次都是新数组
+_FRESH_CALLS = frozenset({'filter', 'map', 'slice', 'sort', 'concat', 'flatMap', 'reverse',
+                          'entries', 'keys', 'values', 'fromEntries'})
+# 回调在渲染期间同步执行的调用：里面调用 getter 等于渲染时调用
+_RENDER_CALLS = frozenset({'map', 'flatMap', 'filter', 'reduce', 'some', 'every', 'find', 'findIndex',
+                           'forEach', 'sort', 'useMemo'})
+
+
+class Store(NamedTuple):
+    hook: str
+    path: str
+    state_type: str | None
+    fields: dict[str, str]        # 字段名 -> 'state' / 'action' / 'getter'
+    getters: dict[str, tuple[str, ...] | None]   # getter -> 它（间接）读的状态字段；看不出来时为 None
+
+    def kind(self, field: str) -> str | None:
+        return self.fields.get(field)
+
+
+class Edit(NamedTuple):
+    start: int
+    end: int
+    text: str
+
+
+class Subscription(NamedTuple):
+    path: str
+    lineno: int
+    hook: str
+    scope: str | None             # 所在的组件 / hook
+    mode: str                     # whole / selector / unstable
+    usage: str                    # destructure / variable / member / selector / other
+    fields: tuple[str, ...]       # 实际读到的字段；整仓订阅且用法不明时为空
+    edits: tuple[Edit, ...]       # 改成 selector 的编辑（原文坐标），不能改写时为空
+    note: str = ''                # 不能改写的原因
+    render_calls: tuple[str, ...] = ()   # 渲染时（不在事件处理函数、effect 里）调用或传出去的字段
+    indent: str = ''              # 声明所在行的缩进，补充订阅时用
+
+    @property
+    def rewritable(self) -> bool:
+        return bool(self.edits)
+
+
+# ---------------------------------------------------------------------------
+# store 定义
+
+def _pairs(toks: list[Token]) -> list[int]:
+    pair = [-1] * len(toks)
+    stack: list[int] = []
+    for i, t in enumerate(toks):
+        if t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${'):
+            stack.append(i)
+        elif t.kind in ('punct', 'jsx_brace') and t.value in (')', ']', '}') and stack:
+            j = stack.pop()
+            pair[i], pair[j] = j, i
+    return pair
+
+
+def _is(toks: list[Token], i: int, kind: str, *values: str) -> bool:
+    if not 0 <= i < len(toks):
+        return False
+    t = toks[i]
+    return t.kind == kind and (not values or t.value in values)
+
+
+def _type_fields(text: str, toks: list[Token], pair: list[int], open_: int) -> dict[str, str]:
+    """`{ ... }` 类型体里的字段：函数类型（方法签名或顶层有 `=>`）记为 action。"""
+    fields: dict[str, str] = {}
+    close = pair[open_]
+    i = open_ + 1
+    while 0 < i < close:
+        t = toks[i]
+        new_line = '\n' in text[toks[i - 1].end:t.start]
+        starts = _is(toks, i - 1, 'punct', '{', ';', ',') or new_line
+        if t.kind == 'ident' and starts and (_is(toks, i + 1, 'punct', ':', '?', '(', '?.')):
+            j = i + 1
+            if _is(toks, j, 'punct', '?', '?.'):
+                j += 1
+            if _is(toks, j, 'punct', '('):
+                fields[t.value] = 'action'
+                i = pair[j] + 1 if pair[j] > j else j + 1
+                continue
+            kind = 'state'
+            k = j + 1
+            while k < close:
+                u = toks[k]
+                if u.kind == 'punct' and u.value in ('(', '[', '{') and pair[k] > k:
+                    k = pair[k] + 1
+                    if _is(toks, k, 'punct', '=>'):
+                        kind = 'action'
+                    continue
+                if u.kind == 'punct' and u.value in (';', ','):
+                    break
+                if u.kind == 'punct' and u.value == '=>':
+                    kind = 'action'
+                if '\n' in text[toks[k - 1].end:u.start] and u.kind == 'ident' \
+                        and _is(toks, k + 1, 'punct', ':', '?', '(', '?.') and not _is(toks, k - 1, 'punct', '|', '&', '=>', ':'):
+                    break
+                k += 1
+            fields.setdefault(t.value, kind)
+            i = k
+            continue
+        i += 1
+    return fields
+
+
+def _declared_fields(rel: str, name: str, depth: int = 0) -> dict[str, str] | None:
+    """rel 里 interface / type name 的字段；是从别的模块 import 进来的就跟过去（如 @/types/sop）。"""
+    entry = cached(rel)
+    text, toks = entry.text, significant(entry.tokens(False))
+    pair = _pairs(toks)
+    for j, u in enumerate(toks):
+        if u.kind == 'ident' and u.value == name and _is(toks, j - 1, 'ident', 'interface', 'type'):
+            k = j + 1
+            while k < len(toks) and not _is(toks, k, 'punct', '{', ';'):
+                k += 1
+            if _is(toks, k, 'punct', '{') and pair[k] > k:
+                return _type_fields(text, toks, pair, k)
+            return None
+    if depth >= 3:
+        return None
+    for j, u in enumerate(toks):
+        if not (u.kind == 'ident' and u.value == name and _is(toks, j - 1, 'punct', '{', ',')):
+            continue
+        k = j
+        while k < len(toks) and not _is(toks, k, 'ident', 'from') and not _is(toks, k, 'punct', ';'):
+            k += 1
+        if not (_is(toks, k, 'ident', 'from') and _is(toks, k + 1, 'string')):
+            continue
+        target = _module_file(rel, toks[k + 1].value.strip('\'"'))
+        if target is not None:
+            return _declared_fields(target, name, depth + 1)
+    return None
+
+
+def _module_file(rel: str, spec: str) -> str | None:
+    if spec.startswith('@/'):
+        base = SRC_DIR / spec[2:]
+    elif spec.startswith('.'):
+        base = (REPO_ROOT / rel).parent / spec
+    else:
+        return None
+    for candidate in (base.with_name(base.name + '.ts'), base.with_name(base.name + '.tsx'),
+                      base / 'index.ts', base):
+        if candidate.is_file():
+            return relpath(candidate.resolve())
+    return None
+
+
+def _store_body(toks: list[Token], pair: list[int], i: int) -> tuple[int, str, str] | None:
+    """useXStore = create(...) 里 `(set, get) => ({ ... })`：(对象 `{` 的下标, set 参数名, get 参数名)。"""
+    for k in range(i, len(toks) - 6):
+        if k > i and _is(toks, k, 'ident') and HOOK_NAME.match(toks[k].value) and _is(toks, k - 1, 'ident', 'const'):
+            return None         # 到了下一个 store 还没找到
+        if _is(toks, k, 'punct', '(') and _is(toks, k + 1, 'ident') and _is(toks, k + 2, 'punct', ',') \
+                and _is(toks, k + 3, 'ident') and pair[k] > k and _is(toks, pair[k] + 1, 'punct', '=>'):
+            body = pair[k] + 2
+            if _is(toks, body, 'punct', '(') and _is(toks, body + 1, 'punct', '{') and pair[body + 1] > body + 1:
+                return body + 1, toks[k + 1].value, toks[k + 3].value
+            return None
+    return None
+
+
+def _getter_reads(toks: list[Token], pair: list[int], a: int, b: int, set_: str, get: str) -> tuple[str, ...] | None:
+    """属性值 toks[a:b] 里经 `get()` 读的字段；调用了 set() 的不是 getter，返回 ()；用法看不懂时返回 None。"""
+    reads: list[str] = []
+    aliases: set[str] = set()
+    unknown = False
+    called = False
+    for k in range(a, b):
+        t = toks[k]
+        if t.kind != 'ident' or _is(toks, k - 1, 'punct', '.', '?.'):
+            continue
+        if t.value == set_ and _is(toks, k + 1, 'punct', '('):
+            return ()
+        if t.value == get and _is(toks, k + 1, 'punct', '(') and _is(toks, k + 2, 'punct', ')'):
+            called = True
+            if _is(toks, k + 3, 'punct', '.', '?.') and _is(toks, k + 4, 'ident'):
+                reads.append(toks[k + 4].value)                 # get().x
+            elif _is(toks, k - 1, 'punct', '=') and _is(toks, k - 2, 'ident') \
+                    and _is(toks, k - 3, 'ident', 'const', 'let', 'var'):
+                aliases.add(toks[k - 2].value)                  # const state = get();
+            elif _is(toks, k - 1, 'punct', '=') and _is(toks, k - 2, 'punct', '}') and pair[k - 2] >= 0:
+                for j in range(pair[k - 2] + 1, k - 2):         # const { a, b: c } = get();
+                    if _is(toks, j, 'ident') and _is(toks, j - 1, 'punct', '{', ','):
+                        reads.append(toks[j].value)
+            else:
+                unknown = True
+        elif t.value in aliases and not _is(toks, k - 1, 'ident', 'const', 'let', 'var'):
+            if _is(toks, k + 1, 'punct', '.', '?.') and _is(toks, k + 2, 'ident'):
+                reads.append(toks[k + 2].value)
+            else:
+                unknown = True
+        elif t.value == get:
+            unknown = True                                      # get 被传出去
+    if not called and not unknown:
+        return ()
+    return None if unknown else tuple(dict.fromkeys(reads))
+
+
+def _getters(toks: list[Token], pair: list[int], i: int, fields: dict[str, str]) -> dict[str, tuple[str, ...] | None]:
+    """函数字段里读 get() 又不 set() 的 getter -> 它直接读的字段。"""
+    found = _store_body(toks, pair, i)
+    if found is None:
+        return {}
+    open_, set_, get = found
+    close = pair[open_]
+    getters: dict[str, tuple[str, ...] | None] = {}
+    k = open_ + 1
+    while k < close:
+        # 属性：key: value 或 key(...) { ... }
+        start = k
+        end = k
+        while end < close and not _is(toks, end, 'punct', ','):
+            if toks[end].kind == 'punct' and toks[end].value in ('(', '[', '{', '${') and pair[end] > end:
+                end = pair[end]
+            end += 1
+        name = toks[start].value if _is(toks, start, 'ident') else None
+        if name is not None and fields.get(name) == 'action':
+            reads = _getter_reads(toks, pair, start + 1, end, set_, get)
+            if reads != ():
+                getters[name] = reads
+        k = end + 1
+    return getters
+
+
+def _resolve_getters(fields: dict[str, str], direct: dict[str, tuple[str, ...] | None]) -> dict[str, tuple[str, ...] | None]:
+    """getter 读的字段展开到状态字段：`get().getTasksByDate()` 换成 getTasksByDate 读的字段。
+
+    经 get() 调用了别的 action（会 set 的）的不是 getter，去掉。
+    """
+    direct = dict(direct)
+    changed = True
+    while changed:
+        changed = False
+        for name, reads in list(direct.items()):
+            if reads and any(fields.get(f) == 'action' and f not in direct for f in reads):
+                del direct[name]
+                changed = True
+    resolved: dict[str, tuple[str, ...] | None] = {}
+
+    def visit(name: str, seen: frozenset) -> tuple[str, ...] | None:
+        if name in resolved:
+            return resolved[name]
+        reads = direct[name]
+        if reads is None:
+            return None
+        out: list[str] = []
+        for field in reads:
+            if fields.get(field) == 'state':
+                out.append(field)
+            elif field in direct and field not in seen:
+                deps = visit(field, seen | {field})
+                if deps is None:
+                    return None
+                out.extend(deps)
+        return tuple(dict.fromkeys(out))
+
+    for name in direct:
+        resolved[name] = visit(name, frozenset({name}))
+    return resolved
+
+
+def _store_from(rel: str) -> list[Store]:
+    toks = significant(cached(rel).tokens(False))
+    pair = _pairs(toks)
+    stores = []
+    for i, t in enumerate(toks):
+        if not (t.kind == 'ident' and HOOK_NAME.match(t.value) and _is(toks, i - 1, 'ident', 'const')
+                and _is(toks, i + 1, 'punct', '=') and _is(toks, i + 2, 'ident', 'create')):
+            continue
+        state_type = toks[i + 4].value if _is(toks, i + 3, 'punct', '<') and _is(toks, i + 4, 'ident') else None
+        fields = (_declared_fields(rel, state_type) if state_type else None) or {}
+        getters = _resolve_getters(fields, _getters(toks, pair, i, fields))
+        fields = {name: 'getter' if name in getters else kind for name, kind in fields.items()}
+        stores.append(Store(t.value, rel, state_type, fields, getters))
+    return stores
+
+
+def find_stores(store_dir=STORE_DIR) -> dict[str, Store]:
+    """hook 名 -> Store。"""
+    stores: dict[str, Store] = {}
+    for path in sorted(store_dir.glob('*.ts')):
+        for store in _store_from(relpath(path)):
+            stores[store.hook] = store
+    return stores
+
+
+# ---------------------------------------------------------------------------
+# 订阅
+
+class _FileScan:
+    def __init__(self, rel: str, text: str, toks: list[Token], index: SpanIndex):
+        self.rel = rel
+        self.text = text
+        self.toks = toks
+        self.index = index
+        self.pair = _pairs(toks)
+        self.newlines = [m.start() for m in re.finditer('\n', text)]
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        return _is(self.toks, i, kind, *values)
+
+    def lineno(self, offset: int) -> int:
+        return bisect_right(self.newlines, offset - 1) + 1
+
+    def scope(self, offset: int):
+        """所在的最内层函数 span，以及往外第一个有名字、不是回调参数的函数名。"""
+        span = self.index.enclosing(offset)
+        inner = name = None
+        while span is not None:
+            if span.kind in ('function', 'arrow'):
+                inner = inner or span
+                if span.name and span.callee is None and name is None:
+                    name = span.name
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return inner, name
+
+    def deferred(self, offset: int, owner) -> bool:
+        """offset 处的代码不在渲染时执行：它和 owner（订阅所在的函数）之间隔着事件处理函数、
+        effect 之类的函数（.map / useMemo 这类同步执行的回调除外）。"""
+        span = self.index.enclosing(offset)
+        while span is not None and span != owner:
+            if span.kind in ('function', 'arrow') and span.callee not in _RENDER_CALLS:
+                return True
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return False
+
+    def render_uses(self, names: dict[str, str], start: int, owner) -> tuple[str, ...]:
+        """start 之后、owner 之内渲染时调用或整体传出去的本地名 -> 字段（`x.y` 这种成员读取不算）。"""
+        last = owner.last if owner is not None else len(self.toks) - 1
+        found: list[str] = []
+        for k in range(start, last + 1):
+            t = self.toks[k]
+            if t.kind != 'ident' or t.value not in names or names[t.value] in found \
+                    or self.is_(k - 1, 'punct', '.', '?.') or self.is_(k + 1, 'punct', '.', '?.'):
+                continue
+            if not self.deferred(t.start, owner):
+                found.append(names[t.value])
+        return tuple(found)
+
+    def indent(self, i: int) -> str | None:
+        """token i 所在行的缩进；它前面还有别的代码时为 None。"""
+        line_start = self.text.rfind('\n', 0, self.toks[i].start) + 1
+        prefix = self.text[line_start:self.toks[i].start]
+        return prefix if not prefix.strip() else None
+
+    def run(self) -> list[Subscription]:
+        found = []
+        for i, t in enumerate(self.toks):
+            if t.kind == 'ident' and HOOK_NAME.match(t.value) and self.is_(i + 1, 'punct', '(') \
+                    and not self.is_(i - 1, 'punct', '.', '?.') and not self.is_(i - 1, 'ident', 'function'):
+                found.append(self.subscription(i))
+        return found
+
+    def subscription(self, i: int) -> Subscription:
+        toks, pair = self.toks, self.pair
+        hook = toks[i].value
+        close = pair[i + 1]
+        _span, scope = self.scope(toks[i].start)
+        base = (self.rel, self.lineno(toks[i].start), hook, scope)
+        if close < 0:
+            return Subscription(*base, 'whole', 'other', (), (), '括号不配对')
+        if close > i + 2:
+            return self.selector(i, close, base)
+        hook_call = f'{hook}((state) => state.%s)'
+
+        # useXStore().field
+        if self.is_(close + 1, 'punct', '.', '?.') and self.is_(close + 2, 'ident'):
+            field = toks[close + 2].value
+            edit = Edit(toks[i].start, toks[close + 2].end, hook_call % field)
+            return Subscription(*base, 'whole', 'member', (field,), (edit,), render_calls=(field,))
+
+        decl_end = close + 1 if self.is_(close + 1, 'punct', ';') else close
+        semicolon = ';' if decl_end > close else ''
+
+        # const { a, b: c } = useXStore();
+        if self.is_(i - 1, 'punct', '=') and self.is_(i - 2, 'punct', '}') and pair[i - 2] >= 0:
+            opener = pair[i - 2]
+            keyword = opener - 1
+            if not self.is_(keyword, 'ident', 'const', 'let', 'var'):
+                return Subscription(*base, 'whole', 'destructure', (), (), '不是变量声明')
+            items, problem = self.destructured(opener + 1, i - 2)
+            fields = tuple(field for field, _local in items)
+            indent = self.indent(keyword)
+            if problem or indent is None:
+                return Subscription(*base, 'whole', 'destructure', fields, (),
+                                    problem or '声明前面还有别的代码')
+            word = toks[keyword].value
+            lines = [f'{word} {local} = {hook_call % field}{semicolon}' for field, local in items]
+            edit = Edit(toks[keyword].start, toks[decl_end].end, ('\n' + indent).join(lines))
+            owner, _scope = self.scope(toks[i].start)
+            calls = self.render_uses({local: field for field, local in items}, decl_end + 1, owner)
+            return Subscription(*base, 'whole', 'destructure', fields, (edit,), '', calls, indent)
+
+        # const store = useXStore();
+        if self.is_(i - 1, 'punct', '=') and self.is_(i - 2, 'ident') \
+                and self.is_(i - 3, 'ident', 'const', 'let', 'var'):
+            return self.variable(i, i - 3, decl_end, semicolon, base)
+
+        return Subscription(*base, 'whole', 'other', (), (), '返回值没有直接解构或赋给变量')
+
+    def destructured(self, a: int, b: int) -> tuple[list[tuple[str, str]], str]:
+        """`{ a, b: c }` 的 (字段, 本地名)；有默认值、剩余参数、嵌套解构时给出原因。"""
+        items: list[tuple[str, str]] = []
+        toks = self.toks
+        k = a
+        while k < b:
+            if self.is_(k, 'punct', '...'):
+                return items, '有 ...rest，读到的字段不确定'
+            if not self.is_(k, 'ident'):
+                return items, f'无法解析的解构写法 {toks[k].value!r}'
+            field = local = toks[k].value
+            k += 1
+            if self.is_(k, 'punct', ':'):
+                if not self.is_(k + 1, 'ident'):
+                    items.append((field, field))
+                    return items, '嵌套解构'
+                local = toks[k + 1].value
+                k += 2
+            items.append((field, local))
+            if self.is_(k, 'punct', '='):
+                return items, f'{field} 有默认值'
+            if self.is_(k, 'punct', ','):
+                k += 1
+            elif k < b:
+                return items, f'无法解析的解构写法 {toks[k].value!r}'
+        return items, ''
+
+    def variable(self, i: int, keyword: int, decl_end: int, semicolon: str, base: tuple) -> Subscription:
+        toks = self.toks
+        name = toks[keyword + 1].value
+        hook = toks[i].value
+        span, _scope = self.scope(toks[i].start)
+        last = span.last if span is not None else len(toks) - 1
+        start = decl_end + 1
+        fields: list[str] = []
+        reads: list[tuple[int, str]] = []
+        locals_: set[str] = set()
+        problem = ''
+        for k in range(start, last + 1):
+            t = toks[k]
+            if t.kind != 'ident' or self.is_(k - 1, 'punct', '.', '?.'):
+                continue
+            if t.value == name:
+                if self.is_(k + 1, 'punct', '.') and self.is_(k + 2, 'ident') \
+                        and not self.is_(k + 3, 'punct', '=') and not self.is_(k - 1, 'punct', '...'):
+                    field = toks[k + 2].value
+                    if field not in fields:
+                        fields.append(field)
+                    reads.append((k, field))
+                else:
+                    problem = problem or f'{name} 被整体使用（第 {self.lineno(t.start)} 行）'
+            else:
+                locals_.add(t.value)
+        if not problem:
+            clash = [f for f in fields if f in locals_]
+            if clash:
+                problem = f'字段名与作用域里的名字冲突：{", ".join(clash)}'
+        indent = self.indent(keyword)
+        if not problem and indent is None:
+            problem = '声明前面还有别的代码'
+        if not fields and not problem:
+            problem = f'{name} 没有被读取'
+        if problem:
+            return Subscription(*base, 'whole', 'variable', tuple(fields), (), problem)
+        word = toks[keyword].value
+        lines = [f'{word} {field} = {hook}((state) => state.{field}){semicolon}' for field in fields]
+        edits = [Edit(toks[keyword].start, toks[decl_end].end, ('\n' + indent).join(lines))]
+        edits.extend(Edit(toks[k].start, toks[k + 2].end, field) for k, field in reads)
+        calls = tuple(dict.fromkeys(field for k, field in reads
+                                    if not self.is_(k + 3, 'punct', '.', '?.') and not self.deferred(toks[k].start, span)))
+        return Subscription(*base, 'whole', 'variable', tuple(fields), tuple(edits), '', calls, indent)
+
+    def selector(self, i: int, close: int, base: tuple) -> Subscription:
+        toks, pair = self.toks, self.pair
+        # 第一个参数的范围；后面还有参数（equality 函数）时不算不稳定
+        k, end = i + 2, close
+        while k < close:
+            if toks[k].kind == 'punct' and toks[k].value in ('(', '[', '{') and pair[k] > k:
+                k = pair[k] + 1
+                continue
+            if self.is_(k, 'punct', ','):
+                end = k
+                break
+            k += 1
+        equality = end < close
+        a = i + 2
+        shallow = self.is_(a, 'ident', 'useShallow') and self.is_(a + 1, 'punct', '(')
+        if shallow:
+            a += 2
+        param = None
+        if self.is_(a, 'punct', '(') and self.is_(a + 1, 'ident') and self.is_(a + 2, 'punct', ')', ':'):
+            param = toks[a + 1].value
+        elif self.is_(a, 'ident') and self.is_(a + 1, 'punct', '=>'):
+            param = toks[a].value
+        fields: list[str] = []
+        arrow = a
+        while arrow < end and not self.is_(arrow, 'punct', '=>'):
+            arrow += 1
+        if param is None and self.is_(a, 'punct', '(') and self.is_(a + 1, 'punct', '{'):
+            # ({ tasks }) => tasks
+            for k in range(a + 2, pair[a + 1]):
+                if self.is_(k, 'ident') and not self.is_(k - 1, 'punct', ':'):
+                    fields.append(toks[k].value)
+        for k in range(arrow + 1, end):
+            if param and self.is_(k, 'ident', param) and self.is_(k + 1, 'punct', '.', '?.') \
+                    and self.is_(k + 2, 'ident') and toks[k + 2].value not in fields:
+                fields.append(toks[k + 2].value)
+        body = arrow + 1
+        if self.is_(body, 'punct', '(') and self.is_(body + 1, 'punct', '{'):
+            body += 1
+        fresh = self.is_(body, 'punct', '{', '[') and not self.is_(arrow + 1, 'punct', '{') \
+            or self.is_(arrow + 1, 'punct', '(') and self.is_(arrow + 2, 'punct', '{')
+        fresh = fresh or any(self.is_(k, 'ident', *_FRESH_CALLS) and self.is_(k - 1, 'punct', '.', '?.')
+                             and self.is_(k + 1, 'punct', '(') for k in range(arrow + 1, end))
+        mode = 'unstable' if fresh and not equality and not shallow else 'selector'
+        note = 'selector 每次返回新对象 / 数组，任何改动都会重渲染' if mode == 'unstable' else ''
+        return Subscription(*base, mode, 'selector', tuple(fields), (), note)
+
+
+def file_subscriptions(rel: str, text: str) -> list[Subscription]:
+    """walker 任务：一个文件里的全部 store 订阅。"""
+    data = text.encode('utf-8')
+    jsx = is_jsx_file(rel)
+    _digest, tokens = tokens_for(data, jsx)
+    return _FileScan(rel, text, significant(tokens), spans_for(data, jsx)).run()
+
+
+def run(roots: Iterable[str] = DEFAULT_ROOTS, paths: Iterable[str] | None = None,
+        workers: int | None = None) -> WalkResult:
+    """results 为 {相对路径: [Subscription]}。"""
+    return walk(file_subscriptions, 'stores:v%d' % STORES_VERSION, tuple(roots), SOURCE_EXTS,
+                paths=paths, workers=workers)
+
+
+def with_getters(sub: Subscription, store: Store) -> Subscription:
+    """渲染时调用了 getter 的整仓订阅：补订阅 getter 读的状态字段，看不出来时不改写。
+
+    getter 本身引用稳定，只选 getter 的话状态变了组件不会重渲染（`getLocations().map(...)` 一直是旧的）。
+    """
+    getters = [f for f in sub.render_calls if store.kind(f) == 'getter']
+    if not getters or not sub.rewritable:
+        return sub
+    deps: list[str] = []
+    for getter in getters:
+        reads = store.getters[getter]
+        if reads is None:
+            return sub._replace(edits=(), note=f'渲染时调用的 {getter}() 读了哪些字段看不出来')
+        deps.extend(reads)
+    if sub.usage == 'member':
+        return sub._replace(edits=(), note=f'渲染时调用 {getters[0]}()，只选它状态变了不会重渲染')
+    deps = [d for d in dict.fromkeys(deps) if d not in sub.fields]
+    if not deps:
+        return sub
+    them = '它' if len(getters) == 1 else '它们'
+    lines = [f'// 渲染时调用 {"、".join(g + "()" for g in getters)}，另外订阅{them}读的字段']
+    lines.extend(f'{sub.hook}((state) => state.{dep});' for dep in deps)
+    first = sub.edits[0]
+    text = first.text + ''.join('\n' + sub.indent + line for line in lines)
+    return sub._replace(edits=(first._replace(text=text),) + sub.edits[1:])
+
+
+def subscriptions(result: WalkResult, stores: dict[str, Store]) -> list[Subscription]:
+    """只保留 stores 里定义的 hook 的订阅，按路径、行号排序；渲染时调用 getter 的按 with_getters 处理。"""
+    return sorted((with_getters(s, stores[s.hook]) for subs in result.results.values() for s in subs
+                   if s.hook in stores),
+                  key=lambda s: (s.path, s.lineno))
+
+
+# ---------------------------------------------------------------------------
+# codemod
+
+def apply_edits(text: str, edits: Iterable[Edit]) -> str:
+    out, pos = [], 0
+    for edit in sorted(edits):
+        out.append(text[pos:edit.start])
+        out.append(edit.text)
+        pos = edit.end
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def _by_path(subs: Iterable[Subscription]) -> dict[str, list[Edit]]:
+    edits: dict[str, list[Edit]] = {}
+    for sub in subs:
+        if sub.rewritable:
+            edits.setdefault(sub.path, []).extend(sub.edits)
+    return edits
+
+
+def diff(subs: Iterable[Subscription]) -> str:
+    """整仓订阅改成 selector 的统一 diff（a/ b/ 前缀，可以直接 git apply）。"""
+    chunks = []
+    for rel, edits in sorted(_by_path(subs).items()):
+        before = cached(rel).text
+        after = apply_edits(before, edits)
+        chunks.extend(difflib.unified_diff(before.splitlines(keepends=True), after.splitlines(keepends=True),
+                                           f'a/{rel}', f'b/{rel}'))
+    return ''.join(chunks)
+
+
+def write(subs: Iterable[Subscription]) -> list[str]:
+    """经 Transaction 写回（先给每个文件存快照，补丁 ID 为 PATCH_ID），返回改过的文件。"""
+    from toolkit import backup
+    from toolkit.edits import Transaction
+    written = []
+    for rel, edits in sorted(_by_path(subs).items()):
+        tx = Transaction(rel)
+        for edit in edits:
+            tx.replace(edit.start, edit.end, edit.text)
+        backup.snapshot(rel, PATCH_ID)
+        if tx.commit():
+            written.append(rel)
+    return written
@@ -0,0 +1,145 @@
+"""分块流式改写：内存占用与文件大小无关。
+
+fix_final.py 一类脚本整份读入、解码、多次 `.replace`、再整份写回，同时持有好几份
+全文。这里按固定大小的块处理，每一级只多留一小段「尾巴」跨块传递：
+
+1. 乱码修复（可选）：块尾的非 ASCII 字节段留到下一块，保证 `mojibake.scan`
+   看到的都是完整的字节段；
+2. 增量 UTF-8 解码：被切开的多字节序列由解码器自己留到下一块，坏字节按
+   surrogateescape 原样保留；
+3. 批量替换（`aho.Replacer`）：只确认起点离缓冲区末尾至少「最长关键字」远的匹配，
+   其余留到下一块，结果与整份替换完全一致；
+4. 编码后写进同目录临时文件，结束时原子 rename；内容没变时丢弃临时文件。
+
+    result = rewrite(path, replacer=Replacer(table), repair=True)
+"""
+from __future__ import annotations
+
+import codecs
+import os
+from typing import Iterator, NamedTuple
+
+from toolkit.aho import Replacer
+from toolkit.files import Discard, atomic_writer
+from toolkit.mojibake import MIN_CONFIDENCE, Finding, repair_bytes, scan
+from toolkit.paths import relpath, resolve
+
+CHUNK_SIZE = 1 << 16
+# 单个非 ASCII 字节段超过这个长度就不再等它结束，直接按现有部分处理
+MAX_CARRY = 1 << 20
+
+
+class StreamResult(NamedTuple):
+    path: str
+    bytes_in: int
+    bytes_out: int
+    hits: dict[str, int]        # Replacer 每个关键字的命中次数
+    repaired: list[Finding]     # 乱码修复（偏移、行号都是相对整个文件的）
+    changed: bool
+
+
+def _read_chunks(path, chunk_size: int) -> Iterator[bytes]:
+    with open(resolve(path), 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _repair_stage(chunks: Iterator[bytes], repaired: list[Finding],
+                  min_confidence: float) -> Iterator[bytes]:
+    """逐块修复乱码；块尾未结束的非 ASCII 字节段留给下一块。"""
+    carry = b''
+    offset = 0      # carry 在原文件中的字节偏移
+    lines = 0       # carry 之前的换行数
+    for chunk in chunks:
+        data = carry + chunk
+        cut = len(data)
+        while cut and data[cut - 1] >= 0x80 and len(data) - cut < MAX_CARRY:
+            cut -= 1
+        head, carry = data[:cut], data[cut:]
+        if head:
+            yield _repair_block(head, offset, lines, repaired, min_confidence)
+            offset += len(head)
+            lines += head.count(b'\n')
+    if carry:
+        yield _repair_block(carry, offset, lines, repaired, min_confidence)
+
+
+def _repair_block(block: bytes, offset: int, lines: int, repaired: list[Finding],
+                  min_confidence: float) -> bytes:
+    new, applied = repair_bytes(block, scan(block), min_confidence)
+    repaired.extend(f._replace(start=f.start + offset, end=f.end + offset, lineno=f.lineno + lines)
+                    for f in applied)
+    return new
+
+
+def _decode_stage(chunks: Iterator[bytes], encoding: str) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)(errors='surrogateescape')
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _replace_stage(texts: Iterator[str], replacer: Replacer, hits: dict[str, int]) -> Iterator[str]:
+    """跨块的最左最长替换：起点 < len(buf) - 最长关键字 + 1 的匹配已经不会再变长。"""
+    longest = replacer.automaton.longest
+    table = replacer.table
+    reach = max(map(len, table)) - 1
+    buf = ''
+    for text in texts:
+        buf += text
+        safe = max(len(buf) - reach, 0)
+        out = []
+        pos = 0
+        for m in longest.finditer(buf):
+            if m.start() >= safe:
+                break
+            out.append(buf[pos:m.start()])
+            out.append(table[m.group()])
+            hits[m.group()] = hits.get(m.group(), 0) + 1
+            pos = m.end()
+        cut = max(pos, safe)
+        out.append(buf[pos:cut])
+        buf = buf[cut:]
+        yield ''.join(out)
+    if buf:
+        new, tail_hits = replacer.subn(buf)
+        for key, count in tail_hits.items():
+            hits[key] = hits.get(key, 0) + count
+        yield new
+
+
+def rewrite(path: str | os.PathLike, replacer: Replacer | None = None, repair: bool = False,
+            min_confidence: float = MIN_CONFIDENCE, chunk_size: int = CHUNK_SIZE,
+            encoding: str = 'utf-8', dry_run: bool = False) -> StreamResult:
+    """流式改写一个文件；没有任何替换或修复时不动原文件。"""
+    hits: dict[str, int] = {}
+    repaired: list[Finding] = []
+    counted = [0, 0]
+
+    def counting(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            counted[0] += len(chunk)
+            yield chunk
+
+    chunks = counting(_read_chunks(path, chunk_size))
+    if repair:
+        chunks = _repair_stage(chunks, repaired, min_confidence)
+    if replacer is not None and replacer.table:
+        texts = _replace_stage(_decode_stage(chunks, encoding), replacer, hits)
+        chunks = (text.encode(encoding, errors='surrogateescape') for text in texts)
+
+    with atomic_writer(path) as out:
+        for chunk in chunks:
+            counted[1] += len(chunk)
+            out.write(chunk)
+        if dry_run or not (hits or repaired):
+            raise Discard
+    return StreamResult(relpath(resolve(path)), counted[0], counted[1], hits, repaired,
+                        bool(hits or repaired) and not dry_run)
@@ -0,0 +1,235 @@
+"""改写后的结构检查：只重新分词改动所在的函数 / JSX 元素，几毫秒内发现括号、标签没配平。
+
+quick_fix.py 这类按行号覆盖的脚本一旦把某行写坏（fix_syntax.py 就是专门修第 1964 行的），
+要等 Vite 报错才知道。这里在写文件之前检查：
+
+1. 旧文本的 span 索引按内容哈希缓存（spans_for），每处编辑找到严格包住它的最内层
+   函数 / 箭头函数 / JSX 元素 / 对象字面量，重叠的区域合并；
+2. 旧版本直接用缓存的 token，只对新版本的这些区域重新分词，检查括号（含 `${`、JSX 表达式容器）、JSX 开闭标签、
+   字符串、模板字符串、块注释是否闭合；
+3. 旧区域本来是好的、新区域出了问题才算改坏（分词器看不懂的老写法不会误报）。
+
+Transaction / PieceTable 提交时自动调用，改坏时抛 StructureError，文件不动。
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterable, NamedTuple
+
+from toolkit.spans import text_spans
+from toolkit.tokenizer import Token, text_tokens, tokenize
+
+CHECKED_EXTS = ('.ts', '.tsx', '.js', '.jsx', '.mjs')
+
+_CLOSING = {')': '(', ']': '[', '}': '{'}
+_SINGLE = re.compile(r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"", re.S)
+
+
+class Problem(NamedTuple):
+    offset: int          # 字符偏移（新文本中）
+    message: str
+
+
+class StructureError(ValueError):
+    def __init__(self, path: str, text: str, problems: list[Problem]):
+        self.path = path
+        self.problems = problems
+        lines = [f'{path}:{text.count(chr(10), 0, p.offset) + 1}: {p.message}' for p in problems[:5]]
+        more = f'\n……共 {len(problems)} 处' if len(problems) > 5 else ''
+        super().__init__('改写后结构不完整，放弃写入：\n' + '\n'.join(lines) + more)
+
+
+def _escaped(text: str, end: int) -> bool:
+    """text[end] 前面是奇数个反斜杠。"""
+    count = 0
+    while end - count - 1 >= 0 and text[end - count - 1] == '\\':
+        count += 1
+    return count % 2 == 1
+
+
+def _describe(top: str) -> str:
+    return '标签 ' + top if top.startswith('<') else repr(top)
+
+
+def check_tokens(tokens: Iterable[Token]) -> list[Problem]:
+    """括号、JSX 标签、字符串、模板字符串、块注释的配平检查。"""
+    problems: list[Problem] = []
+    # (开符号或 '<标签名', 偏移, 进入 JSX 表达式容器前正在读的标签)
+    stack: list[tuple[str, int, list | None]] = []
+    tag: list | None = None               # 正在读的标签：[是否闭合标签, 名字, 偏移]
+    after_template = False                # 上一个 `}` 关掉的是 `${`
+    want_interp: int | None = None        # 没闭合的模板片段后面必须紧跟 `${`
+
+    def close(value: str, at: int) -> None:
+        nonlocal tag, after_template
+        opener = _CLOSING[value]
+        matches = lambda top: top == opener or (value == '}' and top == '${')
+        if not stack:
+            problems.append(Problem(at, f'多余的 {value!r}'))
+            return
+        if not matches(stack[-1][0]):
+            problems.append(Problem(at, f'{value!r} 与偏移 {stack[-1][1]} 的 {_describe(stack[-1][0])} 不配对'))
+            # 跳过中间没闭合的那些，避免一处错误引出一串报错
+            while stack and not matches(stack[-1][0]):
+                stack.pop()
+            if not stack:
+                return
+        top, _at, saved = stack.pop()
+        after_template = top == '${'
+        if saved is not None:
+            tag = saved
+
+    for tok in tokens:
+        kind, value = tok.kind, tok.value
+        if kind == 'comment':
+            if value.startswith('/*') and (len(value) < 4 or not value.endswith('*/')):
+                problems.append(Problem(tok.start, '块注释没有闭合'))
+            continue
+        if want_interp is not None and not (kind == 'punct' and value == '${'):
+            problems.append(Problem(want_interp, '模板字符串没有闭合'))
+        want_interp = None
+        continuing, after_template = after_template, False
+
+        if kind == 'string':
+            quote = value[0]
+            if len(value) < 2 or value[-1] != quote or (tag is None and not _SINGLE.fullmatch(value)):
+                problems.append(Problem(tok.start, '字符串没有闭合'))
+        elif kind == 'template':
+            body = value if continuing else value[1:]
+            if not (body.endswith('`') and not _escaped(body, len(body) - 1)):
+                want_interp = tok.start
+        elif kind == 'punct' and value in ('(', '[', '{', '${'):
+            stack.append((value, tok.start, None))
+        elif kind == 'jsx_brace' and value == '{':
+            stack.append(('{', tok.start, tag))
+            tag = None
+        elif (kind == 'punct' and value in _CLOSING) or (kind == 'jsx_brace' and value == '}'):
+            close(value, tok.start)
+        elif kind == 'jsx_open':
+            tag = [value == '</', '', tok.start]
+        elif kind == 'jsx_name' and tag is not None:
+            tag[1] = value
+        elif kind == 'jsx_end' and tag is not None:
+            closing, name, at = tag
+            tag = None
+            if value == '/>':
+                continue
+            if not closing:
+                stack.append(('<' + name, at, None))
+            elif stack and stack[-1][0] == '<' + name:
+                stack.pop()
+            else:
+                top = stack[-1][0] if stack else '（无）'
+                problems.append(Problem(at, f'闭合标签 </{name}> 与 {_describe(top)} 不配对'))
+                if any(entry[0] == '<' + name for entry in stack):
+                    while stack[-1][0] != '<' + name:
+                        stack.pop()
+                    stack.pop()
+        elif kind == 'jsx_text' and '}' in value:
+            problems.append(Problem(tok.start + value.index('}'), 'JSX 文本里出现了 `}`'))
+
+    if want_interp is not None:
+        problems.append(Problem(want_interp, '模板字符串没有闭合'))
+    if tag is not None:
+        problems.append(Problem(tag[2], 'JSX 标签没有写完'))
+    for top, at, _saved in reversed(stack):
+        problems.append(Problem(at, f'{_describe(top)} 没有闭合'))
+    return problems
+
+
+def check_text(text: str, jsx: bool = True) -> list[Problem]:
+    return check_tokens(tokenize(text, jsx=jsx))
+
+
+def regions(text: str, jsx: bool, edits: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """包住每处编辑 [start, end) 的最内层 span（旧文本坐标），重叠的合并；找不到时是整个文件。"""
+    index = text_spans(text, jsx)
+    found: list[tuple[int, int]] = []
+    for start, end in edits:
+        span = index.enclosing(start)
+        while span is not None and not (span.start < start and end < span.end):
+            span = index.spans[span.parent] if span.parent >= 0 else None
+        if span is None:
+            return [(0, len(text))]
+        found.append((span.start, span.end))
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(found):
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _old_tokens(tokens: list[Token], starts: list[int], a: int, b: int) -> list[Token]:
+    """旧区域直接切缓存里的整文件 token，不再分词。"""
+    return tokens[bisect_left(starts, a):bisect_left(starts, b)]
+
+
+def check_edits(original: str, edits: Iterable[tuple[int, int, str]], jsx: bool = True) -> list[Problem]:
+    """对一组不重叠的编辑 (start, end, 新文本)（原文坐标）做增量检查，返回改坏的地方（新文本坐标）。
+
+    original 是编辑所用的那份解码文本（可以含 surrogateescape 的代理字符），token 和 span
+    都直接在它上面取，偏移与编辑坐标一致。
+    """
+    edits = sorted(edits, key=lambda e: (e[0], e[1] > e[0]))   # 稳定排序：同一位置的插入保持先后
+    if not edits:
+        return []
+    _digest, tokens = text_tokens(original, jsx)
+    token_starts = [t.start for t in tokens]
+    starts = [e[0] for e in edits]
+    shifts = [0]
+    for start, end, text in edits:
+        shifts.append(shifts[-1] + len(text) - (end - start))
+
+    def new_offset(offset: int) -> int:
+        # offset 不在任何编辑内部（区域严格包住编辑）
+        return offset + shifts[bisect_right(starts, offset - 1)]
+
+    problems: list[Problem] = []
+    for a, b in regions(original, jsx, [(s, e) for s, e, _ in edits]):
+        if check_tokens(_old_tokens(tokens, token_starts, a, b)):
+            continue        # 旧版本就过不了检查：分词器的盲区，不算改坏
+        inside = [e for e in edits if a <= e[0] and e[1] <= b]
+        chunks, pos = [], a
+        for start, end, text in inside:
+            chunks.append(original[pos:start])
+            chunks.append(text)
+            pos = end
+        chunks.append(original[pos:b])
+        base = new_offset(a)
+        problems.extend(Problem(p.offset + base, p.message) for p in check_text(''.join(chunks), jsx))
+    return problems
+
+
+def _common(a: str, b: str, limit: int, tail: bool) -> int:
+    """公共前缀（tail=True 时为后缀）长度；二分比较切片，比逐字符循环快得多。"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        same = a[len(a) - mid:] == b[len(b) - mid:] if tail else a[:mid] == b[:mid]
+        if same:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def changed_range(old: str, new: str) -> tuple[int, int, str] | None:
+    """新旧全文的最小差异区间 (start, end, 新文本)；相同时为 None。"""
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = _common(old, new, limit, False)
+    tail = _common(old, new, limit - start, True)
+    return start, len(old) - tail, new[start:len(new) - tail]
+
+
+def ensure_valid(path: str, original: str, edits: Iterable[tuple[int, int, str]], new_text: str) -> None:
+    """写文件之前调用：改坏了就抛 StructureError。非 JS/TS 文件不检查。"""
+    if not path.endswith(CHECKED_EXTS):
+        return
+    problems = check_edits(original, edits, jsx=not path.endswith(('.ts', '.mjs')))
+    if problems:
+        raise StructureError(path, new_text, problems)
@@ -0,0 +1,346 @@
+"""计时器清单：每个 setInterval / setTimeout / requestAnimationFrame 的周期、所属组件、是否挂在列表项里。
+
+每张任务卡片都挂着自己的倒计时组件，FocusTimer、DailyReceipt、导航页和后台调度器也各
+跑各的 setInterval。这里：
+
+1. 逐个文件（walker 增量缓存）找计时器调用（含 `window.` 前缀），记下周期：数字字面量、
+   `60 * 1000` 这类常量表达式，或同文件里 `const X = 30000` 定义的常量；
+   requestAnimationFrame 在自己的回调里再次调用时按每帧（60 次/秒）的循环计；
+   setTimeout 回调里又调用外层函数的算作循环，其余是一次性的，不计入稳定的唤醒数；
+2. 同时记下每个文件里组件 / hook 渲染了哪些组件、调用了哪些 hook，哪些组件是在
+   `.map` 回调里渲染的；
+3. 跨文件传递：在 `.map` 里渲染的组件是列表项，列表项渲染的组件、调用的 hook 也是；
+   列表项里的计时器按 N 个可见任务各一份，估算全部计时器每秒一共唤醒多少次，并和
+   「所有列表项共用一个 tick」的情况对比。
+
+挂载条件（比如只在待启动时显示倒计时）不做分析，列表项数按上限估算。
+
+    python -m toolkit timers --tasks 30
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, NamedTuple
+
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS
+from toolkit.spans import Span, SpanIndex, spans_for
+from toolkit.tokenizer import Token, is_jsx_file, significant, tokens_for
+from toolkit.walker import WalkResult, walk
+
+TIMERS_VERSION = 1
+TIMER_CALLS = ('setInterval', 'setTimeout', 'requestAnimationFrame')
+FRAME_MS = 1000 / 60
+DEFAULT_TASKS = 20
+LIST_CALLS = frozenset({'map', 'flatMap'})
+# .map 的接收者带这些词时按任务列表算（每个可见任务一份）；其他列表（仪表盘模块等）只记不乘
+_TASK_LIST = re.compile(r'task|block|slot', re.I)
+_NUMERIC = re.compile(r'[\d_.\s*+\-/()]+')
+_CONST = re.compile(r'\bconst\s+([A-Za-z_$][\w$]*)\s*(?::\s*number\s*)?=\s*([\d_.\s*+\-/()]+?)\s*[;\n]')
+_HOOK = re.compile(r'use[A-Z]\w*$')
+
+
+class Timer(NamedTuple):
+    path: str
+    lineno: int
+    kind: str                 # setInterval / setTimeout / requestAnimationFrame
+    period: float | None      # 毫秒；看不出来时为 None
+    repeating: bool           # setInterval、rAF 循环、自己续期的 setTimeout
+    owner: str | None         # 最外层的组件 / hook / 函数
+    scope: str | None         # 最内层有名字的函数
+    loop_key: str | None = None   # 回调函数名：同一个 rAF / setTimeout 循环的启动点和续期点相同，汇总时只算一次
+
+    def rate(self) -> float | None:
+        """单个实例稳定状态下每秒唤醒次数；一次性 setTimeout 为 0，周期未知为 None。"""
+        if not self.repeating:
+            return 0.0
+        if self.period is None:
+            return None
+        return 1000 / max(self.period, 1)
+
+    def describe(self, instances: int = 1) -> str:
+        if self.kind == 'requestAnimationFrame':
+            period = '每帧'
+        elif self.period is None:
+            period = '周期未知'
+        else:
+            period = f'{self.period:g}ms'
+        where = f'{self.path}:{self.lineno} {self.kind} {period}'
+        who = self.owner or '?'
+        if self.scope and self.scope != self.owner:
+            who += f'.{self.scope}'
+        rate = self.rate()
+        cost = '一次性' if rate == 0 else ('?' if rate is None else f'{rate * instances:.2f}/s')
+        each = f'，列表项 ×{instances}' if instances > 1 else ''
+        return f'{where} [{who}{each}] → {cost}'
+
+
+class FileTimers(NamedTuple):
+    timers: list[Timer]
+    renders: dict[str, tuple[str, ...]]   # 组件 / hook -> 它渲染的组件和调用的 hook
+    mapped: dict[str, bool]               # 在 .map 回调里渲染的组件 -> 是否是任务列表
+
+
+# ---------------------------------------------------------------------------
+# 扫描
+
+def _pairs(toks: list[Token]) -> list[int]:
+    pair = [-1] * len(toks)
+    stack: list[int] = []
+    for i, t in enumerate(toks):
+        if t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${'):
+            stack.append(i)
+        elif t.kind in ('punct', 'jsx_brace') and t.value in (')', ']', '}') and stack:
+            j = stack.pop()
+            pair[i], pair[j] = j, i
+    return pair
+
+
+def _evaluate(expr: str, consts: dict[str, str]) -> float | None:
+    """数字和同文件数字常量组成的算术表达式的值；有别的东西时返回 None。"""
+    for _ in range(3):      # 常量可以引用常量，最多展开三层
+        expr = re.sub(r'[A-Za-z_$][\w$]*', lambda m: '(%s)' % consts.get(m.group(), m.group()), expr)
+    expr = expr.strip()
+    if not expr or not _NUMERIC.fullmatch(expr):
+        return None
+    try:
+        value = eval(expr, {'__builtins__': {}})   # noqa: S307  只含数字和运算符
+    except (SyntaxError, ZeroDivisionError, TypeError):
+        return None
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+class _FileScan:
+    def __init__(self, rel: str, text: str, toks: list[Token], index: SpanIndex):
+        self.rel = rel
+        self.text = text
+        self.toks = toks
+        self.index = index
+        self.pair = _pairs(toks)
+        self.consts = dict(_CONST.findall(text))
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        if not 0 <= i < len(self.toks):
+            return False
+        t = self.toks[i]
+        return t.kind == kind and (not values or t.value in values)
+
+    def lineno(self, i: int) -> int:
+        return self.text.count('\n', 0, self.toks[i].start) + 1
+
+    def chain(self, offset: int) -> list[Span]:
+        """包含 offset 的函数 span，由内到外。"""
+        spans = []
+        span = self.index.enclosing(offset)
+        while span is not None:
+            if span.kind in ('function', 'arrow'):
+                spans.append(span)
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return spans
+
+    def owner(self, chain: list[Span]) -> str | None:
+        named = [s.name for s in chain if s.name and s.callee is None]
+        return named[-1] if named else None
+
+    def args(self, open_: int) -> list[tuple[int, int]]:
+        """调用括号里各个顶层参数的 token 区间（含）。"""
+        close = self.pair[open_]
+        found, start, k = [], open_ + 1, open_ + 1
+        while k < close:
+            t = self.toks[k]
+            if t.kind == 'punct' and t.value == ',':
+                found.append((start, k - 1))
+                start = k + 1
+            elif t.kind in ('punct', 'jsx_brace') and t.value in ('(', '[', '{', '${') and self.pair[k] > k:
+                k = self.pair[k]
+            k += 1
+        if start < close:
+            found.append((start, close - 1))
+        return found
+
+    def receiver(self, span: Span) -> str:
+        """`xs.map(cb)` 里 cb 的 span 对应的接收者原文（xs）。"""
+        k = span.first - 1
+        if not (self.is_(k, 'punct', '(') and self.is_(k - 1, 'ident') and self.is_(k - 2, 'punct', '.', '?.')):
+            return ''
+        end = k - 3
+        start = end
+        while start >= 0:
+            t = self.toks[start]
+            if t.kind == 'punct' and t.value in (')', ']') and self.pair[start] >= 0:
+                start = self.pair[start] - 1
+            elif t.kind == 'ident' or t.kind == 'punct' and t.value in ('.', '?.', '!'):
+                start -= 1
+            else:
+                break
+        if start + 1 > end:
+            return ''
+        return self.text[self.toks[start + 1].start:self.toks[end].end]
+
+    def timer(self, i: int) -> Timer | None:
+        toks = self.toks
+        kind = toks[i].value
+        if self.is_(i - 1, 'punct', '.', '?.') and not self.is_(i - 2, 'ident', 'window', 'globalThis', 'self'):
+            return None
+        if not self.is_(i + 1, 'punct', '(') or self.pair[i + 1] < 0:
+            return None
+        args = self.args(i + 1)
+        if not args:
+            return None
+        chain = self.chain(toks[i].start)
+        names = [s.name for s in chain if s.name]
+        callback = toks[args[0][0]].value if args[0][0] == args[0][1] and self.is_(args[0][0], 'ident') else None
+        loop_key = None
+        if kind == 'requestAnimationFrame':
+            period = FRAME_MS
+            # rAF(update) 写在 update 里面才是循环；外面那次只是启动
+            repeating = callback is not None and callback in names
+            loop_key = callback
+        else:
+            period = None
+            if len(args) > 1:
+                a, b = args[1]
+                period = _evaluate(self.text[toks[a].start:toks[b].end], self.consts)
+            elif kind == 'setTimeout':
+                period = 0.0
+            repeating = kind == 'setInterval'
+            if kind == 'setTimeout':
+                # setTimeout(tick) 写在 tick 里，或回调里又调用了外层函数：自己续期的循环
+                inner = {toks[k].value for k in range(args[0][0], args[0][1] + 1)
+                         if self.is_(k, 'ident') and self.is_(k + 1, 'punct', '(')}
+                loop = next((n for n in names if n == callback or n in inner), None)
+                repeating = loop is not None
+                loop_key = loop or callback
+        if loop_key is not None:
+            loop_key = f'{self.owner(chain)}:{loop_key}'
+        scope = next((s.name for s in chain if s.name and s.callee is None), None)
+        return Timer(self.rel, self.lineno(i), kind, period, repeating, self.owner(chain), scope, loop_key)
+
+    def run(self) -> FileTimers:
+        toks = self.toks
+        timers: list[Timer] = []
+        renders: dict[str, set[str]] = {}
+        mapped: dict[str, bool] = {}
+        for i, t in enumerate(toks):
+            if t.kind == 'ident' and t.value in TIMER_CALLS:
+                found = self.timer(i)
+                if found is not None:
+                    timers.append(found)
+            elif t.kind == 'jsx_name' and self.is_(i - 1, 'jsx_open', '<') and t.value[:1].isupper():
+                chain = self.chain(t.start)
+                owner = self.owner(chain)
+                if owner:
+                    renders.setdefault(owner, set()).add(t.value)
+                lists = [s for s in chain if s.callee in LIST_CALLS]
+                if lists:
+                    task_list = any(_TASK_LIST.search(self.receiver(s)) for s in lists)
+                    mapped[t.value] = mapped.get(t.value, False) or task_list
+            elif t.kind == 'ident' and _HOOK.match(t.value) and self.is_(i + 1, 'punct', '(') \
+                    and not self.is_(i - 1, 'punct', '.', '?.') and not self.is_(i - 1, 'ident', 'function'):
+                owner = self.owner(self.chain(t.start))
+                if owner and owner != t.value:
+                    renders.setdefault(owner, set()).add(t.value)
+        return FileTimers(timers, {k: tuple(sorted(v)) for k, v in renders.items()}, mapped)
+
+
+def file_timers(rel: str, text: str) -> FileTimers:
+    """walker 任务：一个文件里的计时器，以及组件之间的渲染关系。"""
+    data = text.encode('utf-8')
+    jsx = is_jsx_file(rel)
+    _digest, tokens = tokens_for(data, jsx)
+    return _FileScan(rel, text, significant(tokens), spans_for(data, jsx)).run()
+
+
+def run(roots: Iterable[str] = DEFAULT_ROOTS, paths: Iterable[str] | None = None,
+        workers: int | None = None) -> WalkResult:
+    """results 为 {相对路径: FileTimers}。"""
+    return walk(file_timers, 'timers:v%d' % TIMERS_VERSION, tuple(roots), SOURCE_EXTS,
+                paths=paths, workers=workers)
+
+
+# ---------------------------------------------------------------------------
+# 汇总
+
+def list_items(results: dict[str, FileTimers]) -> tuple[set[str], set[str]]:
+    """(任务列表项, 其他列表项)：在 .map 里渲染的组件，以及它们（传递地）渲染的组件、调用的 hook。"""
+    renders: dict[str, set[str]] = {}
+    tasks: set[str] = set()
+    others: set[str] = set()
+    for found in results.values():
+        for name, task_list in found.mapped.items():
+            (tasks if task_list else others).add(name)
+        for owner, used in found.renders.items():
+            renders.setdefault(owner, set()).update(used)
+    for items in (tasks, others):
+        pending = list(items)
+        while pending:
+            for used in renders.get(pending.pop(), ()):
+                if used not in items:
+                    items.add(used)
+                    pending.append(used)
+    return tasks, others - tasks
+
+
+class Row(NamedTuple):
+    timer: Timer
+    per_item: bool            # 在任务列表项里，按可见任务数计实例
+    in_list: bool             # 在别的列表里（仪表盘模块之类），实例数不乘
+    instances: int
+    wakeups: float | None     # 每秒；周期未知为 None
+
+    def describe(self) -> str:
+        line = self.timer.describe(self.instances)
+        return line + '（在其他列表里，按 1 份计）' if self.in_list and not self.per_item else line
+
+
+class Inventory(NamedTuple):
+    tasks: int
+    rows: list[Row]
+
+    @property
+    def total(self) -> float:
+        return sum(r.wakeups or 0 for r in self.rows)
+
+    @property
+    def per_item(self) -> float:
+        return sum(r.wakeups or 0 for r in self.rows if r.per_item)
+
+    @property
+    def unknown(self) -> list[Row]:
+        return [r for r in self.rows if r.wakeups is None]
+
+    @property
+    def one_shot(self) -> list[Row]:
+        return [r for r in self.rows if r.wakeups == 0]
+
+    def shared_tick(self, tick: float | None = None) -> tuple[float, float]:
+        """列表项里的循环计时器都换成一个共享 tick 之后：(tick 周期毫秒, 每秒唤醒次数)。
+
+        tick 省略时取这些计时器里最短的周期。
+        """
+        if tick is None:
+            periods = [r.timer.period for r in self.rows if r.per_item and r.wakeups and r.timer.period]
+            if not periods:
+                return 0.0, 0.0
+            tick = min(periods)
+        return tick, 1000 / max(tick, 1)
+
+
+def inventory(results: dict[str, FileTimers], tasks: int = DEFAULT_TASKS) -> Inventory:
+    items, others = list_items(results)
+    rows: list[Row] = []
+    for rel in sorted(results):
+        # 循环的启动点（写在循环函数外面的那次调用）和续期点只算一次
+        loops = {t.loop_key for t in results[rel].timers if t.repeating and t.loop_key}
+        seen: set[str] = set()
+        for timer in results[rel].timers:
+            if timer.loop_key in loops:
+                if not timer.repeating or timer.loop_key in seen:
+                    continue
+                seen.add(timer.loop_key)
+            per_item = bool(timer.owner and timer.owner in items)
+            instances = tasks if per_item else 1
+            rate = timer.rate()
+            rows.append(Row(timer, per_item, bool(timer.owner in others), instances,
+                            None if rate is None else rate * instances))
+    rows.sort(key=lambda r: (-(r.wakeups or 0), r.wakeups is not None, r.timer.path, r.timer.lineno))
+    return Inventory(tasks, rows)
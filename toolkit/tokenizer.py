@@ -0,0 +1,318 @@
+"""TS/TSX 词法分析器。
+
+能正确跳过字符串、模板字符串（含 `${...}` 嵌套）、正则字面量和注释，并识别 JSX：
+标签、属性、`{...}` 表达式容器和 JSX 文本都有各自的 token 类型，所以括号计数
+不会再被字符串或 JSX 文本里的 `{`/`}` 干扰。
+
+token 类型：
+    ident / num / string / regex / comment / punct
+    template      模板字符串片段（第一个片段以 ` 开头，最后一个以 ` 结尾）
+    jsx_open      `<` 或 `</`
+    jsx_name      标签名（片段 `<>` 没有）
+    jsx_attr      属性名
+    jsx_end       `>` 或 `/>`
+    jsx_text      标签之间的文本
+    jsx_brace     JSX 表达式容器的 `{` 与 `}`
+
+`${` 以 punct 形式出现并和对应的 `}` 配对。偏移量都是解码后文本的字符下标。
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import NamedTuple
+
+from toolkit import cache
+from toolkit.files import MEMO_BYTES, TOKEN_BYTES, cached
+
+
+# 分词规则变化时递增，让旧的 token 缓存失效
+TOKENIZER_VERSION = 1
+
+
+class Token(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    value: str
+
+
+# 这些关键字之后出现的 `/` 和 `<` 处于表达式起始位置
+EXPR_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await', 'default', 'extends',
+})
+
+_WS = re.compile(r'[\s\ufeff]+')
+_COMMENT = re.compile(r'//[^\n]*|/\*.*?(?:\*/|\Z)', re.S)
+_IDENT = re.compile(r'(?:[^\W\d]|\$)[\w$]*')
+_NUMBER = re.compile(r'0[xXoObB][\da-fA-F_]+n?|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?')
+_STRING = re.compile(r"""'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?""", re.S)
+_PUNCT = re.compile(r'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||\?\?'
+                    r'|\?\.(?!\d)|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>'
+                    r'|[{}()\[\];,<>+\-*/%&|^!~?:=.@#\\]')
+_REGEX_BODY = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+_TEMPLATE_CHUNK = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*', re.S)
+_JSX_NAME = re.compile(r'[\w$][\w$.:\-]*')
+_JSX_ATTR = re.compile(r'[\w$][\w$:\-]*')
+_JSX_TEXT = re.compile(r'[^<{]+')
+# TSX 里泛型箭头函数的写法：<T extends X>(...) 或 <T,>(...)
+_GENERIC_PARAMS = re.compile(r'<\s*[\w$]+\s*(?:extends\b|,)')
+_JSX_STRING = re.compile(r""""[^"]*"|'[^']*'""")
+
+
+def expression_position(prev: Token | None) -> bool:
+    """前一个有效 token 之后是否处于表达式起始位置（决定 `/` 是不是正则、`<` 是不是 JSX）。"""
+    if prev is None:
+        return True
+    kind, value = prev.kind, prev.value
+    if kind == 'punct':
+        return value not in (')', ']', '}', '++', '--')
+    if kind == 'ident':
+        return value in EXPR_KEYWORDS
+    return kind in ('jsx_brace',) and value == '{'
+
+
+def tokenize(text: str, jsx: bool = True) -> list[Token]:
+    """把源码切成 token 列表（包含注释，不含空白）。jsx=False 用于 .ts 文件。"""
+    tokens: list[Token] = []
+    emit = tokens.append
+    pos, n = 0, len(text)
+    prev: Token | None = None
+    # 栈帧：[模式, 花括号深度]；模式为 code / template / tag / children
+    # tag 帧额外记录：[tag, 阶段(name/attrs), 是否闭合标签]
+    stack: list[list] = [['code', 0]]
+
+    def push_token(kind: str, start: int, end: int) -> Token:
+        nonlocal prev
+        tok = Token(kind, start, end, text[start:end])
+        emit(tok)
+        if kind != 'comment':
+            prev = tok
+        return tok
+
+    while pos < n:
+        frame = stack[-1]
+        mode = frame[0]
+
+        if mode == 'code':
+            m = _WS.match(text, pos)
+            if m:
+                pos = m.end()
+                continue
+            ch = text[pos]
+            if ch == '/' and pos + 1 < n and text[pos + 1] in '/*':
+                m = _COMMENT.match(text, pos)
+                push_token('comment', pos, m.end())
+                pos = m.end()
+                continue
+            m = _IDENT.match(text, pos)
+            if m:
+                push_token('ident', pos, m.end())
+                pos = m.end()
+                continue
+            if ch.isdigit() or (ch == '.' and pos + 1 < n and text[pos + 1].isdigit()):
+                m = _NUMBER.match(text, pos)
+                push_token('num', pos, m.end())
+                pos = m.end()
+                continue
+            if ch in '\'"':
+                m = _STRING.match(text, pos)
+                push_token('string', pos, m.end())
+                pos = m.end()
+                continue
+            if ch == '`':
+                stack.append(['template', 0])
+                pos = _scan_template(text, pos + 1, pos, push_token, stack)
+                continue
+            if ch == '/' and expression_position(prev):
+                m = _REGEX_BODY.match(text, pos)
+                if m:
+                    push_token('regex', pos, m.end())
+                    pos = m.end()
+                    continue
+            if ch == '<' and jsx and expression_position(prev) and pos + 1 < n \
+                    and (text[pos + 1] == '>' or _IDENT.match(text, pos + 1)) \
+                    and not _GENERIC_PARAMS.match(text, pos):
+                push_token('jsx_open', pos, pos + 1)
+                stack.append(['tag', 'name', False])
+                pos += 1
+                continue
+            m = _PUNCT.match(text, pos)
+            if not m:
+                push_token('punct', pos, pos + 1)
+                pos += 1
+                continue
+            value = m.group(0)
+            if value == '{':
+                frame[1] += 1
+            elif value == '}':
+                if frame[1] == 0 and len(stack) > 1:
+                    stack.pop()
+                    outer = stack[-1][0]
+                    if outer == 'template':
+                        push_token('punct', pos, pos + 1)
+                        pos = _scan_template(text, pos + 1, None, push_token, stack)
+                    else:
+                        push_token('jsx_brace', pos, pos + 1)
+                        pos += 1
+                    continue
+                frame[1] -= 1
+            push_token('punct', pos, m.end())
+            pos = m.end()
+
+        elif mode == 'tag':
+            m = _WS.match(text, pos)
+            if m:
+                pos = m.end()
+                continue
+            ch = text[pos]
+            if frame[1] == 'name':
+                if ch == '/' and tokens[-1].kind == 'jsx_open' and tokens[-1].end == pos:
+                    # `</`：把上一个 `<` 合并成闭合标签的开头
+                    tokens[-1] = prev = Token('jsx_open', tokens[-1].start, pos + 1, '</')
+                    frame[2] = True
+                    pos += 1
+                    continue
+                frame[1] = 'attrs'
+                m = _JSX_NAME.match(text, pos)
+                if m:
+                    push_token('jsx_name', pos, m.end())
+                    pos = m.end()
+                continue
+            if ch == '/' and pos + 1 < n and text[pos + 1] in '/*':
+                m = _COMMENT.match(text, pos)
+                push_token('comment', pos, m.end())
+                pos = m.end()
+                continue
+            if text.startswith('/>', pos):
+                push_token('jsx_end', pos, pos + 2)
+                stack.pop()
+                pos += 2
+                continue
+            if ch == '>':
+                push_token('jsx_end', pos, pos + 1)
+                closing = frame[2]
+                stack.pop()
+                if closing:
+                    if stack[-1][0] == 'children':
+                        stack.pop()
+                else:
+                    stack.append(['children', 0])
+                pos += 1
+                continue
+            if ch == '{':
+                push_token('jsx_brace', pos, pos + 1)
+                stack.append(['code', 0])
+                pos += 1
+                continue
+            if ch in '"\'':
+                m = _JSX_STRING.match(text, pos)
+                end = m.end() if m else n
+                push_token('string', pos, end)
+                pos = end
+                continue
+            m = _JSX_ATTR.match(text, pos)
+            if m:
+                push_token('jsx_attr', pos, m.end())
+                pos = m.end()
+                continue
+            push_token('punct', pos, pos + 1)
+            pos += 1
+
+        elif mode == 'children':
+            ch = text[pos]
+            if ch == '<':
+                push_token('jsx_open', pos, pos + 1)
+                stack.append(['tag', 'name', False])
+                pos += 1
+                continue
+            if ch == '{':
+                push_token('jsx_brace', pos, pos + 1)
+                stack.append(['code', 0])
+                pos += 1
+                continue
+            m = _JSX_TEXT.match(text, pos)
+            push_token('jsx_text', pos, m.end())
+            pos = m.end()
+
+        else:  # 模板字符串里遇到不完整的文件结尾
+            break
+
+    return tokens
+
+
+def _scan_template(text: str, pos: int, begin: int | None, push_token, stack) -> int:
+    """扫描一段模板字符串片段；遇到 `${` 压入 code 帧，遇到 ` 弹出 template 帧。"""
+    start = begin if begin is not None else pos
+    m = _TEMPLATE_CHUNK.match(text, pos)
+    end = m.end()
+    if end < len(text) and text[end] == '`':
+        push_token('template', start, end + 1)
+        stack.pop()
+        return end + 1
+    if text.startswith('${', end):
+        if end > start:
+            push_token('template', start, end)
+        push_token('punct', end, end + 2)
+        stack.append(['code', 0])
+        return end + 2
+    push_token('template', start, end)   # 文件在模板中途结束
+    stack.pop()
+    return end
+
+
+def significant(tokens: list[Token]) -> list[Token]:
+    """去掉注释后的 token 列表。"""
+    return [t for t in tokens if t.kind != 'comment']
+
+
+def is_jsx_file(path) -> bool:
+    return str(path).endswith(('.tsx', '.jsx'))
+
+
+# 内容哈希 -> tokens；进程内有上限，守护进程里不会无限增长
+_memo = cache.LRU('tokens', MEMO_BYTES, lambda tokens: len(tokens) * TOKEN_BYTES)
+
+
+def _load(digest: str, jsx: bool, text) -> list[Token]:
+    tokens = _memo.get(digest)
+    if tokens is None:
+        name = 'tokens/v%d-%s.pkl' % (TOKENIZER_VERSION, digest)
+        tokens = cache.load(name)
+        if tokens is None:
+            tokens = tokenize(text(), jsx=jsx)
+            cache.save(name, tokens)
+        _memo.put(digest, tokens)
+    return tokens
+
+
+def tokens_for(data, jsx: bool, digest: str | None = None) -> tuple[str, list[Token]]:
+    """按内容哈希缓存的分词结果（内存 + .toolkit_cache/tokens/）。返回 (哈希, tokens)。
+
+    data 可以是 bytes 或 mmap 等任意字节缓冲区；已知内容哈希时传 digest 省掉一次哈希。
+    字节按 UTF-8 + 'replace' 解码，偏移对应 `str(data, 'utf-8', 'replace')`。
+    """
+    digest = (digest or cache.content_hash(data)) + ('x' if jsx else '')
+    return digest, _load(digest, jsx, lambda: str(data, 'utf-8', 'replace'))
+
+
+def text_tokens(text: str, jsx: bool) -> tuple[str, list[Token]]:
+    """对已经解码好的文本分词，偏移就是 text 的下标。返回 (哈希, tokens)。
+
+    编辑事务、PieceTable 按 surrogateescape 解码：一段截断的多字节序列在那里是 N 个代理
+    字符，在 'replace' 解码里只有一个 U+FFFD，用 tokens_for 的偏移去切 text 会从第一个坏
+    字节开始错位。没有代理字符时两种解码相同，直接共用 tokens_for 的缓存。
+    """
+    try:
+        return tokens_for(text.encode('utf-8'), jsx)
+    except UnicodeEncodeError:
+        pass
+    digest = cache.content_hash(text.encode('utf-8', errors='surrogateescape')) + 's' + ('x' if jsx else '')
+    return digest, _load(digest, jsx, lambda: text)
+
+
+def load_tokens(path: str | os.PathLike) -> tuple[str, list[Token]]:
+    """读取文件并返回 (解码后的文本, tokens)。"""
+    entry = cached(path)
+    return entry.text, entry.tokens(is_jsx_file(path))
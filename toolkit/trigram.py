@@ -0,0 +1,399 @@
+"""src/ 的持久化三元组（trigram）索引。
+
+每个文件一份分片：行起始偏移 + 「三元组 -> 行号列表」；清单里记录每个文件的
+(mtime_ns, size) 以及「三元组 -> 文件位图」。查询先用清单筛文件，再用分片筛行，
+最后只对候选行做真正的子串/正则校验。树没变时重复查询只需要 stat 和读缓存；
+守护进程里有 inotify 监视器（toolkit.watch）时连 stat 都省了，只重建它报告改过的文件。
+
+匹配按行进行（与原来的 find_*.py 脚本一致），跨行正则不在支持范围内。
+"""
+from __future__ import annotations
+
+import mmap
+import re
+from array import array
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from toolkit import cache, watch
+from toolkit.lines import LineTable
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS, is_source_file, iter_source_files, relpath, resolve
+
+try:  # Python 3.11+
+    from re import _constants as _sre_c, _parser as _sre_parse
+except ImportError:  # pragma: no cover - 旧版本解释器
+    import sre_constants as _sre_c
+    import sre_parse as _sre_parse
+
+MANIFEST = 'trigram/manifest.pkl'
+
+# 查询计划：None 表示「无法用索引约束」（所有行都是候选）
+Plan = Optional[tuple]
+
+
+class Hit(NamedTuple):
+    path: str      # 仓库内相对路径
+    lineno: int    # 从 1 开始
+    line: str      # 不含换行符
+
+
+def trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _decode_line(raw: bytes) -> str:
+    return raw.rstrip(b'\r\n').decode('utf-8', errors='replace')
+
+
+def build_shard(path, key: tuple[int, int]) -> dict:
+    with open(path, 'rb') as f:
+        data = f.read()
+    offsets = LineTable.build(data, chars=False).byte_starts
+    postings: dict[str, array] = {}
+    for lineno in range(len(offsets) - 1):
+        text = _decode_line(data[offsets[lineno]:offsets[lineno + 1]])
+        for tri in trigrams(text):
+            bucket = postings.get(tri)
+            if bucket is None:
+                postings[tri] = bucket = array('I')
+            bucket.append(lineno)
+    return {'key': key, 'offsets': offsets, 'postings': postings}
+
+
+# ---------------------------------------------------------------------------
+# 查询计划
+
+def literal_plan(literal: str) -> Plan:
+    return ('lit', literal) if len(literal) >= 3 else None
+
+
+def _and(nodes: list) -> Plan:
+    nodes = [n for n in nodes if n is not None]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+
+def _or(nodes: list) -> Plan:
+    if not nodes or any(n is None for n in nodes):
+        return None
+    return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+
+def _plan_items(items) -> Plan:
+    nodes: list = []
+    run: list[str] = []
+
+    def flush():
+        if run:
+            nodes.append(literal_plan(''.join(run)))
+            run.clear()
+
+    for op, av in items:
+        if op is _sre_c.LITERAL:
+            ch = chr(av)
+            if ch in '\r\n':
+                flush()
+            else:
+                run.append(ch)
+            continue
+        flush()
+        if op is _sre_c.SUBPATTERN:
+            nodes.append(_plan_items(av[-1]))
+        elif op is _sre_c.BRANCH:
+            nodes.append(_or([_plan_items(branch) for branch in av[1]]))
+        elif op in (_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT) or op is getattr(_sre_c, 'POSSESSIVE_REPEAT', None):
+            lo, _hi, body = av
+            if lo >= 1:
+                nodes.append(_plan_items(body))
+    flush()
+    return _and(nodes)
+
+
+def regex_plan(pattern: str, flags: int = 0) -> Plan:
+    """从正则里提取「必须出现」的字面量，组合成 AND/OR 计划。"""
+    return _plan_items(_sre_parse.parse(pattern, flags))
+
+
+# ---------------------------------------------------------------------------
+
+# (roots, exts) -> 本进程已打开的索引
+_open: dict[tuple, 'TrigramIndex'] = {}
+
+
+class TrigramIndex:
+    """src/ 的三元组索引，见模块说明。
+
+        index = TrigramIndex.open()
+        for hit in index.search('completeTask'):
+            print(hit.path, hit.lineno, hit.line)
+    """
+
+    def __init__(self, roots: Iterable[str] = DEFAULT_ROOTS,
+                 exts: Iterable[str] = SOURCE_EXTS):
+        self.roots = tuple(roots)
+        self.exts = tuple(exts)
+        self._name = MANIFEST if self.roots == DEFAULT_ROOTS and self.exts == SOURCE_EXTS else \
+            'trigram/manifest-%s.pkl' % cache.shard_name(repr((self.roots, self.exts)))
+        self.files: dict[str, list] = {}           # rel -> [mtime_ns, size, fid]
+        self.postings: dict[str, int] = {}         # trigram -> 文件位图
+        self.next_fid = 0
+        self._shards: dict[str, dict] = {}
+        self._generation = -1                      # 上次同步到的监视器代（-1：还没整体刷新过）
+
+    @classmethod
+    def open(cls, roots: Iterable[str] = DEFAULT_ROOTS,
+             exts: Iterable[str] = SOURCE_EXTS, refresh: bool = True) -> 'TrigramIndex':
+        # 同一进程里（守护进程）再次打开时复用已加载的索引，只做增量刷新
+        roots, exts = tuple(roots), tuple(exts)
+        index = _open.get((roots, exts))
+        if index is None:
+            index = cls(roots, exts)
+            state = cache.load(index._name)
+            if state is not None:
+                index.files = state['files']
+                index.postings = state['postings']
+                index.next_fid = state['next_fid']
+            _open[(index.roots, index.exts)] = index
+        if refresh:
+            index.sync()
+        return index
+
+    def sync(self) -> list[str]:
+        """有 inotify 监视器（守护进程里）时只更新它报告改过的文件，否则整体 refresh。"""
+        watcher = watch.active(self.roots)
+        if watcher is None:
+            return self.refresh()
+        generation, changed = watcher.changes_since(self._generation)
+        if self._generation < 0 or changed is None:
+            updated = self.refresh()
+        else:
+            updated = self.update(r for r in sorted(changed) if is_source_file(r, self.roots, self.exts))
+        self._generation = generation
+        return updated
+
+    # -- 维护 ---------------------------------------------------------------
+
+    def refresh(self) -> list[str]:
+        """对比 (mtime_ns, size)，只重建变化过的文件；返回被更新的相对路径。"""
+        seen = set()
+        changed = []
+        for path in iter_source_files(self.roots, self.exts):
+            rel = relpath(path)
+            seen.add(rel)
+            try:
+                key = cache.stat_key(path)
+            except OSError:
+                continue
+            entry = self.files.get(rel)
+            if entry is not None and (entry[0], entry[1]) == key:
+                continue
+            self._reindex(rel, path, key)
+            changed.append(rel)
+        for rel in [r for r in self.files if r not in seen]:
+            self._drop(rel)
+            changed.append(rel)
+        if changed:
+            if self.next_fid > 2 * max(len(self.files), 64):
+                self._compact()
+            self._save()
+        return changed
+
+    def update(self, paths: Iterable[str]) -> list[str]:
+        """只检查给定文件（供调用方已知改动范围时使用）。"""
+        changed = []
+        for p in paths:
+            rel, path = relpath(p), resolve(p)
+            if not path.exists():
+                if rel in self.files:
+                    self._drop(rel)
+                    changed.append(rel)
+                continue
+            key = cache.stat_key(path)
+            entry = self.files.get(rel)
+            if entry is None or (entry[0], entry[1]) != key:
+                self._reindex(rel, path, key)
+                changed.append(rel)
+        if changed:
+            self._save()
+        return changed
+
+    def _reindex(self, rel, path, key):
+        if rel in self.files:
+            self._drop(rel)
+        shard = build_shard(path, key)
+        fid = self.next_fid
+        self.next_fid += 1
+        bit = 1 << fid
+        postings = self.postings
+        for tri in shard['postings']:
+            postings[tri] = postings.get(tri, 0) | bit
+        self.files[rel] = [key[0], key[1], fid]
+        self._shards[rel] = shard
+        cache.save(self._shard_file(rel), shard)
+
+    def _drop(self, rel):
+        _mtime, _size, fid = self.files.pop(rel)
+        mask = ~(1 << fid)
+        shard = self._shards.pop(rel, None) or cache.load(self._shard_file(rel))
+        postings = self.postings
+        tris = shard['postings'] if shard is not None else list(postings)
+        for tri in tris:
+            bits = postings.get(tri, 0) & mask
+            if bits:
+                postings[tri] = bits
+            else:
+                postings.pop(tri, None)
+        cache.discard(self._shard_file(rel))
+
+    def _compact(self):
+        """文件 id 用稀疏后重新编号，控制位图长度。"""
+        remap = {}
+        for new_fid, (rel, entry) in enumerate(sorted(self.files.items(), key=lambda kv: kv[1][2])):
+            remap[entry[2]] = new_fid
+            entry[2] = new_fid
+        postings = {}
+        for tri, bits in self.postings.items():
+            new_bits = 0
+            while bits:
+                low = bits & -bits
+                new_bits |= 1 << remap[low.bit_length() - 1]
+                bits ^= low
+            postings[tri] = new_bits
+        self.postings = postings
+        self.next_fid = len(self.files)
+
+    def _save(self):
+        cache.save(self._name, {'files': self.files, 'postings': self.postings,
+                                'next_fid': self.next_fid})
+
+    def _shard_file(self, rel: str) -> str:
+        return 'trigram/%s.pkl' % cache.shard_name(rel)
+
+    def shard(self, rel: str) -> dict:
+        shard = self._shards.get(rel)
+        if shard is None:
+            entry = self.files[rel]
+            shard = cache.load(self._shard_file(rel))
+            if shard is None or shard['key'] != (entry[0], entry[1]):
+                path = resolve(rel)
+                key = cache.stat_key(path)
+                shard = build_shard(path, key)
+                cache.save(self._shard_file(rel), shard)
+            self._shards[rel] = shard
+        return shard
+
+    # -- 查询 ---------------------------------------------------------------
+
+    def search(self, literal: str, paths: Iterable[str] | None = None,
+               ignore_case: bool = False, limit: int | None = None) -> list[Hit]:
+        """子串查询。"""
+        if ignore_case:
+            needle = literal.lower()
+            match = lambda line: needle in line.lower()  # noqa: E731
+        else:
+            match = lambda line: literal in line  # noqa: E731
+        return self._run(literal_plan(literal), match, paths, limit)
+
+    def search_regex(self, pattern: str, paths: Iterable[str] | None = None,
+                     flags: int = 0, limit: int | None = None) -> list[Hit]:
+        """逐行正则查询（re.search 语义）。"""
+        compiled = re.compile(pattern, flags)
+        return self._run(regex_plan(pattern, flags), lambda line: compiled.search(line) is not None,
+                         paths, limit)
+
+    def candidate_files(self, plan: Plan, paths: Iterable[str] | None = None) -> list[str]:
+        if paths is not None:
+            wanted = [relpath(p) for p in paths]
+            files = [rel for rel in wanted if rel in self.files]
+        else:
+            files = sorted(self.files)
+        bits = self._file_bits(plan)
+        if bits is None:
+            return files
+        return [rel for rel in files if bits >> self.files[rel][2] & 1]
+
+    def candidate_lines(self, rel: str, plan: Plan) -> list[int] | None:
+        """候选行号（从 0 开始）；None 表示索引无法排除任何行。"""
+        lines = self._line_set(self.shard(rel)['postings'], plan)
+        return None if lines is None else sorted(lines)
+
+    def read_lines(self, rel: str, linenos: Iterable[int] | None = None):
+        """按行号（从 0 开始）只读取指定行，返回 (lineno, text) 迭代器。"""
+        offsets = self.shard(rel)['offsets']
+        total = len(offsets) - 1
+        if total <= 0:
+            return
+        with open(resolve(rel), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for lineno in (range(total) if linenos is None else linenos):
+                if 0 <= lineno < total:
+                    yield lineno, _decode_line(mm[offsets[lineno]:offsets[lineno + 1]])
+
+    def context(self, hit: Hit, before: int = 5, after: int = 5) -> list[tuple[int, str]]:
+        """命中行前后若干行，返回 (从 1 开始的行号, 文本)。"""
+        start = max(0, hit.lineno - 1 - before)
+        return [(n + 1, text) for n, text in
+                self.read_lines(hit.path, range(start, hit.lineno + after))]
+
+    def _run(self, plan: Plan, match: Callable[[str], bool],
+             paths: Iterable[str] | None, limit: int | None) -> list[Hit]:
+        hits: list[Hit] = []
+        for rel in self.candidate_files(plan, paths):
+            linenos = self.candidate_lines(rel, plan)
+            if linenos == []:
+                continue
+            for lineno, text in self.read_lines(rel, linenos):
+                if match(text):
+                    hits.append(Hit(rel, lineno + 1, text))
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+        return hits
+
+    def _file_bits(self, plan: Plan) -> int | None:
+        if plan is None:
+            return None
+        kind, arg = plan
+        if kind == 'lit':
+            bits = -1
+            for tri in trigrams(arg):
+                bits &= self.postings.get(tri, 0)
+                if not bits:
+                    break
+            return bits
+        parts = [self._file_bits(p) for p in arg]
+        if kind == 'and':
+            bits = -1
+            for part in parts:
+                bits &= part
+            return bits
+        bits = 0
+        for part in parts:
+            bits |= part
+        return bits
+
+    def _line_set(self, postings: dict, plan: Plan) -> set[int] | None:
+        if plan is None:
+            return None
+        kind, arg = plan
+        if kind == 'lit':
+            buckets = sorted((postings.get(tri, ()) for tri in trigrams(arg)), key=len)
+            if not buckets:
+                return None
+            result = set(buckets[0])
+            for bucket in buckets[1:]:
+                if not result:
+                    break
+                result.intersection_update(bucket)
+            return result
+        parts = [self._line_set(postings, p) for p in arg]
+        if kind == 'and':
+            known = sorted((p for p in parts if p is not None), key=len)
+            if not known:
+                return None
+            result = set(known[0])
+            for part in known[1:]:
+                result &= part
+            return result
+        if any(p is None for p in parts):
+            return None
+        return set().union(*parts)
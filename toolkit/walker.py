@@ -0,0 +1,177 @@
+"""跨文件搜索用的并行遍历器。
+
+`walk()` 把「读文件 + 跑任务」分发到进程池，并按任务键缓存每个文件的结果：
+(mtime_ns, size) 没变的文件直接复用上次结果、不读文件；mtime 变了但内容哈希
+没变（例如只是被 touch）的文件只读不算。守护进程里有 inotify 监视器（toolkit.watch）
+时，连 stat 也只做监视器报告改过的那几个文件。读失败和任务异常都收集到
+`WalkResult.errors` 里返回，不再被 `except: pass` 吞掉。
+
+任务必须是可 pickle 的（模块级函数或实现了 __call__ 的 dataclass），签名为
+`task(rel, text) -> 结果`；`raw=True` 时传入未解码的 bytes（编码检查类任务用）。
+"""
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, NamedTuple
+
+from toolkit import cache, watch
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS, is_source_file, iter_source_files, relpath, resolve
+
+# 文件少于这个数时不值得启动进程池
+MIN_PARALLEL_FILES = 16
+
+
+class ReadError(NamedTuple):
+    path: str
+    error: str
+
+
+@dataclass
+class WalkResult:
+    results: dict[str, Any] = field(default_factory=dict)   # rel -> 任务结果
+    errors: list[ReadError] = field(default_factory=list)
+    scanned: int = 0     # 实际执行了任务的文件数
+    rehashed: int = 0    # 读了但内容没变、复用结果的文件数
+    cached: int = 0      # 连读都没读的文件数
+
+
+def _run_one(task: Callable[[str, Any], Any], rel: str, known_hash: str | None, raw: bool = False):
+    """在子进程里执行：返回 (rel, stat_key, hash, 状态, 结果或错误)。"""
+    path = resolve(rel)
+    try:
+        key = cache.stat_key(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as exc:
+        return rel, None, None, 'error', f'{type(exc).__name__}: {exc}'
+    digest = cache.content_hash(data)
+    if digest == known_hash:
+        return rel, key, digest, 'same', None
+    try:
+        return rel, key, digest, 'ok', task(rel, data if raw else data.decode('utf-8', errors='replace'))
+    except Exception as exc:  # 任务本身的异常也要报告
+        return rel, key, digest, 'error', f'{type(exc).__name__}: {exc}'
+
+
+def _run_batch(task, batch, raw=False):
+    return [_run_one(task, rel, known, raw) for rel, known in batch]
+
+
+# 本进程已加载的结果缓存：守护进程里反复 walk 时不用每次重新反序列化
+_states: dict[str, dict[str, tuple]] = {}
+# cache_name -> 上次 walk 时监视器的代；有监视器时只 stat 之后改过的文件
+_generations: dict[str, int] = {}
+
+
+def walk(task: Callable[[str, Any], Any], key: str,
+         roots: Iterable[str] = DEFAULT_ROOTS, exts: Iterable[str] = SOURCE_EXTS,
+         paths: Iterable[str] | None = None, workers: int | None = None,
+         raw: bool = False) -> WalkResult:
+    """对每个文件执行 task；key 标识任务（含参数），不同 key 的结果分开缓存。"""
+    roots, exts = tuple(roots), tuple(exts)
+    cache_name = 'walk/%s.pkl' % cache.shard_name(repr((key, roots, exts)))
+    state = _states.get(cache_name)
+    if state is None:
+        state = _states[cache_name] = cache.load(cache_name, {})   # rel -> (stat_key, hash, 结果)
+    watcher = watch.active(roots) if paths is None else None
+    changed = None
+    if watcher is not None:
+        generation, changed = watcher.changes_since(_generations.get(cache_name, -1))
+        if cache_name not in _generations:
+            changed = None          # 第一次：整体对一遍 stat，之后才能信任监视器
+        _generations[cache_name] = generation
+    if changed is not None:
+        # 监视器报告过的文件才需要 stat，其余直接用上次的结果
+        files = sorted(set(state) | {r for r in changed if is_source_file(r, roots, exts)})
+        checked = changed
+    else:
+        files = [relpath(p) for p in (paths if paths is not None else iter_source_files(roots, exts))]
+        checked = None
+
+    result = WalkResult()
+    todo: list[tuple[str, str | None]] = []
+    stale: list[str] = []
+    for rel in files:
+        entry = state.get(rel)
+        if checked is not None and rel not in checked:
+            result.results[rel] = entry[2]
+            result.cached += 1
+            continue
+        try:
+            key_now = cache.stat_key(resolve(rel))
+        except OSError as exc:
+            if checked is not None and isinstance(exc, FileNotFoundError):
+                stale.append(rel)           # 监视器报告的删除
+                state.pop(rel, None)
+                continue
+            result.errors.append(ReadError(rel, f'{type(exc).__name__}: {exc}'))
+            state.pop(rel, None)
+            continue
+        if entry is not None and entry[0] == key_now:
+            result.results[rel] = entry[2]
+            result.cached += 1
+        else:
+            todo.append((rel, entry[1] if entry is not None else None))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= MIN_PARALLEL_FILES:
+        size = max(1, len(todo) // (workers * 4))
+        batches = [todo[i:i + size] for i in range(0, len(todo), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = [o for chunk in pool.map(_run_batch, [task] * len(batches), batches,
+                                                [raw] * len(batches)) for o in chunk]
+    else:
+        outcomes = _run_batch(task, todo, raw)
+
+    for rel, key_now, digest, status, value in outcomes:
+        if status == 'error':
+            result.errors.append(ReadError(rel, value))
+            state.pop(rel, None)
+        elif status == 'same':
+            old = state[rel]
+            state[rel] = (key_now, digest, old[2])
+            result.results[rel] = old[2]
+            result.rehashed += 1
+        else:
+            state[rel] = (key_now, digest, value)
+            result.results[rel] = value
+            result.scanned += 1
+
+    if paths is None and checked is None:
+        live = set(files)
+        stale = [r for r in state if r not in live]
+        for rel in stale:
+            del state[rel]
+    if todo or stale or result.errors:
+        cache.save(cache_name, state)
+    return result
+
+
+@dataclass(frozen=True)
+class RegexTask:
+    """整文件正则：文件须包含 require 里的全部字面量，返回 [(行号, 匹配文本)]。"""
+    pattern: str
+    require: tuple[str, ...] = ()
+    flags: int = 0
+
+    def __call__(self, rel: str, text: str) -> list[tuple[int, str]]:
+        if not all(word in text for word in self.require):
+            return []
+        return [(text.count('\n', 0, m.start()) + 1, m.group(0))
+                for m in re.finditer(self.pattern, text, self.flags)]
+
+    @property
+    def key(self) -> str:
+        return 'regex:%r' % ((self.pattern, self.require, self.flags),)
+
+
+def find_usages(pattern: str, require: Iterable[str] = (), flags: int = 0,
+                **kwargs) -> WalkResult:
+    """跨文件正则搜索；结果只保留有命中的文件。"""
+    task = RegexTask(pattern, tuple(require), flags)
+    result = walk(task, task.key, **kwargs)
+    result.results = {rel: hits for rel, hits in result.results.items() if hits}
+    return result
@@ -0,0 +1,255 @@
+"""inotify 文件监视：让常驻进程里的索引只为改动过的文件付代价。
+
+即使有缓存，每次查询前仍要把 src/ 下几百个文件挨个 stat 一遍才知道谁变了。这里用
+ctypes 直接调 libc 的 inotify，递归监视 src/ 和 api/：
+
+- 后台线程读事件，记下改动过的相对路径；编辑器保存时的一串事件（写临时文件、
+  rename、chmod）在 QUIET 秒内没有新事件才合并成一批，批与批之间递增「代」；
+- 使用方记住自己上次看到的代，用 `changes_since(代)` 拿到之后改过的文件集合，
+  只重算这些文件；事件队列溢出时返回 None，表示需要整体刷新一次；
+- 查询前调用 `sync()`：把内核里已有的事件立即读完、并入当前代，不等合并窗口，
+  刚保存的文件不会查到旧结果。
+
+没有 inotify 的平台上 `start()` 返回 None，各工具照旧按 stat 判断新旧。
+
+    watcher = start(('src', 'api'), on_change=lambda rels: ...)
+    gen, changed = watcher.changes_since(last_gen)
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Iterable
+
+from toolkit.paths import REPO_ROOT, SKIP_DIRS, relpath
+
+WATCH_ROOTS = ('src', 'api')
+# 最后一个事件之后静默这么久才合并成一批
+QUIET = 0.05
+# 持续有事件时最多攒这么久
+MAX_DELAY = 0.5
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+         | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')
+
+
+def _libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch  # noqa: B018  缺符号时抛 AttributeError
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    return libc
+
+
+class Watcher:
+    def __init__(self, roots: Iterable[str] = WATCH_ROOTS,
+                 on_change: Callable[[set[str] | None], None] | None = None):
+        self.roots = tuple(r for r in roots if (REPO_ROOT / r).is_dir())
+        self.on_change = on_change
+        self.generation = 0
+        self._libc = _libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, '当前平台没有 inotify')
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失败')
+        self._dirs: dict[int, str] = {}          # wd -> 目录的绝对路径
+        self._changed: dict[str, int] = {}       # rel -> 最后一次改动所在的代
+        self._overflow = 0                       # 最近一次溢出所在的代
+        self._pending: set[str] = set()
+        self._pending_overflow = False
+        self._first_event = self._last_event = 0.0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        for root in self.roots:
+            self._add_tree(str(REPO_ROOT / root), initial=True)
+
+    # -- 监视目录 --------------------------------------------------------------
+
+    def _add_tree(self, top: str, initial: bool = False) -> None:
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:      # 超过 max_user_watches：只能退回整体刷新
+                    self._pending_overflow = True
+                    return
+                continue
+            self._dirs[wd] = dirpath
+            if not initial:
+                # 新目录在加监视之前可能已经写进了文件
+                self._pending.update(relpath(os.path.join(dirpath, f)) for f in filenames)
+
+    def covers(self, roots: Iterable[str]) -> bool:
+        """roots 是否都在监视范围内。"""
+        return all(any(r == w or r.startswith(w + '/') for w in self.roots) for r in roots)
+
+    # -- 读事件 ----------------------------------------------------------------
+
+    def _read(self) -> bool:
+        """读完当前所有事件，返回是否读到了。
+
+        读和解析在同一把锁里：否则后台线程刚 os.read 走一批、还没并入 _pending 时，
+        sync() 读到的是空队列，刚保存的文件就会漏掉。fd 是非阻塞的，持锁不会卡住。
+        """
+        got = False
+        with self._lock:
+            while True:
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    return got
+                if not data:
+                    return got
+                got = True
+                now = time.monotonic()
+                if not self._pending and not self._pending_overflow:
+                    self._first_event = now
+                self._last_event = now
+                self._parse(data)
+
+    def _parse(self, data: bytes) -> None:
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, size = _EVENT.unpack_from(data, pos)
+            raw = data[pos + _EVENT.size:pos + _EVENT.size + size].rstrip(b'\0')
+            pos += _EVENT.size + size
+            if mask & IN_Q_OVERFLOW:
+                self._pending_overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            base = self._dirs.get(wd)
+            if base is None:
+                continue
+            if not raw:            # 目录自身的事件：里面的文件各自有 IN_DELETE，或由 IN_MOVED_FROM 处理
+                continue
+            path = os.path.join(base, os.fsdecode(raw))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                    self._add_tree(path)
+                elif mask & IN_MOVED_FROM:
+                    # 整个目录被移走：没有逐个文件的事件，退回整体刷新
+                    self._pending_overflow = True
+                continue
+            self._pending.add(relpath(path))
+
+    def _flush(self) -> None:
+        with self._lock:
+            if not self._pending and not self._pending_overflow:
+                return
+            self.generation += 1
+            batch: set[str] | None = set(self._pending)
+            for rel in self._pending:
+                self._changed[rel] = self.generation
+            if self._pending_overflow:
+                self._overflow = self.generation
+                batch = None
+            self._pending.clear()
+            self._pending_overflow = False
+        if self.on_change is not None:
+            self.on_change(batch)
+
+    def _loop(self) -> None:
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        while not self._stop.is_set():
+            with self._lock:
+                waiting = bool(self._pending or self._pending_overflow)
+                first, last = self._first_event, self._last_event
+            if waiting:
+                now = time.monotonic()
+                timeout = max(0.0, min(last + QUIET, first + MAX_DELAY) - now)
+            else:
+                timeout = 0.5           # 定期醒来检查 stop
+            if poller.poll(timeout * 1000):
+                self._read()
+                continue
+            if waiting:
+                self._flush()
+
+    # -- 对外接口 --------------------------------------------------------------
+
+    def start(self) -> 'Watcher':
+        self._thread = threading.Thread(target=self._loop, name='toolkit-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def sync(self) -> int:
+        """立即读完内核里已有的事件并合并成一批（不等静默窗口），返回当前代。"""
+        self._read()
+        self._flush()
+        return self.generation
+
+    def changes_since(self, generation: int) -> tuple[int, set[str] | None]:
+        """(当前代, generation 之后改过的文件)；期间发生过溢出时文件集合为 None。"""
+        current = self.sync()
+        with self._lock:
+            if self._overflow > generation:
+                return current, None
+            return current, {rel for rel, gen in self._changed.items() if gen > generation}
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        os.close(self._fd)
+
+
+_active: Watcher | None = None
+
+
+def start(roots: Iterable[str] = WATCH_ROOTS,
+          on_change: Callable[[set[str] | None], None] | None = None) -> Watcher | None:
+    """启动本进程的监视器（守护进程调用）；平台不支持时返回 None。"""
+    global _active
+    try:
+        _active = Watcher(roots, on_change).start()
+    except OSError:
+        _active = None
+    return _active
+
+
+def active(roots: Iterable[str] | None = None) -> Watcher | None:
+    """覆盖 roots 的运行中的监视器；没有时返回 None，调用方应退回 stat 检查。"""
+    if _active is None or (roots is not None and not _active.covers(tuple(roots))):
+        return None
+    return _active
+
+
+def stop() -> None:
+    global _active
+    if _active is not None:
+        _active.close()
+        _active = None
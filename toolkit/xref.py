@@ -0,0 +1,346 @@
+"""src/ 的符号交叉引用库：定义、import、JSX 属性绑定、调用点、成员读取。
+
+每个文件的引用表由 tokenizer + span 索引一次算出，经 `walker.walk()` 按
+(mtime_ns, size) / 内容哈希增量缓存；打开时只重算变过的文件，再合成
+「名字 -> 引用」的倒排表。原来 check_props.py → find_store_create.py →
+check_store.py 这样一串整文件扫描，现在是几次字典查找：
+
+    db = XrefDB.open()
+    db.props('onTaskCreate')        # 哪些 JSX 标签绑定了 onTaskCreate={...}
+    db.bound('createTask')          # createTask 被当作哪些属性的值传下去
+    db.definitions('createTask')    # 在哪定义（const / 对象成员 / 接口字段 ...）
+    db.calls('createTask')          # 谁调用了它（scope 是调用所在的函数）
+
+引用种类：
+    def      定义；detail 为 const/let/var/function/class/interface/type/enum/
+             member（对象成员函数）/method/field:<接口名>
+    import   detail 为 `模块:导入名`
+    prop     JSX 属性；name 是属性名，detail 是 `<标签>`，target 是值为简单标识符
+             （或成员链的最后一段）时的那个名字
+    call     调用点；detail 是接收者（`useTaskStore`、`state.` 之类）
+    member   `.name` 形式的成员读取（不含调用）
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import Iterable, NamedTuple
+
+from toolkit.paths import DEFAULT_ROOTS, SOURCE_EXTS
+from toolkit.spans import SpanIndex, spans_for
+from toolkit.tokenizer import Token, is_jsx_file, significant, tokens_for
+from toolkit.walker import ReadError, walk
+
+# 提取规则变化时递增，walker 会因为任务键不同而整体重算
+XREF_VERSION = 1
+REF_KINDS = ('def', 'import', 'prop', 'call', 'member')
+
+_DECL_WORDS = frozenset({'const', 'let', 'var', 'function', 'class', 'interface', 'type', 'enum'})
+_NOT_CALLS = frozenset({
+    'if', 'for', 'while', 'switch', 'catch', 'function', 'with', 'return', 'super', 'import',
+    'typeof', 'await', 'new', 'void', 'delete', 'in', 'of', 'instanceof', 'yield',
+})
+
+
+class Ref(NamedTuple):
+    kind: str            # def / import / prop / call / member
+    name: str
+    path: str
+    lineno: int          # 从 1 开始
+    scope: str | None    # 所在的有名函数（组件、handler、store action）
+    detail: str
+    target: str | None = None
+
+
+class _FileRefs:
+    """单个文件的引用提取。"""
+
+    def __init__(self, rel: str, text: str, toks: list[Token], index: SpanIndex):
+        self.rel = rel
+        self.text = text
+        self.toks = toks
+        self.index = index
+        self.newlines = [m.start() for m in re.finditer('\n', text)]
+        self.refs: list[Ref] = []
+        self.pair = self._pairs()
+
+    def _pairs(self) -> list[int]:
+        pair = [-1] * len(self.toks)
+        stack: list[int] = []
+        for i, t in enumerate(self.toks):
+            if t.kind == 'punct' and t.value in ('(', '[', '{', '${'):
+                stack.append(i)
+            elif t.kind == 'punct' and t.value in (')', ']', '}') and stack:
+                j = stack.pop()
+                pair[i], pair[j] = j, i
+        return pair
+
+    def lineno(self, offset: int) -> int:
+        return bisect_right(self.newlines, offset - 1) + 1
+
+    def scope(self, offset: int) -> str | None:
+        span = self.index.enclosing(offset)
+        fallback = None
+        while span is not None:
+            if span.kind in ('function', 'arrow') and span.name:
+                if span.callee is None:
+                    return span.name
+                fallback = fallback or span.name
+            span = self.index.spans[span.parent] if span.parent >= 0 else None
+        return fallback
+
+    def add(self, kind: str, tok: Token, name: str, detail: str, target: str | None = None) -> None:
+        self.refs.append(Ref(kind, name, self.rel, self.lineno(tok.start), self.scope(tok.start),
+                             detail, target))
+
+    def is_(self, i: int, kind: str, *values: str) -> bool:
+        if not 0 <= i < len(self.toks):
+            return False
+        t = self.toks[i]
+        return t.kind == kind and (not values or t.value in values)
+
+    # -- 各类引用 --------------------------------------------------------------
+
+    def run(self) -> list[Ref]:
+        method_defs = self._span_defs()
+        toks = self.toks
+        tags: list[str] = []
+        for i, t in enumerate(toks):
+            if t.kind == 'ident':
+                if t.value in _DECL_WORDS and not self.is_(i - 1, 'punct', '.'):
+                    self._declaration(i)
+                elif t.value == 'import' and not self.is_(i + 1, 'punct', '(', '.'):
+                    self._import(i)
+                elif self.is_(i + 1, 'punct', '(') and t.value not in _NOT_CALLS \
+                        and i not in method_defs and not self.is_(i - 1, 'ident', 'function'):
+                    self.add('call', t, t.value, self._receiver(i))
+                elif self.is_(i - 1, 'punct', '.', '?.') and not self.is_(i + 1, 'punct', '('):
+                    self.add('member', t, t.value, self._receiver(i))
+            elif t.kind == 'jsx_open':
+                closing = t.value == '</'
+                tags.append('' if closing else (toks[i + 1].value if self.is_(i + 1, 'jsx_name') else ''))
+            elif t.kind == 'jsx_end':
+                if tags:
+                    tags.pop()
+            elif t.kind == 'jsx_attr' and tags:
+                self._prop(i, tags[-1])
+        return self.refs
+
+    def _span_defs(self) -> set[int]:
+        """对象成员函数（`x: async () => {}`）和方法简写记为定义；返回方法名 token 下标。"""
+        toks = self.toks
+        method_defs: set[int] = set()
+        for span in self.index:
+            if span.kind not in ('function', 'arrow') or not span.name or span.callee is not None:
+                continue
+            j = span.first
+            if self.is_(j - 1, 'punct', ':') and self.is_(j - 2, 'ident', span.name):
+                self.add('def', toks[j - 2], span.name, 'member')
+                continue
+            for k in range(j, min(j + 5, len(toks) - 1)):
+                if toks[k].kind == 'ident' and toks[k].value == span.name \
+                        and self.is_(k + 1, 'punct', '(') and not self.is_(k - 1, 'ident', 'function'):
+                    method_defs.add(k)
+                    self.add('def', toks[k], span.name, 'method')
+                    break
+        return method_defs
+
+    def _declaration(self, i: int) -> None:
+        word = self.toks[i].value
+        j = i + 1
+        if word == 'function' and self.is_(j, 'punct', '*'):
+            j += 1
+        if word in ('type', 'interface', 'enum', 'class') and not self.is_(j, 'ident'):
+            return
+        if self.is_(j, 'ident'):
+            # `type` 也可能只是变量名：要求后面跟 = 或 < 才算类型别名
+            if word == 'type' and not self.is_(j + 1, 'punct', '=', '<'):
+                return
+            self.add('def', self.toks[j], self.toks[j].value, word)
+            if word == 'interface':
+                self._interface_fields(j)
+            return
+        if word in ('const', 'let', 'var') and self.is_(j, 'punct', '{', '[') and self.pair[j] > j:
+            # 解构：const { a, b: c } = ... / const [x, setX] = useState()
+            depth = 0
+            for k in range(j, self.pair[j] + 1):
+                t = self.toks[k]
+                if t.kind == 'punct' and t.value in ('{', '['):
+                    depth += 1
+                elif t.kind == 'punct' and t.value in ('}', ']'):
+                    depth -= 1
+                elif t.kind == 'ident' and depth >= 1 and self.is_(k + 1, 'punct', ',', '}', ']', '=') \
+                        and not self.is_(k - 1, 'punct', '...', '='):
+                    self.add('def', t, t.value, word)
+                elif t.kind == 'ident' and self.is_(k - 1, 'punct', '...'):
+                    self.add('def', t, t.value, word)
+
+    def _interface_fields(self, j: int) -> None:
+        name = self.toks[j].value
+        k = j + 1
+        while k < len(self.toks) and not self.is_(k, 'punct', '{'):
+            k += 1
+        end = self.pair[k] if k < len(self.toks) else -1
+        if end < 0:
+            return
+        depth = 0
+        for m in range(k, end):
+            t = self.toks[m]
+            if t.kind == 'punct' and t.value in ('{', '(', '['):
+                depth += 1
+            elif t.kind == 'punct' and t.value in ('}', ')', ']'):
+                depth -= 1
+            elif depth == 1 and t.kind == 'ident' and self.is_(m - 1, 'punct', '{', ';', ',') \
+                    and (self.is_(m + 1, 'punct', ':', '?', '(') or self.is_(m + 1, 'punct', '?.')):
+                self.add('def', t, t.value, f'field:{name}')
+
+    def _import(self, i: int) -> None:
+        """`import X, { a as b } from 'm'` / `import * as ns from 'm'`。"""
+        toks = self.toks
+        names: list[tuple[str, Token]] = []   # (导入名, 本地名 token)
+        depth, k = 0, i + 1
+        while k < len(toks) and k < i + 200:
+            t = toks[k]
+            if t.kind == 'string':
+                break
+            if t.kind == 'punct':
+                if t.value == '{':
+                    depth += 1
+                elif t.value == '}':
+                    depth -= 1
+                elif t.value == ';':
+                    return
+            elif t.kind == 'ident' and t.value not in ('from', 'as', 'type'):
+                if self.is_(k - 1, 'ident', 'as'):
+                    if self.is_(k - 2, 'punct', '*'):
+                        names.append(('*', t))
+                    elif names:
+                        names[-1] = (names[-1][0], t)
+                else:
+                    names.append((t.value if depth else 'default', t))
+            k += 1
+        else:
+            return
+        module = toks[k].value.strip('\'"')
+        for imported, tok in names:
+            self.add('import', tok, tok.value, f'{module}:{imported}')
+
+    def _receiver(self, i: int) -> str:
+        """`a.b.c(` 里 c 之前的成员链文本（如 `a.b.`）。"""
+        k = i
+        while self.is_(k - 1, 'punct', '.', '?.') and self.is_(k - 2, 'ident'):
+            k -= 2
+        if k == i:
+            return ''
+        return ''.join(t.value for t in self.toks[k:i])
+
+    def _prop(self, i: int, tag: str) -> None:
+        t = self.toks[i]
+        if not self.is_(i + 1, 'punct', '='):
+            self.add('prop', t, t.value, f'<{tag}>', 'true')
+            return
+        value = self.toks[i + 2] if i + 2 < len(self.toks) else None
+        if value is None:
+            return
+        if value.kind == 'string':
+            self.add('prop', t, t.value, f'<{tag}>', None)
+            return
+        if value.kind != 'jsx_brace':
+            return
+        # 值是简单标识符或成员链时记下最后一段名字
+        k, target = i + 3, None
+        while self.is_(k, 'ident') or self.is_(k, 'punct', '.', '?.'):
+            k += 1
+        if k > i + 3 and self.is_(k, 'jsx_brace', '}') and self.toks[k - 1].kind == 'ident':
+            target = self.toks[k - 1].value
+        self.add('prop', t, t.value, f'<{tag}>', target)
+
+
+def file_refs(rel: str, text: str) -> list[Ref]:
+    """一个文件的全部引用（walker 任务）。"""
+    # 补丁脚本传进来的是 surrogateescape 解码的原文，坏字节要能原样编码回去
+    data = text.encode('utf-8', errors='surrogateescape')
+    jsx = is_jsx_file(rel)
+    _digest, tokens = tokens_for(data, jsx)
+    return _FileRefs(rel, text, significant(tokens), spans_for(data, jsx)).run()
+
+
+# (roots, exts) -> 本进程上次打开的 XrefDB
+_open: dict[tuple, 'XrefDB'] = {}
+
+
+class XrefDB:
+    """合并后的倒排表：名字 -> 引用列表（按路径、行号排序）。"""
+
+    def __init__(self, files: dict[str, list[Ref]], errors: list[ReadError] | None = None):
+        self.files = files
+        self.errors = errors or []
+        self._by_name: dict[str, list[Ref]] = {}
+        self._by_target: dict[str, list[Ref]] = {}
+        for rel in sorted(files):
+            for ref in sorted(files[rel], key=lambda r: r.lineno):
+                self._by_name.setdefault(ref.name, []).append(ref)
+                if ref.target:
+                    self._by_target.setdefault(ref.target, []).append(ref)
+
+    @classmethod
+    def open(cls, roots: Iterable[str] = DEFAULT_ROOTS, exts: Iterable[str] = SOURCE_EXTS,
+             workers: int | None = None) -> 'XrefDB':
+        roots, exts = tuple(roots), tuple(exts)
+        result = walk(file_refs, 'xref:v%d' % XREF_VERSION, roots, exts, workers=workers)
+        # 没有文件变化时复用本进程上次建好的索引（守护进程里连续查询）
+        previous = _open.get((roots, exts))
+        if previous is not None and not (result.scanned or result.rehashed or result.errors) \
+                and previous.files.keys() == result.results.keys():
+            return previous
+        db = _open[(roots, exts)] = cls(result.results, result.errors)
+        return db
+
+    def refs(self, name: str, kind: str | None = None, path: str | None = None) -> list[Ref]:
+        return [r for r in self._by_name.get(name, ())
+                if (kind is None or r.kind == kind) and (path is None or r.path == path)]
+
+    def definitions(self, name: str, path: str | None = None) -> list[Ref]:
+        return self.refs(name, 'def', path)
+
+    def imports(self, name: str, path: str | None = None) -> list[Ref]:
+        return self.refs(name, 'import', path)
+
+    def calls(self, name: str, path: str | None = None) -> list[Ref]:
+        return self.refs(name, 'call', path)
+
+    def props(self, name: str, path: str | None = None) -> list[Ref]:
+        """属性名为 name 的 JSX 绑定。"""
+        return self.refs(name, 'prop', path)
+
+    def bound(self, target: str, path: str | None = None) -> list[Ref]:
+        """以 target 作为值的 JSX 属性绑定（`onTaskCreate={createTask}`）。"""
+        return [r for r in self._by_target.get(target, ()) if path is None or r.path == path]
+
+    def fields(self, interface: str, path: str | None = None) -> list[Ref]:
+        """接口的字段定义。"""
+        detail = f'field:{interface}'
+        return [r for refs in self._by_name.values() for r in refs
+                if r.kind == 'def' and r.detail == detail and (path is None or r.path == path)]
+
+    def defined_in(self, path: str) -> list[Ref]:
+        return sorted((r for r in self.files.get(path, ()) if r.kind == 'def'), key=lambda r: r.lineno)
+
+
+def format_ref(ref: Ref) -> str:
+    extra = f' {ref.detail}' if ref.detail else ''
+    if ref.kind == 'prop' and ref.target:
+        extra += f'={{{ref.target}}}'
+    scope = f'  [{ref.scope}]' if ref.scope else ''
+    return f'{ref.path}:{ref.lineno}: {ref.kind} {ref.name}{extra}{scope}'
+
+
+def report(db: XrefDB, name: str, path: str | None = None) -> None:
+    """按种类列出一个名字的全部引用，以及把它当作属性值传递的位置。"""
+    groups = [(kind, db.refs(name, kind, path)) for kind in REF_KINDS]
+    groups.append(('bound', db.bound(name, path)))
+    for kind, refs in groups:
+        if refs:
+            print(f'--- {kind} ({len(refs)}) ---')
+            for ref in refs:
+                print(format_ref(ref))